@@ -5,22 +5,36 @@ Usage: adjust params below or convert to argparse.
 import os
 import csv
 from datetime import datetime
+
+import numpy as np
 from binance.client import Client
 from dotenv import load_dotenv
+
+from candle_store import fetch_to_store, open_candles, store_path
 load_dotenv()
 
 BINANCE_API_KEY = os.getenv("BINANCE_API_KEY", "")
 BINANCE_API_SECRET = os.getenv("BINANCE_API_SECRET", "")
 TESTNET = os.getenv("TESTNET", "true").lower() in ("1", "true", "yes")
 
-client = Client(BINANCE_API_KEY, BINANCE_API_SECRET)
-if TESTNET:
-    client.API_URL = "https://testnet.binance.vision/api"
+_client = None
+
+
+def get_client():
+    # created lazily so importing the simulator doesn't ping the API
+    global _client
+    if _client is None:
+        _client = Client(BINANCE_API_KEY, BINANCE_API_SECRET)
+        if TESTNET:
+            _client.API_URL = "https://testnet.binance.vision/api"
+    return _client
 
 SYMBOL = os.getenv("SYMBOL", "BNBUSDT")
 INTERVAL = "1m"
 START = None  # e.g. "2025-01-01"
 END = None
+# Use only the local store (e.g. built by ingest.py from data.binance.vision dumps)
+OFFLINE = os.getenv("BACKTEST_OFFLINE", "false").lower() in ("1", "true", "yes")
 
 TARGET_PCT = float(os.getenv("TARGET_PCT", "0.005"))
 STOP_LOSS_PCT = float(os.getenv("STOP_LOSS_PCT", "0.10"))
@@ -28,50 +42,152 @@ MIN_NOTIONAL = float(os.getenv("MIN_NOTIONAL", "1.0"))
 SLIPPAGE_PCT = 0.0002   # 0.02% slippage assumption
 FEE_PCT = 0.001         # 0.1% taker fee
 
+def _date_ms(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").timestamp()*1000) if value else None
+
 def get_klines(symbol, interval, start_str=None, end_str=None, limit=1000):
-    return client.get_klines(symbol=symbol, interval=interval, startTime=None if not start_str else int(datetime.strptime(start_str, "%Y-%m-%d").timestamp()*1000), endTime=None if not end_str else int(datetime.strptime(end_str, "%Y-%m-%d").timestamp()*1000), limit=limit)
+    return get_client().get_klines(symbol=symbol, interval=interval, startTime=None if not start_str else int(datetime.strptime(start_str, "%Y-%m-%d").timestamp()*1000), endTime=None if not end_str else int(datetime.strptime(end_str, "%Y-%m-%d").timestamp()*1000), limit=limit)
 
-def run_sim(initial_qty=1.0):
-    # simple simulation: holds qty of base asset. baseline = initial_qty * price0
-    klines = get_klines(SYMBOL, INTERVAL, START, END, limit=1000)
-    if not klines:
-        print("No klines returned")
-        return
+def iter_prices(close_prices, chunk=65536):
+    """Yield floats, converting numpy/memmap columns one chunk at a time."""
+    if isinstance(close_prices, np.ndarray):
+        for start in range(0, len(close_prices), chunk):
+            yield from close_prices[start:start + chunk].tolist()
+    else:
+        yield from close_prices
 
-    # use close prices
-    close_prices = [float(k[4]) for k in klines]
-    timestamps = [k[0] for k in klines]
 
+def simulate(close_prices, timestamps, initial_qty=1.0, target_pct=TARGET_PCT,
+             stop_loss_pct=STOP_LOSS_PCT, min_notional=MIN_NOTIONAL,
+             slippage_pct=SLIPPAGE_PCT, fee_pct=FEE_PCT):
+    """Run the harvester over close prices. Returns a result dict."""
     qty = initial_qty
     baseline = qty * close_prices[0]
     realized = 0.0
+    cash = 0.0
     trades = []
 
-    for i, price in enumerate(close_prices):
+    for i, price in enumerate(iter_prices(close_prices)):
         value = qty * price
-        target = baseline * (1 + TARGET_PCT)
-        stop = baseline * (1 - STOP_LOSS_PCT)
+        target = baseline * (1 + target_pct)
+        stop = baseline * (1 - stop_loss_pct)
 
         if value <= stop and qty > 0:
             # sell all
             sell_qty = qty
-            proceeds = sell_qty * price * (1 - SLIPPAGE_PCT)
-            proceeds *= (1 - FEE_PCT)
+            proceeds = sell_qty * price * (1 - slippage_pct)
+            proceeds *= (1 - fee_pct)
             realized += proceeds - baseline
-            trades.append(("STOP", timestamps[i], price, sell_qty, proceeds, realized))
+            cash += proceeds
+            trades.append(("STOP", int(timestamps[i]), price, sell_qty, proceeds, realized))
             qty = 0
             break
 
         if value >= target and qty > 0:
             profit_value = value - baseline
             sell_qty = profit_value / price
-            if sell_qty * price >= MIN_NOTIONAL and sell_qty > 0:
-                proceeds = sell_qty * price * (1 - SLIPPAGE_PCT)
-                proceeds *= (1 - FEE_PCT)
+            if sell_qty * price >= min_notional and sell_qty > 0:
+                proceeds = sell_qty * price * (1 - slippage_pct)
+                proceeds *= (1 - fee_pct)
                 realized += proceeds
+                cash += proceeds
                 qty = qty - sell_qty
                 baseline = qty * price
-                trades.append(("HARVEST", timestamps[i], price, sell_qty, proceeds, realized))
+                trades.append(("HARVEST", int(timestamps[i]), price, sell_qty, proceeds, realized))
+
+    # mark-to-market equity vs. buy-and-hold of the initial quantity
+    last_price = float(close_prices[i])
+    equity = cash + qty * last_price
+    return {
+        "final_qty": qty,
+        "realized": realized,
+        "equity": equity,
+        "pnl": equity - initial_qty * close_prices[0],
+        "stopped": bool(trades) and trades[-1][0] == "STOP",
+        "trades": trades,
+    }
+
+
+def simulate_grid(close_prices, target_pcts, stop_loss_pcts, initial_qty=1.0,
+                  min_notional=MIN_NOTIONAL, slippage_pct=SLIPPAGE_PCT, fee_pct=FEE_PCT):
+    """Vectorized simulate() over many (target_pct, stop_loss_pct) pairs at once.
+
+    target_pcts and stop_loss_pcts are equal-length sequences; element k of the
+    returned arrays is the result simulate() gives for the k-th pair.
+    """
+    closes = np.asarray(close_prices, dtype=np.float64)
+    tp = np.asarray(target_pcts, dtype=np.float64)
+    sl = np.asarray(stop_loss_pcts, dtype=np.float64)
+    keep = (1 - slippage_pct) * (1 - fee_pct)
+
+    qty = np.full(tp.shape, float(initial_qty))
+    baseline = qty * closes[0]
+    realized = np.zeros(tp.shape)
+    cash = np.zeros(tp.shape)
+    active = np.ones(tp.shape, dtype=bool)
+    harvests = np.zeros(tp.shape, dtype=np.int64)
+
+    for price in closes:
+        value = qty * price
+        stop_hit = active & (value <= baseline * (1 - sl)) & (qty > 0)
+        if stop_hit.any():
+            proceeds = qty[stop_hit] * price * keep
+            realized[stop_hit] += proceeds - baseline[stop_hit]
+            cash[stop_hit] += proceeds
+            qty[stop_hit] = 0.0
+            active &= ~stop_hit
+
+        hit = active & (value >= baseline * (1 + tp)) & (qty > 0)
+        if hit.any():
+            sell_qty = (value[hit] - baseline[hit]) / price
+            ok = (sell_qty * price >= min_notional) & (sell_qty > 0)
+            idx = np.flatnonzero(hit)[ok]
+            sell_qty = sell_qty[ok]
+            proceeds = sell_qty * price * keep
+            realized[idx] += proceeds
+            cash[idx] += proceeds
+            qty[idx] -= sell_qty
+            baseline[idx] = qty[idx] * price
+            harvests[idx] += 1
+
+        if not active.any():
+            break
+
+    equity = cash + qty * closes[-1]
+    return {
+        "final_qty": qty,
+        "realized": realized,
+        "equity": equity,
+        "pnl": equity - initial_qty * closes[0],
+        "stopped": ~active,
+        "harvests": harvests,
+    }
+
+
+def run_sim(initial_qty=1.0):
+    # simple simulation: holds qty of base asset. baseline = initial_qty * price0
+    # candles come from the memory-mapped store, topped up from the API unless offline
+    path = store_path(SYMBOL, INTERVAL)
+    if not OFFLINE:
+        fetch_to_store(get_client(), SYMBOL, INTERVAL, path,
+                       start_ms=_date_ms(START), end_ms=_date_ms(END))
+    candles = open_candles(path)
+    # ts is sorted, so date bounds are a slice of the mapping rather than a copy
+    lo = np.searchsorted(candles["ts"], _date_ms(START)) if START else 0
+    hi = np.searchsorted(candles["ts"], _date_ms(END)) if END else len(candles)
+    candles = candles[lo:hi]
+    if len(candles) == 0:
+        print("No klines returned")
+        return
+
+    # use close prices (strided views into the mapped file, no copies)
+    close_prices = candles["close"]
+    timestamps = candles["ts"]
+
+    result = simulate(close_prices, timestamps, initial_qty=initial_qty)
+    qty = result["final_qty"]
+    realized = result["realized"]
+    trades = result["trades"]
 
     # report
     print("Initial qty:", initial_qty)
@@ -0,0 +1,179 @@
+"""
+Binary candle and trade store for backtests.
+
+Candles are kept as a flat file of fixed-size records (timestamp, OHLCV) and
+opened with np.memmap, so backtests read columns straight from the OS page
+cache instead of building Python lists. Concurrent sweep workers mapping the
+same file share those pages, and resident memory stays flat as history grows.
+aggTrades are stored the same way, one fixed-size record per aggregate trade.
+
+Usage:
+    python app2/candle_store.py --symbol BNBUSDT --interval 1m --start 2023-01-01
+    python app2/candle_store.py --from-json data/klines_BNBUSDT_1m.json --out data/candles_BNBUSDT_1m.bin
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+CANDLE_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "data")
+
+CANDLE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]
+)
+
+TRADE_DTYPE = np.dtype(
+    [
+        ("ts", "<i8"),  # transact time, ms
+        ("id", "<i8"),  # aggregate trade id
+        ("price", "<f8"),
+        ("qty", "<f8"),
+        ("buyer_maker", "?"),
+    ]
+)
+
+
+def store_path(symbol, interval, store_dir=None):
+    return os.path.join(store_dir or CANDLE_STORE_DIR, f"candles_{symbol}_{interval}.bin")
+
+
+def trade_store_path(symbol, store_dir=None):
+    return os.path.join(store_dir or CANDLE_STORE_DIR, f"trades_{symbol}.bin")
+
+
+def klines_to_array(klines):
+    """Convert get_klines rows to a CANDLE_DTYPE array."""
+    arr = np.empty(len(klines), dtype=CANDLE_DTYPE)
+    for i, k in enumerate(klines):
+        arr[i] = (int(k[0]), float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]))
+    return arr
+
+
+def open_candles(path, dtype=CANDLE_DTYPE):
+    """Memory-map a candle file read-only. Returns an empty array if missing."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r")
+
+
+def open_trades(path):
+    """Memory-map an aggTrades file read-only. Returns an empty array if missing."""
+    return open_candles(path, dtype=TRADE_DTYPE)
+
+
+def last_record(path, dtype=CANDLE_DTYPE):
+    """Last complete record in a store file, or None."""
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size < dtype.itemsize:
+        return None
+    with open(path, "rb") as f:
+        f.seek(size - size % dtype.itemsize - dtype.itemsize)
+        return np.frombuffer(f.read(dtype.itemsize), dtype=dtype)[0]
+
+
+def last_timestamp(path):
+    """Open time of the last stored candle, or None."""
+    rec = last_record(path)
+    return None if rec is None else int(rec["ts"])
+
+
+def append_candles(path, candles):
+    """Append candles newer than the last stored one. Returns rows written."""
+    candles = np.asarray(candles, dtype=CANDLE_DTYPE)
+    last = last_timestamp(path)
+    if last is not None:
+        candles = candles[candles["ts"] > last]
+    if len(candles) == 0:
+        return 0
+    order = np.argsort(candles["ts"], kind="stable")
+    candles = candles[order]
+    _, first = np.unique(candles["ts"], return_index=True)
+    candles = candles[first]
+
+    _append(path, candles)
+    return len(candles)
+
+
+def append_trades(path, trades):
+    """Append aggTrades with ids above the last stored one. Returns rows written."""
+    trades = np.asarray(trades, dtype=TRADE_DTYPE)
+    last = last_record(path, TRADE_DTYPE)
+    if last is not None:
+        trades = trades[trades["id"] > last["id"]]
+    if len(trades) == 0:
+        return 0
+    _, first = np.unique(trades["id"], return_index=True)  # sorted by id
+    trades = trades[first]
+    _append(path, trades)
+    return len(trades)
+
+
+def _append(path, records):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(records.tobytes())
+
+
+def fetch_to_store(client, symbol, interval, path, start_ms=None, end_ms=None, limit=1000):
+    """Page get_klines from the last stored candle (or start_ms) into the store."""
+    last = last_timestamp(path)
+    cursor = last + 1 if last is not None else start_ms
+    written = 0
+    while True:
+        klines = client.get_klines(
+            symbol=symbol, interval=interval, startTime=cursor, endTime=end_ms, limit=limit
+        )
+        if not klines:
+            break
+        # Drop the candle that is still open; it is fetched again next run
+        now_ms = int(time.time() * 1000)
+        closed = [k for k in klines if k[6] < now_ms]
+        written += append_candles(path, klines_to_array(closed))
+        if len(klines) < limit:
+            break
+        cursor = klines[-1][0] + 1
+    return written
+
+
+def _parse_date(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").timestamp() * 1000) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend a binary candle store.")
+    parser.add_argument("--symbol", default=os.getenv("SYMBOL", "BNBUSDT"))
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--start", default=None, help="YYYY-MM-DD (first run only)")
+    parser.add_argument("--end", default=None, help="YYYY-MM-DD")
+    parser.add_argument("--from-json", default=None, help="import a kline cache JSON file")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args()
+
+    path = args.out or store_path(args.symbol, args.interval)
+    if args.from_json:
+        with open(args.from_json, "r") as f:
+            written = append_candles(path, klines_to_array(json.load(f)))
+    else:
+        from backtester_harvester import get_client
+
+        written = fetch_to_store(
+            get_client(), args.symbol, args.interval, path,
+            start_ms=_parse_date(args.start), end_ms=_parse_date(args.end),
+        )
+    print(f"Wrote {written} candles -> {path} ({len(open_candles(path))} total)")
+
+
+if __name__ == "__main__":
+    main()
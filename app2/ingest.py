@@ -0,0 +1,307 @@
+"""
+Bulk ingest of Binance public data dumps into the candle/trade store.
+
+Takes monthly (or daily) zip archives already downloaded from
+data.binance.vision, in its layout or any flat directory, e.g.
+    spot/monthly/klines/BNBUSDT/1m/BNBUSDT-1m-2023-01.zip
+    spot/monthly/aggTrades/BNBUSDT/BNBUSDT-aggTrades-2023-01.zip
+
+Archives are verified against their .CHECKSUM file when one is next to
+them. Worker processes decompress and parse them in parallel. The results
+are written to the binary store in period order, so a multi-year history is
+built without a single API call. Rows already in the store (overlapping
+daily and monthly files, re-runs) are dropped. An older archive can be
+added later and is placed before the stored history; rows that would fall
+between stored ones need --rebuild. Gaps in the candle times or
+aggTrade ids are reported after the run; exchange maintenance windows show
+up there too.
+
+Spot dumps switched from millisecond to microsecond timestamps in 2025;
+both are stored as milliseconds.
+
+Usage:
+    python app2/ingest.py --src ~/binance-data --symbol BNBUSDT --interval 1m
+    python app2/ingest.py --src ~/binance-data --symbol BNBUSDT --agg-trades
+    python app2/ingest.py --src ~/binance-data --symbol BNBUSDT --agg-trades --rebuild
+"""
+import argparse
+import hashlib
+import io
+import os
+import re
+import shutil
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from candle_store import (
+    CANDLE_DTYPE,
+    TRADE_DTYPE,
+    append_candles,
+    append_trades,
+    last_record,
+    open_candles,
+    open_trades,
+    store_path,
+    trade_store_path,
+)
+
+ARCHIVE_RE = re.compile(
+    r"^(?P<symbol>[A-Z0-9]+)-(?P<kind>aggTrades|\d+[smhdwM])-(?P<period>\d{4}-\d{2}(?:-\d{2})?)\.zip$"
+)
+# Longest spacing between candle opens; months vary, so "M" is the longest month
+INTERVAL_MS = {
+    "s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000, "M": 2_678_400_000,
+}
+MICROS_FROM = 10**14  # timestamps above this are microseconds
+COPY_CHUNK = 64 << 20  # bytes per read when streaming the store into a new file
+
+
+def interval_ms(interval):
+    return int(interval[:-1]) * INTERVAL_MS[interval[-1]]
+
+
+def find_archives(src, symbol, kind):
+    """(period, path) for the symbol's archives of one kind, oldest first.
+
+    A monthly file sorts before the daily files of the same month.
+    """
+    found = []
+    for root, _, files in os.walk(src):
+        for name in files:
+            m = ARCHIVE_RE.match(name)
+            if m and m["symbol"] == symbol and m["kind"] == kind:
+                found.append((m["period"], os.path.join(root, name)))
+    return sorted(found)
+
+
+# -------------------------
+# WORKERS
+# -------------------------
+def verify_checksum(path):
+    """Compare with the .CHECKSUM file if present. Raises ValueError on mismatch."""
+    checksum_path = path + ".CHECKSUM"
+    if not os.path.exists(checksum_path):
+        return False
+    with open(checksum_path) as f:
+        expected = f.read().split()[0].lower()
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    if digest.hexdigest() != expected:
+        raise ValueError(f"checksum mismatch for {os.path.basename(path)}")
+    return True
+
+
+def read_csv(path):
+    with zipfile.ZipFile(path) as zf:
+        name = next(n for n in zf.namelist() if n.endswith(".csv"))
+        return zf.read(name).decode()
+
+
+def _header_rows(text):
+    return 0 if not text or text[0].isdigit() else 1
+
+
+def to_ms(ts):
+    ts = np.asarray(ts, dtype=np.int64)
+    return np.where(ts >= MICROS_FROM, ts // 1000, ts)
+
+
+def parse_klines(text):
+    """Kline CSV (open_time, open, high, low, close, volume, ...) to CANDLE_DTYPE."""
+    rows = np.loadtxt(
+        io.StringIO(text), delimiter=",", usecols=(0, 1, 2, 3, 4, 5),
+        skiprows=_header_rows(text), ndmin=2, dtype=np.float64,
+    )
+    out = np.empty(len(rows), dtype=CANDLE_DTYPE)
+    out["ts"] = to_ms(rows[:, 0])
+    for col, name in enumerate(("open", "high", "low", "close", "volume"), 1):
+        out[name] = rows[:, col]
+    return out
+
+
+def parse_agg_trades(text):
+    """aggTrades CSV (id, price, qty, first_id, last_id, time, is_buyer_maker, ...) to TRADE_DTYPE."""
+    rows = np.loadtxt(
+        io.StringIO(text), delimiter=",", usecols=(0, 1, 2, 5, 6),
+        converters={6: lambda s: 1.0 if s[:1] in ("T", "t") else 0.0},
+        skiprows=_header_rows(text), ndmin=2, dtype=np.float64,
+    )
+    out = np.empty(len(rows), dtype=TRADE_DTYPE)
+    out["id"] = rows[:, 0].astype(np.int64)
+    out["price"] = rows[:, 1]
+    out["qty"] = rows[:, 2]
+    out["ts"] = to_ms(rows[:, 3])
+    out["buyer_maker"] = rows[:, 4] > 0
+    return out
+
+
+def load_archive(path, trades):
+    """Worker: verify, decompress and parse one archive."""
+    verified = verify_checksum(path)
+    text = read_csv(path)
+    records = parse_agg_trades(text) if trades else parse_klines(text)
+    return records, verified
+
+
+# -------------------------
+# GAPS
+# -------------------------
+def find_gaps(values, step, chunk=10_000_000):
+    """(index, value_before, value_after) wherever consecutive values jump by more than step.
+
+    Works through the column in chunks so a memory-mapped store of any size
+    is checked with bounded memory.
+    """
+    gaps = []
+    for start in range(0, max(len(values) - 1, 0), chunk):
+        block = np.asarray(values[start:start + chunk + 1], dtype=np.int64)
+        for i in np.flatnonzero(np.diff(block) > step):
+            gaps.append((start + int(i), int(block[i]), int(block[i + 1])))
+    return gaps
+
+
+# -------------------------
+# INGEST
+# -------------------------
+def merge_into_store(path, records, trades):
+    """Add records to the store, which stays sorted by key. Returns rows written.
+
+    Rows newer than the store are appended. A block that lies entirely
+    before the store (an older month arriving later) is written first and
+    the existing file is streamed after it. Anything else would interleave
+    with stored rows and raises ValueError; rebuild the store instead.
+    """
+    key = "id" if trades else "ts"
+    dtype = TRADE_DTYPE if trades else CANDLE_DTYPE
+    append = append_trades if trades else append_candles
+    last = last_record(path, dtype)
+    if len(records) == 0 or last is None or records[key].min() > last[key]:
+        return append(path, records)
+
+    existing = open_trades(path) if trades else open_candles(path)
+    # The store is sorted by key, so only the overlapping slice is compared
+    lo, hi = np.searchsorted(existing[key], [records[key].min(), records[key].max()], side="left")
+    known = np.isin(records[key], existing[key][lo:hi + 1])
+    first = existing[0][key]
+    del existing
+    fresh = records[~known]
+    if len(fresh) == 0:
+        return 0
+    if fresh[key].min() > last[key]:
+        return append(path, fresh)
+    if fresh[key].max() >= first:
+        raise ValueError(
+            f"{os.path.basename(path)}: new rows fall between stored ones; "
+            "re-run with --rebuild to rewrite the store in order"
+        )
+    _, unique = np.unique(fresh[key], return_index=True)  # sorted by key
+    _prepend(path, fresh[unique])
+    return len(unique)
+
+
+def _prepend(path, records):
+    """Write records, then copy the existing store after them in chunks."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as out:
+        out.write(records.tobytes())
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, out, COPY_CHUNK)
+    os.replace(tmp, path)
+
+
+def ingest(
+    src, symbol, interval="1m", trades=False, store_dir=None, workers=None, rebuild=False, log=print
+):
+    """Ingest every matching archive under src. Returns a summary dict.
+
+    With rebuild, the store is deleted first and rebuilt from the archives in
+    period order, for history that does not fit before or after it.
+    """
+    kind = "aggTrades" if trades else interval
+    path = trade_store_path(symbol, store_dir) if trades else store_path(symbol, interval, store_dir)
+    archives = find_archives(src, symbol, kind)
+    if not archives:
+        raise FileNotFoundError(f"No {symbol} {kind} archives under {src}")
+    if rebuild and os.path.exists(path):
+        os.remove(path)
+
+    started = time.time()
+    rows = written = verified = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Results are written in period order; at most 2 per worker are held at once
+        pending = deque()
+        queue = iter(archives)
+
+        def submit_next():
+            item = next(queue, None)
+            if item is not None:
+                pending.append((item[0], pool.submit(load_archive, item[1], trades)))
+
+        for _ in range(2 * workers):
+            submit_next()
+        while pending:
+            period, future = pending.popleft()
+            records, checked = future.result()
+            rows += len(records)
+            verified += checked
+            new = merge_into_store(path, records, trades)
+            written += new
+            log(f"{period}: {len(records)} rows, {new} new")
+            submit_next()
+
+    stored = open_trades(path) if trades else open_candles(path)
+    if trades:
+        gaps = find_gaps(stored["id"], 1)
+    else:
+        gaps = find_gaps(stored["ts"], interval_ms(interval))
+    summary = {
+        "path": path,
+        "archives": len(archives),
+        "verified": verified,
+        "rows": rows,
+        "written": written,
+        "duplicates": rows - written,
+        "stored": len(stored),
+        "gaps": gaps,
+        "elapsed_sec": round(time.time() - started, 1),
+    }
+    del stored
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--src", required=True, help="directory with downloaded .zip archives")
+    parser.add_argument("--symbol", default=os.getenv("SYMBOL", "BNBUSDT"))
+    parser.add_argument("--interval", default="1m")
+    parser.add_argument("--agg-trades", action="store_true", help="ingest aggTrades instead of klines")
+    parser.add_argument("--store-dir", default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rebuild", action="store_true", help="delete the store and rebuild it in order")
+    args = parser.parse_args()
+
+    summary = ingest(
+        args.src, args.symbol, args.interval, trades=args.agg_trades,
+        store_dir=args.store_dir, workers=args.workers, rebuild=args.rebuild,
+    )
+    print(
+        f"{summary['archives']} archives ({summary['verified']} checksummed), "
+        f"{summary['rows']} rows, {summary['written']} new, {summary['duplicates']} duplicates "
+        f"-> {summary['path']} ({summary['stored']} total, {summary['elapsed_sec']}s)"
+    )
+    gaps = summary["gaps"]
+    unit = "ids" if args.agg_trades else "ms"
+    print(f"{len(gaps)} gaps")
+    for _, before, after in gaps[:20]:
+        print(f"  {before} -> {after} ({after - before} {unit})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Monte Carlo robustness runs for the Harvester strategy.
+
+Price paths are generated by block-bootstrapping log returns from the candle
+store (block length 1 is a plain i.i.d. resample), and the harvester is run
+on all paths at once: each time step is one vectorized update across paths.
+Paths are produced in short time chunks so memory stays bounded, and path
+batches run in parallel worker processes.
+
+Usage:
+    python app2/monte_carlo.py --candles data/candles_BNBUSDT_1m.bin \
+        --paths 10000 --steps 100000 --block 60
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backtester_harvester import FEE_PCT, MIN_NOTIONAL, SLIPPAGE_PCT, STOP_LOSS_PCT, TARGET_PCT
+from candle_store import open_candles
+
+
+def log_returns(closes):
+    closes = np.asarray(closes, dtype=np.float64)
+    return np.diff(np.log(closes))
+
+
+def check_block(block, n_returns):
+    """Blocks are drawn whole from the history, so 1 <= block <= len(returns)."""
+    if not 1 <= block <= n_returns:
+        raise ValueError(
+            f"Bootstrap block length must be between 1 and the {n_returns} returns in the "
+            f"store, got {block}"
+        )
+
+
+def bootstrap_chunk(rng, returns, n_paths, n_steps, block):
+    """(n_paths, n_steps) log returns made of randomly placed blocks."""
+    n_blocks = -(-n_steps // block)
+    starts = rng.integers(0, len(returns) - block + 1, size=(n_paths, n_blocks))
+    idx = starts[:, :, None] + np.arange(block)
+    return returns[idx].reshape(n_paths, n_blocks * block)[:, :n_steps]
+
+
+def simulate_paths(returns, n_paths, n_steps, start_price, block=1, seed=None,
+                   initial_qty=1.0, target_pct=TARGET_PCT, stop_loss_pct=STOP_LOSS_PCT,
+                   min_notional=MIN_NOTIONAL, slippage_pct=SLIPPAGE_PCT, fee_pct=FEE_PCT,
+                   chunk=512):
+    """Run the harvester on n_paths bootstrapped paths. Returns per-path arrays."""
+    check_block(block, len(returns))
+    rng = np.random.default_rng(seed)
+    keep = (1 - slippage_pct) * (1 - fee_pct)
+
+    log_price = np.full(n_paths, np.log(start_price))
+    qty = np.full(n_paths, float(initial_qty))
+    baseline = qty * start_price
+    cash = np.zeros(n_paths)
+    active = np.ones(n_paths, dtype=bool)
+    harvests = np.zeros(n_paths, dtype=np.int64)
+    peak = qty * start_price
+    max_dd = np.zeros(n_paths)
+    price = np.full(n_paths, float(start_price))
+
+    done = 0
+    while done < n_steps and active.any():
+        steps = min(chunk, n_steps - done)
+        prices = np.exp(
+            log_price[:, None]
+            + np.cumsum(bootstrap_chunk(rng, returns, n_paths, steps, block), axis=1)
+        )
+        log_price = np.log(prices[:, -1])
+
+        for t in range(steps):
+            price = prices[:, t]
+            value = qty * price
+
+            stop_hit = active & (value <= baseline * (1 - stop_loss_pct))
+            if stop_hit.any():
+                cash[stop_hit] += value[stop_hit] * keep
+                qty[stop_hit] = 0.0
+                active &= ~stop_hit
+
+            hit = active & (value >= baseline * (1 + target_pct))
+            if hit.any():
+                sell_qty = (value[hit] - baseline[hit]) / price[hit]
+                ok = sell_qty * price[hit] >= min_notional
+                idx = np.flatnonzero(hit)[ok]
+                sell_qty = sell_qty[ok]
+                cash[idx] += sell_qty * price[idx] * keep
+                qty[idx] -= sell_qty
+                baseline[idx] = qty[idx] * price[idx]
+                harvests[idx] += 1
+
+            equity = cash + qty * price
+            np.maximum(peak, equity, out=peak)
+            np.maximum(max_dd, (peak - equity) / peak, out=max_dd)
+            if not active.any():
+                break  # every path is flat; equity can no longer change
+
+        done += steps
+
+    equity = cash + qty * price
+    return {
+        "pnl": equity - initial_qty * start_price,
+        "max_drawdown": max_dd,
+        "stopped": ~active,
+        "harvests": harvests,
+    }
+
+
+def _run_batch(path, n_paths, n_steps, block, seed, params):
+    closes = open_candles(path)["close"]
+    returns = log_returns(closes)
+    return simulate_paths(returns, n_paths, n_steps, float(closes[-1]),
+                          block=block, seed=seed, **params)
+
+
+def monte_carlo(path, n_paths, n_steps, block=1, seed=None, workers=None, params=None):
+    """Split paths across worker processes and merge the per-path results."""
+    check_block(block, max(len(open_candles(path)) - 1, 0))
+    workers = workers or os.cpu_count() or 1
+    sizes = [n_paths // workers + (1 if i < n_paths % workers else 0) for i in range(workers)]
+    sizes = [s for s in sizes if s > 0]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    with ProcessPoolExecutor(max_workers=len(sizes)) as pool:
+        futures = [
+            pool.submit(_run_batch, path, size, n_steps, block, s, params or {})
+            for size, s in zip(sizes, seeds)
+        ]
+        parts = [f.result() for f in futures]
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def summarize(results, percentiles=(1, 5, 25, 50, 75, 95, 99)):
+    """Distribution of P&L and drawdown plus stop-out frequency."""
+    return {
+        "paths": int(len(results["pnl"])),
+        "pnl": {f"p{q}": float(v) for q, v in zip(percentiles, np.percentile(results["pnl"], percentiles))},
+        "pnl_mean": float(results["pnl"].mean()),
+        "max_drawdown": {
+            f"p{q}": float(v)
+            for q, v in zip(percentiles, np.percentile(results["max_drawdown"], percentiles))
+        },
+        "stop_out_rate": float(results["stopped"].mean()),
+        "harvests_mean": float(results["harvests"].mean()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap robustness runs for the harvester.")
+    parser.add_argument("--candles", required=True, help="binary candle store file")
+    parser.add_argument("--paths", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=100000)
+    parser.add_argument("--block", type=int, default=60, help="bootstrap block length (1 = i.i.d.)")
+    parser.add_argument("--target", type=float, default=TARGET_PCT)
+    parser.add_argument("--stop", type=float, default=STOP_LOSS_PCT)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the summary as JSON")
+    args = parser.parse_args()
+
+    started = time.time()
+    results = monte_carlo(
+        args.candles, args.paths, args.steps, block=args.block, seed=args.seed,
+        workers=args.workers, params={"target_pct": args.target, "stop_loss_pct": args.stop},
+    )
+    summary = summarize(results)
+    summary["elapsed_sec"] = round(time.time() - started, 1)
+    print(json.dumps(summary, indent=2))
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Tick-level backtest of the Harvester on aggTrades from the local trade store.
+
+run_sim only sees 1m closes, so a stop or target touched inside a bar is
+missed or filled at the close. This engine replays every aggregate trade, so
+triggers fire on the first trade that crosses them and fill at that trade's
+price. The rules are the live bot's:
+- the ATR trailing stop ratchets up to price - ATR_MULTIPLIER * ATR and
+  sells everything when crossed
+- the portfolio stop sells everything at baseline * (1 - STOP_LOSS_PCT)
+- the harvest sells the profit above baseline at the ATR-widened target,
+  then resets baseline, entry and stop
+
+ATR is the streaming 5m ATR the bot uses with USE_TRADE_STREAM: bars built
+from the trades, StreamingIndicators from indicators.py, and each trade
+sees the ATR of the bars closed before it.
+
+The trade store is memory-mapped and read in chunks of CHUNK trades.
+Inside a chunk, the stop path is a running maximum, and all trigger
+conditions are checked in windows of SCAN trades. Python only runs once per
+5m bar and once per trade event, so memory stays bounded and hundreds of
+millions of trades stream through at NumPy speed.
+
+Usage:
+    python app2/tick_backtest.py --symbol BNBUSDT --start 2024-01-01 --end 2024-07-01
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from backtester_harvester import FEE_PCT, MIN_NOTIONAL, SLIPPAGE_PCT, STOP_LOSS_PCT, TARGET_PCT
+from candle_store import open_trades, trade_store_path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from indicators import StreamingIndicators  # noqa: E402  (the live bot's ATR)
+
+ATR_PERIOD = int(os.getenv("ATR_PERIOD", "14"))
+ATR_MULTIPLIER = float(os.getenv("ATR_MULTIPLIER", "1.5"))
+BAR_MS = 300_000  # 5m bars, as in the streaming pipeline
+CHUNK = 1_000_000
+SCAN = 16_384
+
+
+class BarAtr:
+    """Streaming 5m ATR across chunk boundaries; returns the ATR each trade sees."""
+
+    def __init__(self, period=ATR_PERIOD, bar_ms=BAR_MS):
+        self.bar_ms = bar_ms
+        self.indicators = StreamingIndicators(atr_period=period)
+        self.open_bar = None  # [bar id, high, low, close] still open at the chunk end
+
+    def _atr(self):
+        atr = self.indicators.atr
+        return np.nan if atr is None else atr
+
+    def per_trade(self, ts, price):
+        ids = ts // self.bar_ms
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(ids)) + 1])
+        highs = np.maximum.reduceat(price, starts)
+        lows = np.minimum.reduceat(price, starts)
+        closes = price[np.concatenate([starts[1:] - 1, [len(price) - 1]])]
+
+        if self.open_bar is not None:
+            bar_id, high, low, close = self.open_bar
+            if bar_id == ids[0]:
+                highs[0] = max(highs[0], high)
+                lows[0] = min(lows[0], low)
+            else:
+                self.indicators.update(high, low, close)
+
+        seg_atr = np.empty(len(starts))
+        for j in range(len(starts)):
+            seg_atr[j] = self._atr()
+            if j < len(starts) - 1:
+                self.indicators.update(float(highs[j]), float(lows[j]), float(closes[j]))
+        self.open_bar = [ids[-1], float(highs[-1]), float(lows[-1]), float(closes[-1])]
+        return np.repeat(seg_atr, np.diff(np.concatenate([starts, [len(price)]])))
+
+
+def simulate_ticks(
+    trades,
+    initial_qty=1.0,
+    target_pct=TARGET_PCT,
+    stop_loss_pct=STOP_LOSS_PCT,
+    atr_multiplier=ATR_MULTIPLIER,
+    atr_period=ATR_PERIOD,
+    min_notional=MIN_NOTIONAL,
+    slippage_pct=SLIPPAGE_PCT,
+    fee_pct=FEE_PCT,
+    chunk=CHUNK,
+    scan=SCAN,
+):
+    """Run the harvester over a TRADE_DTYPE array (or memmap). Returns a result dict."""
+    n = len(trades)
+    if n == 0:
+        raise ValueError("No trades to simulate")
+    keep = (1 - slippage_pct) * (1 - fee_pct)
+    first_price = float(trades["price"][0])
+
+    qty, cash = float(initial_qty), 0.0
+    baseline = qty * first_price
+    entry = first_price
+    stop = np.nan  # ATR trailing stop; nan until the ATR is warm
+    realized = 0.0
+    events = []
+    stopped = False
+    bar_atr = BarAtr(atr_period)
+    last_price = first_price
+
+    for c0 in range(0, n, chunk):
+        ts = np.asarray(trades["ts"][c0:c0 + chunk], dtype=np.int64)
+        price = np.asarray(trades["price"][c0:c0 + chunk], dtype=np.float64)
+        atr = bar_atr.per_trade(ts, price)
+        trail = price - atr_multiplier * atr
+        with np.errstate(invalid="ignore"):
+            target = np.where(np.isnan(atr), target_pct,
+                              np.maximum(target_pct, atr_multiplier * atr / price / 2))
+
+        i = 0
+        while i < len(price) and not stopped:
+            j = min(i + scan, len(price))
+            p = price[i:j]
+            # Trailing stop as of each trade: running max of the trail, from the current stop
+            path = np.fmax.accumulate(np.concatenate([[stop], trail[i:j]]))[1:]
+            value = qty * p + cash
+            with np.errstate(invalid="ignore"):
+                atr_hit = (qty > 0) & (p <= path)
+            port_hit = (qty > 0) & (value <= baseline * (1 - stop_loss_pct))
+            harvest = (qty > 0) & (value >= baseline * (1 + target[i:j]))
+            harvest &= value - baseline >= min_notional
+            hit = atr_hit | port_hit | harvest
+            if not hit.any():
+                stop = path[-1]
+                i = j
+                continue
+
+            k = int(np.argmax(hit))
+            at = i + k
+            px = float(p[k])
+            t = int(ts[at])
+            if atr_hit[k] or port_hit[k]:
+                proceeds = qty * px * keep
+                cash += proceeds
+                realized += cash - baseline
+                events.append(("ATR_STOP" if atr_hit[k] else "STOP", t, px, qty, proceeds, realized))
+                qty = 0.0
+                stopped = True
+            else:
+                sell_qty = (value[k] - baseline) / px
+                proceeds = sell_qty * px * keep
+                realized += proceeds - sell_qty * entry
+                cash += proceeds
+                qty -= sell_qty
+                events.append(("HARVEST", t, px, sell_qty, proceeds, realized))
+                baseline = qty * px + cash
+                entry = px
+                stop = px - atr_multiplier * atr[at]  # reset, as the bot does
+            i = at + 1
+        last_price = float(price[-1])
+        if stopped:
+            last_price = events[-1][2]
+            break
+
+    equity = cash + qty * last_price
+    return {
+        "final_qty": qty,
+        "realized": realized,
+        "equity": equity,
+        "pnl": equity - initial_qty * first_price,
+        "stopped": stopped,
+        "trades": events,
+        "ticks": n,
+    }
+
+
+def _date_ms(value):
+    return int(datetime.strptime(value, "%Y-%m-%d").timestamp() * 1000) if value else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--symbol", default=os.getenv("SYMBOL", "BNBUSDT"))
+    parser.add_argument("--trades", default=None, help="trade store file (default: by symbol)")
+    parser.add_argument("--start", default=None, help="YYYY-MM-DD")
+    parser.add_argument("--end", default=None, help="YYYY-MM-DD")
+    parser.add_argument("--target", type=float, default=TARGET_PCT)
+    parser.add_argument("--stop", type=float, default=STOP_LOSS_PCT)
+    parser.add_argument("--atr-mult", type=float, default=ATR_MULTIPLIER)
+    parser.add_argument("--qty", type=float, default=1.0)
+    parser.add_argument("--chunk", type=int, default=CHUNK)
+    args = parser.parse_args()
+
+    trades = open_trades(args.trades or trade_store_path(args.symbol))
+    # ts is sorted, so date bounds are a slice of the mapping rather than a copy
+    lo = np.searchsorted(trades["ts"], _date_ms(args.start)) if args.start else 0
+    hi = np.searchsorted(trades["ts"], _date_ms(args.end)) if args.end else len(trades)
+    trades = trades[lo:hi]
+    if len(trades) == 0:
+        print("No trades in the store for that range (run app2/ingest.py --agg-trades)")
+        return
+
+    started = time.time()
+    result = simulate_ticks(
+        trades, initial_qty=args.qty, target_pct=args.target, stop_loss_pct=args.stop,
+        atr_multiplier=args.atr_mult, chunk=args.chunk,
+    )
+    elapsed = time.time() - started
+    print(f"{result['ticks']} trades in {elapsed:.1f}s ({result['ticks'] / max(elapsed, 1e-9):,.0f}/s)")
+    print("Final qty:", result["final_qty"])
+    print("Realized P&L (USDT):", result["realized"])
+    print("P&L vs hold (USDT):", result["pnl"])
+    for ttype, ts, p, q, proceeds, cum in result["trades"]:
+        dt = datetime.utcfromtimestamp(ts / 1000).strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{dt} {ttype} price={p:.4f} qty={q:.6f} proceeds={proceeds:.2f} cum={cum:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Walk-forward optimization for the Harvester strategy.
+
+The cached candles are split into rolling windows: parameters are optimized
+on each in-sample window with the vectorized grid engine, then evaluated on
+the out-of-sample window that follows. Windows run in parallel worker
+processes and each result is appended to a JSON-lines file as it finishes.
+Workers memory-map the binary candle store, so they share the page cache.
+
+Usage:
+    python app2/walkforward.py --candles data/candles_BNBUSDT_1m.bin \
+        --in-sample 20160 --out-sample 4320 --out results/walkforward.jsonl
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from backtester_harvester import simulate, simulate_grid
+from candle_store import open_candles
+
+_CLOSES = None
+_TIMESTAMPS = None
+
+
+def load_candles(path):
+    """Memory-map close prices and open times from a candle store file."""
+    candles = open_candles(path)
+    return candles["close"], candles["ts"]
+
+
+def make_windows(n, in_sample, out_sample, step=None):
+    """(is_start, is_end, oos_end) index triples for rolling windows."""
+    step = step or out_sample
+    windows = []
+    start = 0
+    while start + in_sample + out_sample <= n:
+        windows.append((start, start + in_sample, start + in_sample + out_sample))
+        start += step
+    return windows
+
+
+def _init_worker(path):
+    global _CLOSES, _TIMESTAMPS
+    _CLOSES, _TIMESTAMPS = load_candles(path)
+
+
+def run_window(window_id, bounds, grid, objective="pnl"):
+    """Optimize on the in-sample slice, then score the best params out of sample."""
+    is_start, is_end, oos_end = bounds
+    targets = [g[0] for g in grid]
+    stops = [g[1] for g in grid]
+
+    started = time.time()
+    fit = simulate_grid(_CLOSES[is_start:is_end], targets, stops)
+    best = int(np.argmax(fit[objective]))
+    target_pct, stop_loss_pct = grid[best]
+
+    oos = simulate(
+        _CLOSES[is_end:oos_end].tolist(),
+        _TIMESTAMPS[is_end:oos_end].tolist(),
+        target_pct=target_pct,
+        stop_loss_pct=stop_loss_pct,
+    )
+    return {
+        "window": window_id,
+        "in_sample": [int(_TIMESTAMPS[is_start]), int(_TIMESTAMPS[is_end - 1])],
+        "out_sample": [int(_TIMESTAMPS[is_end]), int(_TIMESTAMPS[oos_end - 1])],
+        "target_pct": target_pct,
+        "stop_loss_pct": stop_loss_pct,
+        "is_pnl": float(fit["pnl"][best]),
+        "oos_pnl": oos["pnl"],
+        "oos_stopped": oos["stopped"],
+        "oos_trades": len(oos["trades"]),
+        "elapsed_sec": round(time.time() - started, 3),
+    }
+
+
+def walk_forward(path, in_sample, out_sample, grid, out_path, step=None, workers=None):
+    """Run all windows in a process pool, streaming results to out_path."""
+    closes, _ = load_candles(path)
+    windows = make_windows(len(closes), in_sample, out_sample, step)
+    if not windows:
+        raise ValueError(
+            f"Not enough candles ({len(closes)}) for in_sample={in_sample} out_sample={out_sample}"
+        )
+
+    directory = os.path.dirname(out_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    results = []
+    with open(out_path, "w") as out, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(path,)
+    ) as pool:
+        futures = [
+            pool.submit(run_window, i, bounds, grid) for i, bounds in enumerate(windows)
+        ]
+        for fut in as_completed(futures):
+            res = fut.result()
+            out.write(json.dumps(res) + "\n")
+            out.flush()
+            results.append(res)
+            print(
+                f"window {res['window']:4d} target={res['target_pct']:.4f} "
+                f"stop={res['stop_loss_pct']:.4f} is={res['is_pnl']:.2f} oos={res['oos_pnl']:.2f}"
+            )
+
+    results.sort(key=lambda r: r["window"])
+    return results
+
+
+def parse_floats(value):
+    return [float(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--candles", required=True, help="binary candle store file")
+    parser.add_argument("--in-sample", type=int, default=7 * 1440, help="candles per in-sample window")
+    parser.add_argument("--out-sample", type=int, default=1440, help="candles per out-of-sample window")
+    parser.add_argument("--step", type=int, default=None, help="window step (default: out-sample)")
+    parser.add_argument("--targets", type=parse_floats, default=parse_floats("0.0025,0.005,0.0075,0.01,0.015,0.02"))
+    parser.add_argument("--stops", type=parse_floats, default=parse_floats("0.02,0.05,0.1,0.15"))
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="results/walkforward.jsonl")
+    args = parser.parse_args()
+
+    grid = list(itertools.product(args.targets, args.stops))
+    started = time.time()
+    results = walk_forward(
+        args.candles, args.in_sample, args.out_sample, grid, args.out,
+        step=args.step, workers=args.workers,
+    )
+    total = sum(r["oos_pnl"] for r in results)
+    print(f"{len(results)} windows, grid={len(grid)}, total OOS P&L={total:.2f} "
+          f"({time.time() - started:.1f}s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
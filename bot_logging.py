@@ -0,0 +1,141 @@
+"""
+Leveled, rate-limited logging with a background writer.
+
+The trading loop calls log() on every tick; formatting timestamps and
+printing synchronously puts I/O on the decision path. BotLogger keeps the
+calling side cheap:
+- lines below the configured level are discarded before any formatting
+- a line logged with a key (e.g. "trailing-stop") is emitted at most once per
+  rate-limit interval; the next emitted line says how many were suppressed
+- accepted lines go into a bounded buffer with a non-blocking put, and a
+  writer thread formats timestamps and writes them in batches
+
+If the buffer is full, lines are dropped and counted instead of blocking the
+loop. The writer reports the count. Until start() is called (or under a
+simulated clock), lines are written synchronously.
+"""
+
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+from clock import SYSTEM_CLOCK
+
+DEBUG, INFO, WARNING, ERROR = 10, 20, 30, 40
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_RATE_LIMIT_SEC = float(os.getenv("LOG_RATE_LIMIT_SEC", "60"))
+LOG_BUFFER = int(os.getenv("LOG_BUFFER", "10000"))
+LOG_FILE = os.getenv("LOG_FILE", "")  # empty = stdout
+
+
+def format_line(ts, msg):
+    return f"[{datetime.fromtimestamp(ts, timezone.utc).isoformat()}] {msg}"
+
+
+class BotLogger:
+    """log(msg, level, key) for the hot loop; I/O happens on a writer thread."""
+
+    def __init__(
+        self,
+        level=LOG_LEVEL,
+        rate_limit_sec=LOG_RATE_LIMIT_SEC,
+        max_buffer=LOG_BUFFER,
+        stream=None,
+        path=LOG_FILE,
+        clock=SYSTEM_CLOCK,
+    ):
+        self.level = LEVELS.get(level, INFO) if isinstance(level, str) else level
+        self.rate_limit_sec = rate_limit_sec
+        self.clock = clock
+        self.path = path
+        self._stream = stream
+        self._last_emit = {}  # key -> time of the last emitted line
+        self._suppressed = {}  # key -> lines skipped since then
+        self._buffer = queue.Queue(maxsize=max_buffer)
+        self._thread = None
+        self.dropped = 0
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def log(self, msg, level=INFO, key=None, now=None):
+        if level < self.level:
+            return
+        if now is None:
+            now = self.clock.time()
+        if key is not None:
+            last = self._last_emit.get(key)
+            if last is not None and now - last < self.rate_limit_sec:
+                self._suppressed[key] = self._suppressed.get(key, 0) + 1
+                return
+            self._last_emit[key] = now
+            skipped = self._suppressed.pop(key, 0)
+            if skipped:
+                msg = f"{msg} (+{skipped} similar suppressed)"
+        if self._thread is None:
+            self._write([(now, msg)])
+            return
+        try:
+            self._buffer.put_nowait((now, msg))
+        except queue.Full:
+            self.dropped += 1
+
+    def debug(self, msg, key=None):
+        self.log(msg, DEBUG, key)
+
+    def warning(self, msg, key=None):
+        self.log(msg, WARNING, key)
+
+    def error(self, msg, key=None):
+        self.log(msg, ERROR, key)
+
+    # ----- writer -----
+
+    def _out(self):
+        if self._stream is None:
+            self._stream = open(self.path, "a", buffering=1) if self.path else sys.stdout
+        return self._stream
+
+    def _write(self, records):
+        out = self._out()
+        out.write("".join(format_line(ts, msg) + "\n" for ts, msg in records))
+        out.flush()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout=2.0):
+        """Drain the buffer and stop the writer."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._buffer.put(None)
+            thread.join(timeout)
+
+    def _run(self):
+        reported_drops = 0
+        while True:
+            records = [self._buffer.get()]
+            while len(records) < 500:
+                try:
+                    records.append(self._buffer.get_nowait())
+                except queue.Empty:
+                    break
+            done = None in records
+            records = [r for r in records if r is not None]
+            if self.dropped > reported_drops:
+                records.append(
+                    (self.clock.time(), f"Log buffer full: {self.dropped - reported_drops} lines dropped")
+                )
+                reported_drops = self.dropped
+            if records:
+                try:
+                    self._write(records)
+                except Exception:
+                    pass
+            if done:
+                return
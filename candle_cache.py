@@ -0,0 +1,208 @@
+"""
+Local kline cache for indicator warmup.
+
+Klines are persisted in the raw list format returned by client.get_klines,
+so the bot can compute ATR at startup without a REST round trip. A background
+thread tops the cache up incrementally and publishes fresh ATR values.
+"""
+
+import json
+import os
+import threading
+from decimal import Decimal
+
+from clock import SYSTEM_CLOCK
+
+CANDLE_CACHE_DIR = os.getenv("CANDLE_CACHE_DIR", "data")
+CACHE_MAX_KLINES = int(os.getenv("CACHE_MAX_KLINES", "1000"))
+
+INTERVAL_MS = {
+    "1m": 60_000,
+    "3m": 180_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+}
+
+
+def cache_path(symbol, interval, cache_dir=None):
+    """Path of the cache file for a symbol/interval pair."""
+    return os.path.join(cache_dir or CANDLE_CACHE_DIR, f"klines_{symbol}_{interval}.json")
+
+
+def compute_atr(klines, period):
+    """Average True Range over the last period+1 klines (simple mean of TR)."""
+    if len(klines) < period + 1:
+        raise ValueError(
+            f"Insufficient kline data: got {len(klines)}, need {period + 1}"
+        )
+    klines = klines[-(period + 1):]
+
+    highs = [Decimal(str(k[2])) for k in klines]
+    lows = [Decimal(str(k[3])) for k in klines]
+    closes = [Decimal(str(k[4])) for k in klines]
+
+    trs = []
+    for i in range(1, len(klines)):
+        tr = max(
+            highs[i] - lows[i],
+            abs(highs[i] - closes[i - 1]),
+            abs(lows[i] - closes[i - 1]),
+        )
+        trs.append(tr)
+
+    if not trs:
+        raise ValueError("No TR values calculated")
+
+    return sum(trs) / Decimal(len(trs))
+
+
+class KlineCache:
+    """Klines for one symbol/interval, kept sorted by open time."""
+
+    def __init__(
+        self, symbol, interval, path=None, max_klines=CACHE_MAX_KLINES, clock=SYSTEM_CLOCK
+    ):
+        self.symbol = symbol
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.path = path or cache_path(symbol, interval)
+        self.max_klines = max_klines
+        self.clock = clock
+        self.klines = []
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Load klines from disk. Returns the number of klines loaded."""
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        with self._lock:
+            self.klines = []
+            self._merge_locked(data)
+            return len(self.klines)
+
+    def save(self):
+        """Write klines to disk atomically."""
+        with self._lock:
+            data = list(self.klines)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def merge(self, new_klines):
+        """Merge klines by open time; newer rows replace older partial candles."""
+        with self._lock:
+            self._merge_locked(new_klines)
+
+    def _merge_locked(self, new_klines):
+        by_open = {k[0]: k for k in self.klines}
+        for k in new_klines:
+            by_open[k[0]] = k
+        merged = [by_open[t] for t in sorted(by_open)]
+        self.klines = merged[-self.max_klines:]
+
+    def last_open_time(self):
+        with self._lock:
+            return self.klines[-1][0] if self.klines else None
+
+    def age_sec(self, now=None):
+        """Seconds since the last cached candle closed (None if empty)."""
+        last = self.last_open_time()
+        if last is None:
+            return None
+        now_ms = (now if now is not None else self.clock.time()) * 1000
+        return max(0.0, (now_ms - (last + self.interval_ms)) / 1000)
+
+    def top_up(self, client, limit=1000):
+        """Fetch only the klines missing since the last cached candle."""
+        last = self.last_open_time()
+        now_ms = int(self.clock.time() * 1000)
+        if last is None or (now_ms - last) // self.interval_ms >= limit:
+            # Empty or too far behind: the latest page is all we can use
+            klines = client.get_klines(
+                symbol=self.symbol, interval=self.interval, limit=limit
+            )
+        else:
+            klines = client.get_klines(
+                symbol=self.symbol,
+                interval=self.interval,
+                startTime=last,
+                limit=limit,
+            )
+        self.merge(klines)
+        return len(klines)
+
+    def atr(self, period):
+        """ATR from cached klines, or None if the cache is too short."""
+        with self._lock:
+            klines = list(self.klines[-(period + 1):])
+        try:
+            return compute_atr(klines, period)
+        except ValueError:
+            return None
+
+
+class AtrRefresher(threading.Thread):
+    """Background thread that tops up a KlineCache and publishes ATR."""
+
+    def __init__(
+        self, client, cache, period, interval_sec=300, retry_sec=30, log=print, clock=SYSTEM_CLOCK
+    ):
+        super().__init__(name="atr-refresher", daemon=True)
+        self.client = client
+        self.cache = cache
+        self.period = period
+        self.interval_sec = interval_sec
+        self.retry_sec = retry_sec
+        self.log = log
+        self.clock = clock
+        self._latest = (None, 0.0)  # (atr, updated_at)
+        self._next_run = 0.0
+        self._stop_event = threading.Event()
+
+    @property
+    def latest(self):
+        """Most recent (atr, updated_at) pair published by the thread."""
+        return self._latest
+
+    def refresh(self):
+        """Top up the cache once and publish a new ATR value."""
+        fetched = self.cache.top_up(self.client)
+        self.cache.save()
+        atr = self.cache.atr(self.period)
+        if atr is None:
+            raise ValueError(f"Insufficient kline data after top-up ({fetched} fetched)")
+        self._latest = (atr, self.clock.time())
+        return atr
+
+    def _refresh_scheduled(self):
+        """Refresh once; returns seconds until the next attempt."""
+        try:
+            self.refresh()
+            return self.interval_sec
+        except Exception as e:
+            self.log(f"ATR top-up failed: {e}")
+            return min(self.retry_sec, self.interval_sec)
+
+    def run_pending(self):
+        """Refresh inline if due (used instead of the thread under a simulated clock)."""
+        now = self.clock.time()
+        if now >= self._next_run:
+            self._next_run = now + self._refresh_scheduled()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._stop_event.wait(self._refresh_scheduled())
+
+    def stop(self):
+        self._stop_event.set()
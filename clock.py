@@ -0,0 +1,65 @@
+"""
+Injectable clocks for the trading loop.
+
+Everything in the loop that reads the time or waits goes through a clock
+object: the CHECK_INTERVAL sleeps, post-trade waits, retry backoff, ATR
+refresh scheduling and periodic reports. SystemClock is wall-clock time.
+SimulatedClock returns a virtual time that sleep() advances instantly, so a
+day of trading can be replayed in seconds against a mocked client or in a
+backtest that reuses the real loop.
+
+Background timer threads cannot follow virtual time. When
+clock.background is False, periodic jobs are not started as threads; the
+loop calls their run_pending() methods inline instead.
+"""
+
+import threading
+import time
+
+
+class SystemClock:
+    """Wall-clock time."""
+
+    background = True
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimulatedClock:
+    """Virtual time; sleep() advances it instantly."""
+
+    background = False
+
+    def __init__(self, start=0.0):
+        self._now = float(start)
+        self._lock = threading.Lock()
+        self.slept = 0.0  # total virtual seconds spent sleeping
+
+    def time(self):
+        return self._now
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._now += seconds
+            self.slept += seconds
+
+    def advance(self, seconds):
+        """Move time forward without counting it as sleep."""
+        with self._lock:
+            self._now += seconds
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -0,0 +1,99 @@
+"""
+Continuous clock-drift tracking against Binance server time.
+
+A background thread samples get_server_time periodically. Each sample gives
+an offset estimate (server time minus the local midpoint of the round trip)
+whose error is bounded by half the RTT, so the tracker keeps a short window
+of samples and trusts the one with the smallest RTT. The applied offset is
+slewed towards that estimate a few ms per sample; only large errors are
+stepped at once. The estimate is biased back by half the best RTT so signed
+timestamps never run ahead of the server clock, which would get them
+rejected with -1021.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class ClockDriftTracker(threading.Thread):
+    """Keeps client.timestamp_offset in line with the exchange clock."""
+
+    def __init__(
+        self,
+        client,
+        interval_sec=60,
+        window=10,
+        max_slew_ms=50,
+        step_threshold_ms=1000,
+        log=print,
+    ):
+        super().__init__(name="clock-drift", daemon=True)
+        self.client = client
+        self.interval_sec = interval_sec
+        self.max_slew_ms = max_slew_ms
+        self.step_threshold_ms = step_threshold_ms
+        self.log = log
+        self.samples = deque(maxlen=window)  # (offset_ms, rtt_ms)
+        self.applied_ms = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def add_sample(self, offset_ms, rtt_ms):
+        with self._lock:
+            self.samples.append((offset_ms, rtt_ms))
+
+    def sample(self):
+        """Measure one offset/RTT pair against the server clock."""
+        t0 = time.time()
+        server_time = self.client.get_server_time()["serverTime"]
+        t1 = time.time()
+        rtt_ms = (t1 - t0) * 1000
+        self.add_sample(server_time - (t0 + t1) * 500, rtt_ms)
+        return rtt_ms
+
+    def estimate(self):
+        """Offset from the lowest-RTT sample, biased so we never run ahead."""
+        with self._lock:
+            if not self.samples:
+                return None
+            offset_ms, rtt_ms = min(self.samples, key=lambda s: s[1])
+        return offset_ms - rtt_ms / 2
+
+    def apply(self, step=False):
+        """Move the applied offset towards the estimate. Returns the new offset."""
+        target = self.estimate()
+        if target is None:
+            return self.applied_ms
+        with self._lock:
+            if self.applied_ms is None or step:
+                self.applied_ms = target
+            else:
+                delta = target - self.applied_ms
+                if abs(delta) > self.step_threshold_ms:
+                    self.applied_ms = target
+                else:
+                    limit = self.max_slew_ms
+                    self.applied_ms += max(-limit, min(limit, delta))
+            self.client.timestamp_offset = int(self.applied_ms)
+            return self.client.timestamp_offset
+
+    def resync(self):
+        """Sample now and step straight to the estimate (after a -1021)."""
+        with self._lock:
+            self.samples.clear()
+        self.sample()
+        offset = self.apply(step=True)
+        self.log(f"Clock resynced: offset {offset} ms")
+        return offset
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            try:
+                self.sample()
+                self.apply()
+            except Exception as e:
+                self.log(f"Clock drift sample failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()
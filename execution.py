@@ -0,0 +1,179 @@
+"""
+Sliced execution of large sells.
+
+A parent sell is split into child market orders sized from the local order
+book (a participation fraction of the bid depth within a slippage band) or
+capped by a maximum child notional. Children run on a background thread,
+spaced by a fixed interval (TWAP-style), so the trading loop keeps running
+while the parent works. Each child respects stepSize, minQty and
+minNotional, and a remainder too small to sell on its own is folded into
+the last child. Fills are aggregated into a REST-style order result.
+"""
+
+import threading
+from decimal import Decimal, ROUND_DOWN, ROUND_UP
+
+from clock import SYSTEM_CLOCK
+
+
+def _to_step(qty, step_size, rounding=ROUND_DOWN):
+    if qty <= 0 or step_size <= 0:
+        return Decimal("0")
+    return (qty / step_size).quantize(Decimal("1"), rounding=rounding) * step_size
+
+
+class ParentOrder:
+    """A working parent sell. Poll done() or block on result()."""
+
+    def __init__(self, total_qty, ref_price, child_interval):
+        self.total_qty = total_qty
+        self.ref_price = ref_price
+        self.child_interval = child_interval
+        self.executed_qty = Decimal("0")
+        self.fills = []
+        self.children = 0
+        self.error = None
+        self._cancelled = threading.Event()
+        self._done = threading.Event()
+
+    def cancel(self):
+        """Stop sending new children; an in-flight child still completes."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        """Aggregate fills like a single order response. Raises if nothing filled."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("parent order still working")
+        if self.executed_qty <= 0 and self.error is not None:
+            raise self.error
+        if self.executed_qty >= self.total_qty:
+            status = "FILLED"
+        else:
+            status = "PARTIALLY_FILLED"
+        return {
+            "status": status,
+            "executedQty": str(self.executed_qty),
+            "fills": list(self.fills),
+            "children": self.children,
+            "error": str(self.error) if self.error else None,
+        }
+
+    def _record(self, response, child_qty):
+        executed = Decimal(str(response.get("executedQty", child_qty))) if response else child_qty
+        fills = response.get("fills") if response else None
+        if fills:
+            self.fills.extend(fills)
+        elif executed > 0:
+            # No fill detail (e.g. DRY_RUN): assume the reference price
+            self.fills.append({"price": str(self.ref_price), "qty": str(executed)})
+        self.executed_qty += executed
+        self.children += 1
+        return executed
+
+
+class ExecutionEngine:
+    """Splits parent sells into child market orders executed in the background."""
+
+    def __init__(
+        self,
+        send_child,
+        step_size,
+        min_notional,
+        min_qty=None,
+        book=None,
+        participation=Decimal("0.25"),
+        max_slippage_pct=0.001,
+        max_child_notional=None,
+        child_interval=1.0,
+        log=print,
+        clock=SYSTEM_CLOCK,
+    ):
+        self.send_child = send_child
+        self.step_size = step_size
+        self.min_notional = min_notional
+        self.min_qty = min_qty or Decimal("0")
+        self.book = book
+        self.participation = participation
+        self.max_slippage_pct = max_slippage_pct
+        self.max_child_notional = max_child_notional
+        self.child_interval = child_interval
+        self.log = log
+        self.clock = clock
+
+    def min_child_qty(self, price):
+        by_notional = _to_step(self.min_notional / price, self.step_size, ROUND_UP)
+        return max(self.min_qty, by_notional)
+
+    def child_qty(self, remaining, price):
+        """Size of the next child given what is left and the current book."""
+        size = remaining
+        if self.book is not None and self.book.synced:
+            depth = Decimal(str(self.book.bid_depth(self.max_slippage_pct)))
+            size = min(size, depth * self.participation)
+        if self.max_child_notional:
+            size = min(size, self.max_child_notional / price)
+        size = _to_step(size, self.step_size)
+
+        floor_qty = self.min_child_qty(price)
+        size = max(size, floor_qty)
+        if remaining - size < floor_qty:
+            size = remaining  # fold an unsellable remainder into this child
+        return min(size, remaining)
+
+    def submit(self, quantity, price, child_interval=None):
+        """Start working a parent sell. Returns a ParentOrder immediately.
+
+        child_interval overrides the spacing between children (stops use 0).
+        """
+        if child_interval is None:
+            child_interval = self.child_interval
+        parent = ParentOrder(_to_step(quantity, self.step_size), price, child_interval)
+        thread = threading.Thread(
+            target=self._work, args=(parent,), name="execution", daemon=True
+        )
+        thread.start()
+        return parent
+
+    def _work(self, parent):
+        try:
+            while not parent.cancelled:
+                remaining = parent.total_qty - parent.executed_qty
+                if remaining <= 0:
+                    break
+                price = self._reference_price(parent.ref_price)
+                qty = self.child_qty(remaining, price)
+                if qty <= 0:
+                    break
+                try:
+                    response = self.send_child(qty)
+                except Exception as e:
+                    parent.error = e
+                    self.log(f"Child order failed after {parent.children} children: {e}")
+                    break
+                if parent._record(response, qty) <= 0:
+                    parent.error = RuntimeError("child order executed nothing")
+                    break
+                if parent.executed_qty < parent.total_qty and not parent.cancelled:
+                    self.clock.sleep(parent.child_interval)
+        finally:
+            parent._done.set()
+        self.log(
+            f"Parent sell done: {parent.executed_qty}/{parent.total_qty} in {parent.children} children"
+        )
+
+    def _reference_price(self, fallback):
+        if self.book is not None and self.book.synced:
+            bid = self.book.best_bid()
+            if bid:
+                return Decimal(str(bid))
+        return fallback
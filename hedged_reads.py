@@ -0,0 +1,157 @@
+"""
+Hedged REST reads across Binance's equivalent base URLs.
+
+Binance serves the same REST API from api.binance.com and api1-api4. A
+HedgedReader keeps one python-binance Client per endpoint and, for each
+read, sends it to the endpoint currently ranked fastest. If no answer comes
+within that endpoint's p95 latency, a backup copy goes to the next endpoint.
+The first successful response wins. The slower request is left to finish
+in the background, and its latency still feeds the ranking.
+
+The ranking is an EWMA of observed latency per endpoint. A failure counts as
+a slow sample so a flaky endpoint drops down the list. Endpoints with few
+samples are ranked first so every endpoint gets measured. Only use this for
+idempotent reads (price, balances, order status). Orders must never be
+hedged.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from binance.client import Client
+
+# base_endpoint suffixes: "" -> api.binance.com, "1" -> api1.binance.com, ...
+DEFAULT_ENDPOINTS = ("", "1", "2", "3", "4")
+
+
+class EndpointStats:
+    """Online latency statistics for one endpoint."""
+
+    def __init__(self, name, window=200, alpha=0.1):
+        self.name = name
+        self.alpha = alpha
+        self.samples = deque(maxlen=window)
+        self.ewma = None
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency):
+        with self._lock:
+            self.samples.append(latency)
+            if self.ewma is None:
+                self.ewma = latency
+            else:
+                self.ewma += self.alpha * (latency - self.ewma)
+
+    def p95(self):
+        with self._lock:
+            if not self.samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+
+class HedgedReader:
+    """Races idempotent reads across endpoints, hedging at the primary's p95."""
+
+    def __init__(
+        self,
+        base_client,
+        clients,
+        default_hedge_sec=0.5,
+        min_hedge_sec=0.05,
+        min_samples=20,
+        failure_penalty_sec=5.0,
+        log=print,
+    ):
+        self.base_client = base_client  # source of the synced timestamp offset
+        self.clients = clients  # endpoint name -> Client
+        self.stats = {name: EndpointStats(name) for name in clients}
+        self.default_hedge_sec = default_hedge_sec
+        self.min_hedge_sec = min_hedge_sec
+        self.min_samples = min_samples
+        self.failure_penalty_sec = failure_penalty_sec
+        self.log = log
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._pool = ThreadPoolExecutor(max_workers=2 * len(clients), thread_name_prefix="hedged")
+
+    @classmethod
+    def for_endpoints(cls, base_client, api_key, api_secret, endpoints=DEFAULT_ENDPOINTS, **kwargs):
+        clients = {
+            f"api{suffix}": Client(api_key, api_secret, base_endpoint=suffix, ping=False)
+            for suffix in endpoints
+        }
+        return cls(base_client, clients, **kwargs)
+
+    def ranking(self):
+        """Endpoint names, fastest first; under-sampled endpoints are explored first."""
+
+        def key(name):
+            stats = self.stats[name]
+            if len(stats.samples) < self.min_samples:
+                return (0, len(stats.samples))
+            return (1, stats.ewma)
+
+        return sorted(self.clients, key=key)
+
+    def hedge_delay(self, name):
+        stats = self.stats[name]
+        if len(stats.samples) < self.min_samples:
+            return self.default_hedge_sec
+        return max(self.min_hedge_sec, stats.p95())
+
+    def _timed(self, name, method, kwargs):
+        client = self.clients[name]
+        client.timestamp_offset = self.base_client.timestamp_offset
+        started = time.monotonic()
+        try:
+            result = getattr(client, method)(**kwargs)
+        except Exception:
+            self.stats[name].errors += 1
+            self.stats[name].record(self.failure_penalty_sec)
+            raise
+        self.stats[name].record(time.monotonic() - started)
+        return name, result
+
+    def call(self, method, **kwargs):
+        """Run client.<method>(**kwargs), hedged across the two best endpoints."""
+        ranked = self.ranking()
+        futures = {self._pool.submit(self._timed, ranked[0], method, kwargs)}
+        done, _ = wait(futures, timeout=self.hedge_delay(ranked[0]))
+        if not done and len(ranked) > 1:
+            self.hedges += 1
+            futures.add(self._pool.submit(self._timed, ranked[1], method, kwargs))
+
+        last_error = None
+        pending = futures
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                try:
+                    name, result = fut.result()
+                except Exception as e:
+                    last_error = e
+                    if not pending and len(futures) == 1 and len(ranked) > 1:
+                        # Primary failed before the hedge fired: try the backup now
+                        self.hedges += 1
+                        pending = {self._pool.submit(self._timed, ranked[1], method, kwargs)}
+                        futures = futures | pending
+                    continue
+                if name != ranked[0]:
+                    self.hedge_wins += 1
+                return result
+        raise last_error
+
+    def summary(self):
+        parts = []
+        for name in self.ranking():
+            stats = self.stats[name]
+            if stats.ewma is not None:
+                parts.append(f"{name} {stats.ewma * 1000:.0f}ms/p95 {stats.p95() * 1000:.0f}ms")
+        return ", ".join(parts) + f" | hedges {self.hedges}, backup wins {self.hedge_wins}"
+
+    def close(self):
+        self._pool.shutdown(wait=False)
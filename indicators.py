@@ -0,0 +1,178 @@
+"""
+Streaming multi-timeframe indicators built from a single trade stream.
+
+Trades are aggregated into 1m, 5m and 1h candles locally, so no extra REST
+calls are needed per timeframe. On every bar close the ATR (Wilder), EMA and
+realized volatility for that timeframe are updated in O(1) and published as
+an immutable snapshot for the strategy step to read.
+
+The stream usually starts mid-bar. That first bar only holds the trades seen
+since, so its range understates the bar; it is dropped, not fed to the ATR.
+"""
+
+import math
+import threading
+from collections import deque
+
+TIMEFRAMES = {"1m": 60_000, "5m": 300_000, "1h": 3_600_000}
+
+
+class CandleAggregator:
+    """Builds OHLCV candles of a fixed interval from individual trades."""
+
+    def __init__(self, interval_ms):
+        self.interval_ms = interval_ms
+        self.current = None
+
+    def add_trade(self, price, qty, ts_ms):
+        """Add a trade. Returns the candle it closed, or None."""
+        open_time = ts_ms - (ts_ms % self.interval_ms)
+        bar = self.current
+        if bar is not None and open_time < bar["open_time"]:
+            return None  # late trade for an already closed candle
+        if bar is not None and open_time == bar["open_time"]:
+            if price > bar["high"]:
+                bar["high"] = price
+            if price < bar["low"]:
+                bar["low"] = price
+            bar["close"] = price
+            bar["volume"] += qty
+            return None
+
+        self.current = {
+            "open_time": open_time,
+            "open": price,
+            "high": price,
+            "low": price,
+            "close": price,
+            "volume": qty,
+        }
+        return bar
+
+
+class StreamingIndicators:
+    """ATR, EMA and realized volatility updated once per closed candle."""
+
+    def __init__(self, atr_period=14, ema_period=20, vol_window=30):
+        self.atr_period = atr_period
+        self.ema_alpha = 2.0 / (ema_period + 1)
+        self.vol_window = vol_window
+        self.atr = None
+        self.ema = None
+        self.prev_close = None
+        self.bars = 0
+        self._tr_seed = []
+        self._returns = deque(maxlen=vol_window)
+        self._ret_sum = 0.0
+        self._ret_sq_sum = 0.0
+
+    def update(self, high, low, close):
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        # Wilder smoothing after a simple-mean seed of atr_period bars
+        if self.atr is None:
+            self._tr_seed.append(tr)
+            if len(self._tr_seed) == self.atr_period:
+                self.atr = sum(self._tr_seed) / self.atr_period
+                self._tr_seed = []
+        else:
+            self.atr += (tr - self.atr) / self.atr_period
+
+        if self.ema is None:
+            self.ema = close
+        else:
+            self.ema += self.ema_alpha * (close - self.ema)
+
+        if self.prev_close and close > 0:
+            r = math.log(close / self.prev_close)
+            if len(self._returns) == self._returns.maxlen:
+                old = self._returns[0]
+                self._ret_sum -= old
+                self._ret_sq_sum -= old * old
+            self._returns.append(r)
+            self._ret_sum += r
+            self._ret_sq_sum += r * r
+
+        self.prev_close = close
+        self.bars += 1
+
+    @property
+    def realized_vol(self):
+        """Standard deviation of per-bar log returns over the window."""
+        n = len(self._returns)
+        if n < 2:
+            return None
+        mean = self._ret_sum / n
+        var = (self._ret_sq_sum - n * mean * mean) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+    def snapshot(self):
+        return {
+            "atr": self.atr,
+            "ema": self.ema,
+            "realized_vol": self.realized_vol,
+            "close": self.prev_close,
+            "bars": self.bars,
+        }
+
+
+class IndicatorPipeline:
+    """Feeds one trade stream into per-timeframe candles and indicators."""
+
+    def __init__(self, atr_period=14, ema_period=20, vol_window=30, timeframes=None):
+        self.timeframes = dict(timeframes or TIMEFRAMES)
+        self._aggregators = {
+            tf: CandleAggregator(ms) for tf, ms in self.timeframes.items()
+        }
+        self._indicators = {
+            tf: StreamingIndicators(atr_period, ema_period, vol_window)
+            for tf in self.timeframes
+        }
+        self._lock = threading.Lock()
+        self._snapshot = {tf: ind.snapshot() for tf, ind in self._indicators.items()}
+        self._joined = {}  # tf -> open time of the bar the stream joined mid-way, or None
+        self.last_trade_ms = None
+
+    def seed(self, timeframe, klines):
+        """Warm a timeframe from closed klines (Binance list format)."""
+        with self._lock:
+            ind = self._indicators[timeframe]
+            for k in klines:
+                ind.update(float(k[2]), float(k[3]), float(k[4]))
+            self._publish()
+
+    def on_trade(self, price, qty, ts_ms):
+        with self._lock:
+            self.last_trade_ms = ts_ms
+            closed_any = False
+            for tf, agg in self._aggregators.items():
+                if tf not in self._joined:
+                    offset = ts_ms % agg.interval_ms
+                    self._joined[tf] = ts_ms - offset if offset else None
+                bar = agg.add_trade(price, qty, ts_ms)
+                if bar is None:
+                    continue
+                if bar["open_time"] == self._joined[tf]:
+                    self._joined[tf] = None
+                    continue  # partial first bar
+                self._indicators[tf].update(bar["high"], bar["low"], bar["close"])
+                closed_any = True
+            if closed_any:
+                self._publish()
+
+    def handle_trade_message(self, msg):
+        """Callback for ThreadedWebsocketManager.start_trade_socket."""
+        if msg.get("e") != "trade":
+            return
+        self.on_trade(float(msg["p"]), float(msg["q"]), int(msg["T"]))
+
+    def _publish(self):
+        # Replace the whole dict so readers never see a half-updated snapshot
+        self._snapshot = {tf: ind.snapshot() for tf, ind in self._indicators.items()}
+
+    def snapshot(self):
+        """Latest published indicators keyed by timeframe."""
+        return self._snapshot
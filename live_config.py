@@ -0,0 +1,159 @@
+"""
+Hot-reload of the strategy parameters.
+
+The tunables below are read from CONFIG_FILE (the same KEY=VALUE format as
+.env). A ConfigWatcher notices a change by the file's mtime, or on request
+(SIGHUP). It parses and validates the whole set, and an invalid file is
+logged and ignored as a unit. A valid set is handed over as one dict, which
+the trading loop applies between iterations, so an iteration never sees a
+mix of old and new values.
+
+Only parameters that are safe to change mid-run are reloadable. Keys,
+symbol, network and feature switches still need a restart; if they change
+in the file, the watcher logs that they were ignored.
+"""
+
+import os
+import signal
+import threading
+from decimal import Decimal, InvalidOperation
+
+from dotenv import dotenv_values
+
+from clock import SYSTEM_CLOCK
+
+CONFIG_RELOAD = os.getenv("CONFIG_RELOAD", "false").lower() in ("1", "true", "yes")
+CONFIG_FILE = os.getenv("CONFIG_FILE", ".env")
+CONFIG_POLL_SEC = float(os.getenv("CONFIG_POLL_SEC", "5"))
+
+REENTRY_STRATEGIES = ("none", "fixed_fraction", "limit_ladder")
+
+# name -> (parse, check, requirement shown when the check fails)
+TUNABLES = {
+    "CHECK_INTERVAL": (int, lambda v: v >= 1, "an integer >= 1"),
+    "TARGET_PCT": (Decimal, lambda v: 0 < v < 1, "between 0 and 1"),
+    "STOP_LOSS_PCT": (Decimal, lambda v: 0 < v < 1, "between 0 and 1"),
+    "ATR_MULTIPLIER": (Decimal, lambda v: v > 0, "positive"),
+    "REENTRY_STRATEGY": (str, lambda v: v in REENTRY_STRATEGIES, " or ".join(REENTRY_STRATEGIES)),
+    "REENTRY_FRACTION": (Decimal, lambda v: 0 <= v <= 1, "between 0 and 1"),
+}
+
+
+class ConfigError(ValueError):
+    """The config file has invalid values; nothing from it is applied."""
+
+
+def parse_tunables(raw):
+    """Parse and validate every tunable present in raw. Raises ConfigError."""
+    parsed, problems = {}, []
+    for name, (parse, check, requirement) in TUNABLES.items():
+        if raw.get(name) is None:
+            continue
+        text = raw[name].strip()
+        try:
+            value = parse(text)
+        except (ValueError, InvalidOperation):
+            problems.append(f"{name}={text!r} is not a valid {parse.__name__}")
+            continue
+        if not check(value):
+            problems.append(f"{name}={text!r} must be {requirement}")
+            continue
+        parsed[name] = value
+    if problems:
+        raise ConfigError("; ".join(problems))
+    return parsed
+
+
+class ConfigWatcher:
+    """Watches the config file; the loop collects validated changes with take()."""
+
+    def __init__(self, path, current, interval=CONFIG_POLL_SEC, log=print, clock=SYSTEM_CLOCK):
+        self.path = path
+        self.current = dict(current)  # values the loop is running with
+        self.interval = interval
+        self.log = log
+        self.clock = clock
+        self._raw = None  # last file contents seen
+        self._mtime = self._stat()
+        self._pending = None
+        self._reload_requested = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._next_check = clock.time() + interval
+        self._thread = None
+        if self._mtime is not None:
+            self._raw = dotenv_values(self.path)
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def request_reload(self):
+        """Re-read the file on the next check even if its mtime is unchanged (SIGHUP)."""
+        self._reload_requested = True
+
+    def check(self):
+        """Reload if the file changed. Returns the pending changes, if any."""
+        mtime = self._stat()
+        if mtime is None or (mtime == self._mtime and not self._reload_requested):
+            return self._pending
+        self._mtime = mtime
+        self._reload_requested = False
+        raw = dotenv_values(self.path)
+        try:
+            parsed = parse_tunables(raw)
+        except ConfigError as e:
+            self.log(f"Config reload rejected, keeping current settings: {e}")
+            return self._pending
+        if self._raw is not None:
+            fixed = sorted(
+                k for k in set(raw) | set(self._raw)
+                if k not in TUNABLES and raw.get(k) != self._raw.get(k)
+            )
+            if fixed:
+                self.log(f"Config changes that need a restart were ignored: {', '.join(fixed)}")
+        self._raw = raw
+        with self._lock:
+            base = dict(self.current)
+            if self._pending:
+                base.update(self._pending)
+            changes = {k: v for k, v in parsed.items() if base.get(k) != v}
+            if changes:
+                self._pending = {**(self._pending or {}), **changes}
+            return self._pending
+
+    def take(self):
+        """Hand over all validated changes at once (called between iterations)."""
+        with self._lock:
+            changes, self._pending = self._pending, None
+            if changes:
+                self.current.update(changes)
+            return changes
+
+    def run_pending(self):
+        """Check inline if due (used instead of the thread under a simulated clock)."""
+        now = self.clock.time()
+        if now >= self._next_check or self._reload_requested:
+            self._next_check = now + self.interval
+            self.check()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.log(f"Config check failed: {e}")
+
+    def install_sighup(self):
+        """SIGHUP re-reads the file. Must be called from the main thread."""
+        if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.request_reload())
@@ -20,6 +20,12 @@ from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 from dotenv import load_dotenv
 
+from live_config import CONFIG_FILE, CONFIG_RELOAD, TUNABLES, ConfigWatcher
+from md_daemon import MarketDataClient
+from order_ids import OrderIdAllocator, submit_idempotent
+from profiler import install as install_profiler
+from status_report import PeriodicReporter, StatusBoard, render_status_report
+
 # Load environment variables
 load_dotenv()
 
@@ -53,6 +59,25 @@ REENTRY_FRACTION = Decimal(os.getenv("REENTRY_FRACTION", "0.5"))
 LADDER_ORDERS = int(os.getenv("LADDER_ORDERS", "5"))
 LADDER_SPACING_MULTIPLIER = Decimal(os.getenv("LADDER_SPACING_MULTIPLIER", "0.15"))
 
+# Periodic status reports (rendered from in-memory state on a background thread)
+PERIODIC_UPDATES = os.getenv("PERIODIC_UPDATES", "true").lower() in ("1", "true", "yes")
+UPDATE_INTERVAL_HOURS = float(os.getenv("UPDATE_INTERVAL_HOURS", "12"))
+
+# Attach to a shared market-data daemon (md_daemon.py) for price reads
+USE_MD_DAEMON = os.getenv("USE_MD_DAEMON", "false").lower() in ("1", "true", "yes")
+MD_SOCKET_PATH = os.getenv("MD_SOCKET_PATH", "/tmp/binance-md.sock")
+
+# Idempotent orders: deterministic client order ids make short timeouts safe
+ORDER_ID_PREFIX = os.getenv("ORDER_ID_PREFIX", "hv")
+ORDER_TIMEOUT = float(os.getenv("ORDER_TIMEOUT", "2"))  # seconds per REST attempt
+ORDER_MAX_ATTEMPTS = int(os.getenv("ORDER_MAX_ATTEMPTS", "5"))
+ORDER_RETRY_BACKOFF = float(os.getenv("ORDER_RETRY_BACKOFF", "0.2"))
+ORDER_RECV_WINDOW = int(os.getenv("ORDER_RECV_WINDOW", "5000"))  # ms
+
+market_data = None
+
+order_ids = OrderIdAllocator(ORDER_ID_PREFIX)
+
 
 # -------------------------
 # NOTIFICATION FUNCTIONS
@@ -83,6 +108,53 @@ def log(msg):
     print(f"[{ts}] {msg}")
 
 
+def apply_config(changes):
+    """Swap reloaded tunables into the module settings (between iterations only)."""
+    for name, value in changes.items():
+        log(f"Config reloaded: {name} {globals()[name]} -> {value}")
+    globals().update(changes)
+
+
+def send_periodic_update(
+    current_price,
+    current_value,
+    baseline_value,
+    cumulative_profit,
+    balance_bnb,
+    uptime_hours,
+    stop_loss_price=None,
+):
+    """Send the periodic status report. Formatting only, no exchange requests."""
+    message = render_status_report(
+        current_price,
+        current_value,
+        baseline_value,
+        cumulative_profit,
+        balance_bnb,
+        uptime_hours,
+        target_pct=TARGET_PCT,
+        stop_loss_pct=STOP_LOSS_PCT,
+        interval_hours=UPDATE_INTERVAL_HOURS,
+        dry_run=DRY_RUN,
+        testnet=TESTNET,
+        stop_loss_price=stop_loss_price,
+    )
+    return send_telegram(message)
+
+
+def report_status(state, uptime_hours):
+    """PeriodicReporter job: one status report from a StatusBoard snapshot."""
+    send_periodic_update(
+        state["price"],
+        state["value"],
+        state["baseline"],
+        state["realized"],
+        state["balance_base"],
+        uptime_hours,
+        stop_loss_price=state.get("stop_loss_price"),
+    )
+
+
 # -------------------------
 # BINANCE API HELPERS
 # -------------------------
@@ -141,7 +213,12 @@ def floor_decimal(qty: Decimal, step_size: Decimal) -> Decimal:
 
 
 def fetch_price(client, symbol):
-    """Get latest price."""
+    """Get latest price (from the market-data daemon when attached)."""
+    if market_data is not None and market_data.connected.is_set():
+        try:
+            return Decimal(market_data.get_symbol_ticker(symbol=symbol)["price"])
+        except Exception as e:
+            log(f"Market data daemon price failed ({e}), using REST")
     tick = with_retries(client.get_symbol_ticker, symbol=symbol)
     return Decimal(tick["price"])
 
@@ -190,6 +267,41 @@ def calculate_atr(client, symbol, period=ATR_PERIOD):
         raise
 
 
+def send_market_order(client, rest_fn, side, **params):
+    """
+    Send a market order under a deterministic client order id. Ambiguous
+    failures are resolved by looking the order up before anything is resent.
+    """
+    symbol = params["symbol"]
+
+    def submit(cid):
+        return rest_fn(
+            newClientOrderId=cid,
+            recvWindow=ORDER_RECV_WINDOW,
+            requests_params={"timeout": ORDER_TIMEOUT},
+            **params,
+        )
+
+    def lookup(cid):
+        return client.get_order(
+            symbol=symbol,
+            origClientOrderId=cid,
+            requests_params={"timeout": ORDER_TIMEOUT},
+        )
+
+    # python-binance sends client.REQUEST_RECVWINDOW whatever recvWindow a call passes
+    recv_window = getattr(client, "REQUEST_RECVWINDOW", None) or ORDER_RECV_WINDOW
+    return submit_idempotent(
+        submit,
+        lookup,
+        order_ids.next_id(symbol, side),
+        max_attempts=ORDER_MAX_ATTEMPTS,
+        backoff_sec=ORDER_RETRY_BACKOFF,
+        recv_window_sec=recv_window / 1000,
+        log=log,
+    )
+
+
 def place_market_sell(client, symbol, quantity: Decimal, step_size: Decimal):
     """Place market sell order."""
     qty_str = str(floor_decimal(quantity, step_size))
@@ -197,7 +309,9 @@ def place_market_sell(client, symbol, quantity: Decimal, step_size: Decimal):
         log(f"[DRY RUN] Market sell: {qty_str} {symbol}")
         return {"status": "DRY_RUN", "executedQty": qty_str}
     try:
-        return with_retries(client.order_market_sell, symbol=symbol, quantity=qty_str)
+        return send_market_order(
+            client, client.order_market_sell, "SELL", symbol=symbol, quantity=qty_str
+        )
     except (BinanceAPIException, BinanceOrderException) as e:
         log(f"Order sell error: {e}")
         send_telegram(f"❌ Sell order failed: {e}")
@@ -211,8 +325,8 @@ def place_market_buy_quote(client, symbol, quote_qty: Decimal):
         log(f"[DRY RUN] Market buy quote: {qty_str} USDT {symbol}")
         return {"status": "DRY_RUN"}
     try:
-        return with_retries(
-            client.order_market_buy, symbol=symbol, quoteOrderQty=qty_str
+        return send_market_order(
+            client, client.order_market_buy, "BUY", symbol=symbol, quoteOrderQty=qty_str
         )
     except (BinanceAPIException, BinanceOrderException) as e:
         log(f"Order buy error: {e}")
@@ -224,6 +338,7 @@ def place_market_buy_quote(client, symbol, quote_qty: Decimal):
 # MAIN BOT LOGIC
 # -------------------------
 def main():
+    global market_data
     log("Starting BNB Profit Harvester Bot (Improved with ATR)...")
 
     if not BINANCE_API_KEY or not BINANCE_API_SECRET:
@@ -238,15 +353,26 @@ def main():
 
     # Initialize client
     client = Client(BINANCE_API_KEY, BINANCE_API_SECRET)
+    # Signed requests are sent with this window whatever recvWindow a call passes
+    client.REQUEST_RECVWINDOW = ORDER_RECV_WINDOW
 
     if TESTNET:
         client.API_URL = "https://testnet.binance.vision/api"
 
+    # Shared market-data daemon for price reads
+    if USE_MD_DAEMON:
+        market_data = MarketDataClient(MD_SOCKET_PATH, log=log)
+        try:
+            market_data.start()
+            log(f"Attached to market data daemon at {MD_SOCKET_PATH}")
+        except OSError as e:
+            log(f"Market data daemon unavailable: {e}. Using REST.")
+            market_data = None
+
     # Sync time with Binance
     try:
         server_time = with_retries(client.get_server_time)
         Client.TIME_OFFSET = server_time["serverTime"] - int(time.time() * 1000)
-        client.RECVWINDOW = 5000
         log(f"Synced time offset: {Client.TIME_OFFSET} ms")
     except Exception as e:
         log(f"Time sync warning: {e}")
@@ -298,8 +424,36 @@ def main():
         f"Started: Price {price:.4f}, Balance {balance_base:.6f} {base_asset}, Baseline {baseline_value:.2f} {quote_asset}"
     )
 
+    # Periodic status reports from in-memory state, off the trading thread
+    status_board = StatusBoard()
+    reporter = None
+    if PERIODIC_UPDATES:
+        reporter = PeriodicReporter(
+            status_board, report_status, UPDATE_INTERVAL_HOURS * 3600, log=log
+        )
+        reporter.start()
+        log(f"Periodic updates every {UPDATE_INTERVAL_HOURS:g} hours")
+
+    profiler = install_profiler(log=log)  # PROFILE=true, or SIGUSR1 to toggle
+
+    # Tunables reloaded from CONFIG_FILE on change or SIGHUP
+    config_watcher = None
+    if CONFIG_RELOAD:
+        config_watcher = ConfigWatcher(
+            CONFIG_FILE, {name: globals()[name] for name in TUNABLES}, log=log
+        )
+        config_watcher.install_sighup()
+        config_watcher.start()
+        log(f"Watching {CONFIG_FILE} for config changes")
+
     try:
         while True:
+            # Apply a reloaded config as one unit before this iteration reads it
+            if config_watcher:
+                changes = config_watcher.take()
+                if changes:
+                    apply_config(changes)
+
             now = time.time()
             price = fetch_price(client, SYMBOL)
             balance_base = fetch_balance(client, base_asset)
@@ -322,6 +476,14 @@ def main():
                     log(f"Trailing stop updated: {stop_loss_price:.4f}")
 
             portfolio_stop_loss_value = baseline_value * (Decimal("1") - STOP_LOSS_PCT)
+            status_board.publish(
+                price=price,
+                value=current_value,
+                baseline=baseline_value,
+                realized=cumulative_realized,
+                balance_base=balance_base,
+                stop_loss_price=stop_loss_price if use_atr_stop else None,
+            )
 
             log(
                 f"Price: {price:.4f}, Value: {current_value:.2f}, Baseline: {baseline_value:.2f}"
@@ -531,6 +693,14 @@ def main():
     except Exception as e:
         log(f"Error: {e}")
         send_telegram(f"⚠️ Bot error: {e}")
+    finally:
+        if reporter:
+            reporter.stop()
+        if config_watcher:
+            config_watcher.stop()
+        if market_data:
+            market_data.stop()
+        profiler.stop()
 
 
 if __name__ == "__main__":
@@ -9,17 +9,37 @@
 # 5. Re-entry strategies (optional)
 # -------------------------------------------
 
-import time
 import math
 import os
 import requests
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait
 from decimal import Decimal, ROUND_DOWN
-from datetime import datetime, timezone
 from typing import Dict, Any
+from binance import ThreadedWebsocketManager
 from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 from dotenv import load_dotenv
 
+from bot_logging import DEBUG, ERROR, INFO, WARNING, BotLogger
+from candle_cache import AtrRefresher, KlineCache, compute_atr
+from clock import SYSTEM_CLOCK
+from clock_sync import ClockDriftTracker
+from execution import ExecutionEngine
+from hedged_reads import HedgedReader
+from indicators import IndicatorPipeline
+from live_config import CONFIG_FILE, CONFIG_RELOAD, TUNABLES, ConfigWatcher
+from md_daemon import MarketDataClient
+from order_book import LocalOrderBook
+from order_gateway import GatewayDisconnected, OrderGateway, WS_API_TESTNET_URL, WS_API_URL
+from order_ids import OrderIdAllocator, submit_idempotent
+from poll_scheduler import PollScheduler
+from price_feed import PriceFeed
+from profiler import install as install_profiler
+from risk import RiskEngine
+from shadow import ShadowBook, ShadowRunner, parameter_grid
+from status_report import PeriodicReporter, StatusBoard, render_status_report
+
 # Load environment variables
 load_dotenv()
 
@@ -52,6 +72,112 @@ REENTRY_STRATEGY = os.getenv(
 REENTRY_FRACTION = Decimal(os.getenv("REENTRY_FRACTION", "0.5"))
 LADDER_ORDERS = int(os.getenv("LADDER_ORDERS", "5"))
 LADDER_SPACING_MULTIPLIER = Decimal(os.getenv("LADDER_SPACING_MULTIPLIER", "0.15"))
+ATR_REFRESH_INTERVAL = int(os.getenv("ATR_REFRESH_INTERVAL", "300"))  # seconds
+ATR_CACHE_MAX_AGE = int(os.getenv("ATR_CACHE_MAX_AGE", "3600"))  # seconds
+
+# Streaming indicators (1m/5m/1h candles aggregated from the trade stream)
+USE_TRADE_STREAM = os.getenv("USE_TRADE_STREAM", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+EMA_PERIOD = int(os.getenv("EMA_PERIOD", "20"))
+VOL_WINDOW = int(os.getenv("VOL_WINDOW", "30"))
+
+# Local order book from the @depth diff stream (checks harvests at executable prices)
+USE_LOCAL_BOOK = os.getenv("USE_LOCAL_BOOK", "false").lower() in ("1", "true", "yes")
+
+# Orders over the WebSocket API (REST is used whenever it is disconnected)
+USE_WS_ORDERS = os.getenv("USE_WS_ORDERS", "false").lower() in ("1", "true", "yes")
+WS_ORDER_TIMEOUT = float(os.getenv("WS_ORDER_TIMEOUT", "5"))
+
+# Idempotent orders: deterministic client order ids make short timeouts safe
+ORDER_ID_PREFIX = os.getenv("ORDER_ID_PREFIX", "hv")
+ORDER_TIMEOUT = float(os.getenv("ORDER_TIMEOUT", "2"))  # seconds per REST attempt
+ORDER_MAX_ATTEMPTS = int(os.getenv("ORDER_MAX_ATTEMPTS", "5"))
+ORDER_RETRY_BACKOFF = float(os.getenv("ORDER_RETRY_BACKOFF", "0.2"))
+ORDER_RECV_WINDOW = int(os.getenv("ORDER_RECV_WINDOW", "5000"))  # ms
+
+# Shared deadline for the concurrent startup requests
+BOOTSTRAP_DEADLINE = float(os.getenv("BOOTSTRAP_DEADLINE", "10"))
+
+# Seconds between server-time samples for clock drift tracking
+CLOCK_SYNC_INTERVAL = int(os.getenv("CLOCK_SYNC_INTERVAL", "60"))
+
+# Sliced execution: large sells are split into child orders sized from the book
+USE_SLICED_EXECUTION = os.getenv("USE_SLICED_EXECUTION", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+SLICE_PARTICIPATION = Decimal(os.getenv("SLICE_PARTICIPATION", "0.25"))
+SLICE_MAX_SLIPPAGE = float(os.getenv("SLICE_MAX_SLIPPAGE", "0.001"))
+SLICE_INTERVAL = float(os.getenv("SLICE_INTERVAL", "1.0"))  # seconds between children
+SLICE_MAX_CHILD_NOTIONAL = Decimal(os.getenv("SLICE_MAX_CHILD_NOTIONAL", "0"))  # 0 = no cap
+STOP_SLICE_INTERVAL = float(os.getenv("STOP_SLICE_INTERVAL", "0"))  # stops do not wait between children
+
+# Failover price feed: trade stream primary, adaptive REST polling while it is stale
+USE_PRICE_FEED = os.getenv("USE_PRICE_FEED", "false").lower() in ("1", "true", "yes")
+FEED_STALE_AFTER = float(os.getenv("FEED_STALE_AFTER", "5"))  # seconds
+FEED_POLL_MIN = float(os.getenv("FEED_POLL_MIN", "1"))
+FEED_POLL_MAX = float(os.getenv("FEED_POLL_MAX", str(CHECK_INTERVAL)))
+# Older than this, neither the stream nor the REST polls are delivering; never trade on it
+FEED_MAX_AGE = float(os.getenv("FEED_MAX_AGE", str(FEED_STALE_AFTER + FEED_POLL_MAX)))
+
+# Adaptive poll cadence from the distance to stop/target in ATR units (replaces CHECK_INTERVAL)
+ADAPTIVE_POLLING = os.getenv("ADAPTIVE_POLLING", "false").lower() in ("1", "true", "yes")
+POLL_MIN_INTERVAL = float(os.getenv("POLL_MIN_INTERVAL", "1"))
+POLL_MAX_INTERVAL = float(os.getenv("POLL_MAX_INTERVAL", "30"))
+POLL_NEAR_ATR = float(os.getenv("POLL_NEAR_ATR", "0.5"))
+POLL_FAR_ATR = float(os.getenv("POLL_FAR_ATR", "5"))
+POLL_WEIGHT_BUDGET = int(os.getenv("POLL_WEIGHT_BUDGET", "600"))  # request weight per minute
+
+# Hedged reads: race price/balance/order-status reads across api, api1-api4
+USE_HEDGED_READS = os.getenv("USE_HEDGED_READS", "false").lower() in ("1", "true", "yes")
+HEDGE_ENDPOINTS = [
+    e.strip() for e in os.getenv("HEDGE_ENDPOINTS", "api,api1,api2,api3,api4").split(",") if e.strip()
+]
+
+# Periodic status reports (rendered from in-memory state on a background thread)
+PERIODIC_UPDATES = os.getenv("PERIODIC_UPDATES", "true").lower() in ("1", "true", "yes")
+UPDATE_INTERVAL_HOURS = float(os.getenv("UPDATE_INTERVAL_HOURS", "12"))
+
+# Attach to a shared market-data daemon (md_daemon.py) instead of opening streams
+USE_MD_DAEMON = os.getenv("USE_MD_DAEMON", "false").lower() in ("1", "true", "yes")
+MD_SOCKET_PATH = os.getenv("MD_SOCKET_PATH", "/tmp/binance-md.sock")
+
+# Shadow mode: paper variants of the strategy evaluated on the same ticks
+USE_SHADOW = os.getenv("USE_SHADOW", "false").lower() in ("1", "true", "yes")
+SHADOW_TARGET_PCTS = [
+    float(v) for v in os.getenv("SHADOW_TARGET_PCTS", "0.003,0.005,0.0075,0.01,0.015").split(",")
+]
+SHADOW_ATR_MULTIPLIERS = [
+    float(v) for v in os.getenv("SHADOW_ATR_MULTIPLIERS", "1.0,1.5,2.0,2.5,3.0").split(",")
+]
+SHADOW_REENTRY_FRACTIONS = [
+    float(v) for v in os.getenv("SHADOW_REENTRY_FRACTIONS", "0,0.25,0.5,0.75").split(",")
+]
+SHADOW_FEE_PCT = float(os.getenv("SHADOW_FEE_PCT", "0.001"))
+SHADOW_LEADERBOARD_HOURS = float(os.getenv("SHADOW_LEADERBOARD_HOURS", "1"))
+SHADOW_TOP = int(os.getenv("SHADOW_TOP", "10"))
+
+# Time source for the loop; tests and backtests swap in a SimulatedClock
+clock = SYSTEM_CLOCK
+
+clock_tracker = None
+
+order_gateway = None
+
+market_data = None
+
+hedged_reader = None
+
+execution_engine = None
+
+order_ids = OrderIdAllocator(ORDER_ID_PREFIX)
+
+# Leveled, rate-limited log lines written from a background thread
+logger = BotLogger()
 
 
 # -------------------------
@@ -77,33 +203,89 @@ def send_telegram(message):
         return False
 
 
-def log(msg):
-    """Log with timestamp."""
-    ts = datetime.now(timezone.utc).isoformat()
-    print(f"[{ts}] {msg}")
+def log(msg, level=INFO, key=None):
+    """Log with timestamp. Lines with a key are rate-limited per key."""
+    logger.log(msg, level, key, now=clock.time())
+
+
+def send_periodic_update(
+    current_price,
+    current_value,
+    baseline_value,
+    cumulative_profit,
+    balance_bnb,
+    uptime_hours,
+    stop_loss_price=None,
+):
+    """Send the periodic status report. Formatting only, no exchange requests."""
+    message = render_status_report(
+        current_price,
+        current_value,
+        baseline_value,
+        cumulative_profit,
+        balance_bnb,
+        uptime_hours,
+        target_pct=TARGET_PCT,
+        stop_loss_pct=STOP_LOSS_PCT,
+        interval_hours=UPDATE_INTERVAL_HOURS,
+        dry_run=DRY_RUN,
+        testnet=TESTNET,
+        stop_loss_price=stop_loss_price,
+    )
+    return send_telegram(message)
+
+
+def report_status(state, uptime_hours):
+    """PeriodicReporter job: one status report from a StatusBoard snapshot."""
+    send_periodic_update(
+        state["price"],
+        state["value"],
+        state["baseline"],
+        state["realized"],
+        state["balance_base"],
+        uptime_hours,
+        stop_loss_price=state.get("stop_loss_price"),
+    )
+
+
+def apply_config(changes):
+    """Swap reloaded tunables into the module settings (between iterations only)."""
+    for name, value in changes.items():
+        log(f"Config reloaded: {name} {globals()[name]} -> {value}")
+    globals().update(changes)
 
 
 # -------------------------
 # BINANCE API HELPERS
 # -------------------------
-def with_retries(fn, *args, max_retries=3, backoff_sec=1.0, **kwargs):
-    """Run API call with retries and backoff."""
+def with_retries(fn, *args, max_retries=3, backoff_sec=1.0, deadline=None, **kwargs):
+    """Run API call with retries and backoff, never sleeping past deadline."""
     last_err = None
     for attempt in range(1, max_retries + 1):
         try:
             return fn(*args, **kwargs)
         except Exception as e:
             last_err = e
+            if getattr(e, "code", None) == -1021 and clock_tracker is not None:
+                # Timestamp outside recvWindow: resync and retry without backoff
+                try:
+                    clock_tracker.resync()
+                    continue
+                except Exception:
+                    pass
             if attempt < max_retries:
-                time.sleep(backoff_sec * attempt)
+                delay = backoff_sec * attempt
+                if deadline is not None and clock.time() + delay >= deadline:
+                    break
+                clock.sleep(delay)
             else:
                 pass
     raise last_err
 
 
-def fetch_symbol_info(client: Client, symbol: str) -> Dict[str, Any]:
+def fetch_symbol_info(client: Client, symbol: str, deadline=None) -> Dict[str, Any]:
     """Fetch symbol information including base/quote assets and filters."""
-    info = with_retries(client.get_exchange_info)
+    info = with_retries(client.get_exchange_info, deadline=deadline)
     sym = next((s for s in info.get("symbols", []) if s.get("symbol") == symbol), None)
     if not sym:
         raise ValueError(f"Symbol {symbol} not found in exchange info")
@@ -140,18 +322,104 @@ def floor_decimal(qty: Decimal, step_size: Decimal) -> Decimal:
     return steps * step_size
 
 
-def fetch_price(client, symbol):
-    """Get latest price."""
-    tick = with_retries(client.get_symbol_ticker, symbol=symbol)
+def read_call(client, method):
+    """A read method on client, hedged across endpoints when enabled."""
+    if hedged_reader is not None:
+        return partial(hedged_reader.call, method)
+    return getattr(client, method)
+
+
+def fetch_price(client, symbol, deadline=None):
+    """Get latest price (from the market-data daemon when attached)."""
+    if market_data is not None and market_data.connected.is_set():
+        try:
+            return Decimal(market_data.get_symbol_ticker(symbol=symbol)["price"])
+        except Exception as e:
+            log(f"Market data daemon price failed ({e}), using REST")
+    tick = with_retries(
+        read_call(client, "get_symbol_ticker"), symbol=symbol, deadline=deadline
+    )
     return Decimal(tick["price"])
 
 
+def feed_price(client, price_feed):
+    """
+    Price for this iteration from the feed, or None if there is no current
+    one. A feed price older than FEED_MAX_AGE is replaced by a direct fetch.
+    """
+    price, _, _, published_at = price_feed.latest()
+    age = clock.monotonic() - published_at
+    if age <= FEED_MAX_AGE:
+        return price
+    log(f"Feed price is {age:.1f}s old; fetching it directly", WARNING, key="feed-stale")
+    try:
+        price = fetch_price(client, SYMBOL)
+    except Exception as e:
+        log(f"No current price: {e}", ERROR, key="feed-down")
+        return None
+    price_feed.seed(price)
+    return price
+
+
 def fetch_balance(client, asset):
     """Get free balance for asset."""
-    bal = with_retries(client.get_asset_balance, asset=asset)
+    bal = with_retries(read_call(client, "get_asset_balance"), asset=asset)
     return Decimal(bal.get("free", "0.0"))
 
 
+def fetch_balances(client, deadline=None):
+    """Get free balances for all assets from a single account request."""
+    bals = with_retries(
+        read_call(client, "get_asset_balance"), asset=None, deadline=deadline
+    )
+    return {b["asset"]: Decimal(b.get("free", "0.0")) for b in bals or []}
+
+
+def run_bootstrap(client, symbol, deadline_sec=BOOTSTRAP_DEADLINE):
+    """Run the independent startup requests concurrently under one deadline.
+
+    Returns (results, errors, timings) keyed by step name; timings are seconds.
+    """
+    deadline = clock.time() + deadline_sec
+
+    def time_offset():
+        t0 = clock.time()
+        server_time = with_retries(client.get_server_time, deadline=deadline)
+        t1 = clock.time()
+        # Assume the server stamped its clock halfway through the round trip
+        return server_time["serverTime"] - int((t0 + t1) * 500)
+
+    steps = {
+        "time_offset": time_offset,
+        "symbol_info": lambda: fetch_symbol_info(client, symbol, deadline=deadline),
+        "price": lambda: fetch_price(client, symbol, deadline=deadline),
+        "balances": lambda: fetch_balances(client, deadline=deadline),
+    }
+    results, errors, timings = {}, {}, {}
+
+    def timed(name, fn):
+        started = clock.time()
+        try:
+            return fn()
+        finally:
+            timings[name] = clock.time() - started
+
+    pool = ThreadPoolExecutor(max_workers=len(steps), thread_name_prefix="bootstrap")
+    futures = {pool.submit(timed, name, fn): name for name, fn in steps.items()}
+    done, pending = wait(futures, timeout=max(0.0, deadline - clock.time()))
+    pool.shutdown(wait=False, cancel_futures=True)
+
+    for fut in done:
+        name = futures[fut]
+        try:
+            results[name] = fut.result()
+        except Exception as e:
+            errors[name] = e
+    for fut in pending:
+        errors[futures[fut]] = TimeoutError(f"no response within {deadline_sec:.1f}s")
+    return results, errors, timings
+
+
 def calculate_atr(client, symbol, period=ATR_PERIOD):
     """Calculate Average True Range."""
     try:
@@ -161,35 +429,77 @@ def calculate_atr(client, symbol, period=ATR_PERIOD):
             interval=Client.KLINE_INTERVAL_5MINUTE,
             limit=period + 1,
         )
-
-        if len(klines) < period + 1:
-            raise ValueError(
-                f"Insufficient kline data: got {len(klines)}, need {period + 1}"
-            )
-
-        highs = [Decimal(k[2]) for k in klines]
-        lows = [Decimal(k[3]) for k in klines]
-        closes = [Decimal(k[4]) for k in klines]
-
-        trs = []
-        for i in range(1, len(klines)):
-            tr = max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i - 1]),
-                abs(lows[i] - closes[i - 1]),
-            )
-            trs.append(tr)
-
-        if not trs:
-            raise ValueError("No TR values calculated")
-
-        atr = sum(trs) / Decimal(len(trs))
-        return atr
+        return compute_atr(klines, period)
     except Exception as e:
         log(f"ATR calculation error: {e}")
         raise
 
 
+def sent_recv_window_ms(client):
+    """
+    The recvWindow orders actually go out with. python-binance replaces any
+    per-call recvWindow with client.REQUEST_RECVWINDOW, so that wins over
+    ORDER_RECV_WINDOW; the longest window that may apply bounds the wait
+    before a -2013 lookup can be trusted.
+    """
+    window = getattr(client, "REQUEST_RECVWINDOW", None) or ORDER_RECV_WINDOW
+    if order_gateway is not None:
+        window = max(window, order_gateway.recv_window)
+    return window
+
+
+def send_market_order(client, rest_fn, side, **params):
+    """
+    Send a market order under a deterministic client order id, over the
+    WebSocket gateway when connected, otherwise REST. Ambiguous failures are
+    resolved by looking the order up before anything is resent.
+    """
+    symbol = params["symbol"]
+
+    def submit(cid):
+        if order_gateway is not None and order_gateway.connected:
+            try:
+                return order_gateway.place_order(
+                    side=side, type="MARKET", newClientOrderId=cid, **params
+                )
+            except GatewayDisconnected as e:
+                if e.sent:
+                    raise  # outcome unknown; resolved by lookup
+                log(f"Order gateway unavailable ({e}), falling back to REST")
+        place = partial(
+            rest_fn,
+            newClientOrderId=cid,
+            recvWindow=ORDER_RECV_WINDOW,
+            requests_params={"timeout": ORDER_TIMEOUT},
+            **params,
+        )
+        try:
+            return place()
+        except BinanceAPIException as e:
+            if e.code == -1021 and clock_tracker is not None:
+                clock_tracker.resync()  # rejected outright, so resending is safe
+                return place()
+            raise
+
+    def lookup(cid):
+        return read_call(client, "get_order")(
+            symbol=symbol,
+            origClientOrderId=cid,
+            requests_params={"timeout": ORDER_TIMEOUT},
+        )
+
+    return submit_idempotent(
+        submit,
+        lookup,
+        order_ids.next_id(symbol, side),
+        max_attempts=ORDER_MAX_ATTEMPTS,
+        backoff_sec=ORDER_RETRY_BACKOFF,
+        recv_window_sec=sent_recv_window_ms(client) / 1000,
+        log=log,
+        clock=clock,
+    )
+
+
 def place_market_sell(client, symbol, quantity: Decimal, step_size: Decimal):
     """Place market sell order."""
     qty_str = str(floor_decimal(quantity, step_size))
@@ -197,7 +507,9 @@ def place_market_sell(client, symbol, quantity: Decimal, step_size: Decimal):
         log(f"[DRY RUN] Market sell: {qty_str} {symbol}")
         return {"status": "DRY_RUN", "executedQty": qty_str}
     try:
-        return with_retries(client.order_market_sell, symbol=symbol, quantity=qty_str)
+        return send_market_order(
+            client, client.order_market_sell, "SELL", symbol=symbol, quantity=qty_str
+        )
     except (BinanceAPIException, BinanceOrderException) as e:
         log(f"Order sell error: {e}")
         send_telegram(f"❌ Sell order failed: {e}")
@@ -211,8 +523,8 @@ def place_market_buy_quote(client, symbol, quote_qty: Decimal):
         log(f"[DRY RUN] Market buy quote: {qty_str} USDT {symbol}")
         return {"status": "DRY_RUN"}
     try:
-        return with_retries(
-            client.order_market_buy, symbol=symbol, quoteOrderQty=qty_str
+        return send_market_order(
+            client, client.order_market_buy, "BUY", symbol=symbol, quoteOrderQty=qty_str
         )
     except (BinanceAPIException, BinanceOrderException) as e:
         log(f"Order buy error: {e}")
@@ -220,10 +532,45 @@ def place_market_buy_quote(client, symbol, quote_qty: Decimal):
         raise
 
 
+def place_sell(client, symbol, quantity: Decimal, step_size: Decimal, price: Decimal):
+    """Sell now, sliced through the execution engine when it is enabled."""
+    if execution_engine is None:
+        return place_market_sell(client, symbol, quantity, step_size)
+    return execution_engine.submit(quantity, price, child_interval=STOP_SLICE_INTERVAL).result()
+
+
+def place_stop_sell(client, symbol, quantity: Decimal, step_size: Decimal, price: Decimal):
+    """
+    Stop-loss sell of the whole position. A sliced sell can come back
+    PARTIALLY_FILLED; what is left goes out as one market sell, and both
+    fills are combined into one response.
+    """
+    result = place_sell(client, symbol, quantity, step_size, price) or {}
+    executed = Decimal(str(result.get("executedQty", quantity)))
+    remaining = floor_decimal(quantity - executed, step_size)
+    if remaining <= 0:
+        return result
+    log(f"Stop sell filled {executed} of {quantity}; selling the remaining {remaining} at market")
+    try:
+        rest = place_market_sell(client, symbol, remaining, step_size) or {}
+    except Exception as e:
+        log(f"Stop remainder sell failed: {e}")
+        return result
+    executed += Decimal(str(rest.get("executedQty", remaining)))
+    return {
+        **result,
+        "status": "FILLED" if executed >= quantity else "PARTIALLY_FILLED",
+        "executedQty": str(executed),
+        "fills": list(result.get("fills") or []) + list(rest.get("fills") or []),
+    }
+
+
 # -------------------------
 # MAIN BOT LOGIC
 # -------------------------
-def main():
+def main(client=None):
+    """Run the bot. Pass a client (e.g. a mock) to skip building a real one."""
+    global order_gateway, clock_tracker, execution_engine, market_data, hedged_reader
     log("Starting BNB Profit Harvester Bot (Improved with ATR)...")
 
     if not BINANCE_API_KEY or not BINANCE_API_SECRET:
@@ -236,38 +583,89 @@ def main():
     if TESTNET:
         log("Using Binance TESTNET")
 
-    # Initialize client
-    client = Client(BINANCE_API_KEY, BINANCE_API_SECRET)
+    # Initialize client (skip the constructor's ping; bootstrap covers it)
+    if client is None:
+        client = Client(BINANCE_API_KEY, BINANCE_API_SECRET, ping=False)
+        # Signed requests are sent with this window whatever recvWindow a call passes
+        client.REQUEST_RECVWINDOW = ORDER_RECV_WINDOW
+
+        if TESTNET:
+            client.API_URL = "https://testnet.binance.vision/api"
+
+    # Latency-critical reads raced across the equivalent REST base URLs
+    if USE_HEDGED_READS and not TESTNET:
+        hedged_reader = HedgedReader.for_endpoints(
+            client,
+            BINANCE_API_KEY,
+            BINANCE_API_SECRET,
+            endpoints=[name[len("api"):] for name in HEDGE_ENDPOINTS],
+            log=log,
+        )
+        log(f"Hedged reads across {', '.join(HEDGE_ENDPOINTS)}")
+
+    # Persistent WebSocket API session for orders, connecting in the background
+    if USE_WS_ORDERS and not DRY_RUN:
+        order_gateway = OrderGateway(
+            BINANCE_API_KEY,
+            BINANCE_API_SECRET,
+            url=WS_API_TESTNET_URL if TESTNET else WS_API_URL,
+            timeout=WS_ORDER_TIMEOUT,
+            recv_window=ORDER_RECV_WINDOW,
+            timestamp_ms=lambda: int(clock.time() * 1000) + client.timestamp_offset,
+            log=log,
+        )
+        order_gateway.start(wait=False)
 
-    if TESTNET:
-        client.API_URL = "https://testnet.binance.vision/api"
+    # Shared market-data daemon for streams and public REST reads
+    if USE_MD_DAEMON:
+        market_data = MarketDataClient(MD_SOCKET_PATH, log=log)
+        try:
+            market_data.start()
+            log(f"Attached to market data daemon at {MD_SOCKET_PATH}")
+        except OSError as e:
+            log(f"Market data daemon unavailable: {e}. Using direct connections.")
+            market_data = None
+
+    # Time sync, symbol info, price and balances in one concurrent round trip
+    bootstrap_started = clock.time()
+    results, errors, timings = run_bootstrap(client, SYMBOL)
+    log(
+        "Bootstrap in "
+        + f"{(clock.time() - bootstrap_started) * 1000:.0f} ms: "
+        + ", ".join(f"{name} {sec * 1000:.0f} ms" for name, sec in sorted(timings.items()))
+    )
 
-    # Sync time with Binance
-    try:
-        server_time = with_retries(client.get_server_time)
-        Client.TIME_OFFSET = server_time["serverTime"] - int(time.time() * 1000)
-        client.RECVWINDOW = 5000
-        log(f"Synced time offset: {Client.TIME_OFFSET} ms")
-    except Exception as e:
-        log(f"Time sync warning: {e}")
+    # Sync time with Binance, then keep tracking drift in the background
+    clock_tracker = ClockDriftTracker(client, interval_sec=CLOCK_SYNC_INTERVAL, log=log)
+    if "time_offset" in results:
+        clock_tracker.add_sample(results["time_offset"], timings["time_offset"] * 1000)
+        offset = clock_tracker.apply(step=True)
+        log(f"Synced time offset: {offset} ms")
+    else:
+        log(f"Time sync warning: {errors.get('time_offset')}")
+    if clock.background:
+        clock_tracker.start()
 
     # Get symbol info
-    try:
-        symbol_info = fetch_symbol_info(client, SYMBOL)
-        base_asset = symbol_info["baseAsset"]
-        quote_asset = symbol_info["quoteAsset"]
-        step_size = symbol_info["stepSize"] or Decimal(f"1e-{QUANTITY_DECIMALS}")
-        min_notional = symbol_info["minNotional"] or MIN_NOTIONAL
-        log(f"Symbol: {SYMBOL}, Base: {base_asset}, Quote: {quote_asset}")
-        log(f"Step size: {step_size}, Min notional: {min_notional}")
-    except Exception as e:
-        log(f"ERROR: Failed to get symbol info: {e}")
+    if "symbol_info" not in results:
+        log(f"ERROR: Failed to get symbol info: {errors.get('symbol_info')}")
         return
+    symbol_info = results["symbol_info"]
+    base_asset = symbol_info["baseAsset"]
+    quote_asset = symbol_info["quoteAsset"]
+    step_size = symbol_info["stepSize"] or Decimal(f"1e-{QUANTITY_DECIMALS}")
+    min_notional = symbol_info["minNotional"] or MIN_NOTIONAL
+    log(f"Symbol: {SYMBOL}, Base: {base_asset}, Quote: {quote_asset}")
+    log(f"Step size: {step_size}, Min notional: {min_notional}")
 
     # Get initial balance and price
-    price = fetch_price(client, SYMBOL)
-    balance_base = fetch_balance(client, base_asset)
-    balance_quote = fetch_balance(client, quote_asset)
+    for step in ("price", "balances"):
+        if step not in results:
+            log(f"ERROR: Failed to get initial {step}: {errors.get(step)}")
+            return
+    price = results["price"]
+    balance_base = results["balances"].get(base_asset, Decimal("0"))
+    balance_quote = results["balances"].get(quote_asset, Decimal("0"))
 
     # Calculate total portfolio value (BNB + USDT)
     portfolio_value = (balance_base * price) + balance_quote
@@ -280,71 +678,330 @@ def main():
     # Baseline is total portfolio value, not just BNB value
     baseline_value = portfolio_value
     cumulative_realized = Decimal("0")
+
+    # Running portfolio value, peak equity and drawdown; O(1) per update
+    risk = RiskEngine(STOP_LOSS_PCT, quote_asset=quote_asset, log=log)
+    risk.set_balance("spot", base_asset, balance_base)
+    risk.set_balance("spot", quote_asset, balance_quote)
+    risk.mark(base_asset, price)
+    risk.set_baseline(baseline_value)
     entry_price = price
 
-    # Calculate ATR and set stop loss
+    # Warm up ATR from the local kline cache; the refresher tops it up in
+    # the background and the loop re-enables the ATR stop once it is ready
     atr = None
     stop_loss_price = None
-    use_atr_stop = USE_ATR_STOP_LOSS  # Local variable that can be modified
-    if use_atr_stop:
-        try:
-            atr = calculate_atr(client, SYMBOL)
+    use_atr_stop = False
+    atr_refresher = None
+    last_atr_refresh = 0.0
+    cache_fresh = False
+    if USE_ATR_STOP_LOSS:
+        atr_cache = KlineCache(SYMBOL, Client.KLINE_INTERVAL_5MINUTE, clock=clock)
+        cached = atr_cache.load()
+        cache_age = atr_cache.age_sec()
+        cache_fresh = cache_age is not None and cache_age <= ATR_CACHE_MAX_AGE
+        if cache_fresh:
+            atr = atr_cache.atr(ATR_PERIOD)
+        if atr:
+            use_atr_stop = True
             stop_loss_price = entry_price - (ATR_MULTIPLIER * atr)
-            log(f"ATR: {atr:.4f}, Initial stop loss: {stop_loss_price:.4f}")
+            log(
+                f"ATR from cache ({cached} klines): {atr:.4f}, Initial stop loss: {stop_loss_price:.4f}"
+            )
+        else:
+            log("No fresh cached klines. ATR stop loss paused until top-up completes.")
+
+        atr_refresher = AtrRefresher(
+            client,
+            atr_cache,
+            ATR_PERIOD,
+            interval_sec=ATR_REFRESH_INTERVAL,
+            log=log,
+            clock=clock,
+        )
+        if clock.background:
+            atr_refresher.start()  # otherwise the loop runs it inline
+
+    # One websocket manager serves the trade and depth streams
+    twm = None
+    use_streams = USE_TRADE_STREAM or USE_LOCAL_BOOK or USE_PRICE_FEED
+    if market_data and use_streams:
+        twm = market_data  # streams come through the shared daemon
+    elif use_streams:
+        try:
+            twm = ThreadedWebsocketManager(testnet=TESTNET)
+            twm.start()
         except Exception as e:
-            log(f"Failed to calculate ATR: {e}. Disabling ATR stop loss.")
-            use_atr_stop = False
-            atr = None
-            stop_loss_price = None
+            log(f"Websocket streams unavailable: {e}. Using REST only.")
+            twm = None
+
+    # Multi-timeframe indicators from one trade stream
+    pipeline = None
+    if USE_TRADE_STREAM and twm:
+        pipeline = IndicatorPipeline(ATR_PERIOD, EMA_PERIOD, VOL_WINDOW)
+        # A stale cache would hand the stream an old ATR; it then warms up from its own bars
+        if atr_refresher and cache_fresh:
+            now_ms = int(clock.time() * 1000)
+            closed = [
+                k
+                for k in atr_refresher.cache.klines
+                if k[0] + atr_refresher.cache.interval_ms <= now_ms
+            ]
+            pipeline.seed("5m", closed)
+
+    # Price from the trade stream, falling back to REST polling while it is stale
+    price_feed = None
+    price_alerted = False  # one alert per outage of both price sources
+    if USE_PRICE_FEED:
+        price_feed = PriceFeed(
+            lambda: fetch_price(client, SYMBOL),
+            now_ms=lambda: int(clock.time() * 1000) + client.timestamp_offset,
+            stale_after=FEED_STALE_AFTER,
+            poll_min=FEED_POLL_MIN,
+            poll_max=FEED_POLL_MAX,
+            log=log,
+            monotonic=clock.monotonic,
+        )
+        price_feed.seed(price)
 
-    last_atr_refresh = time.time()
+    # Paper variants fed from a worker thread; the loop only enqueues ticks
+    shadow = None
+    if USE_SHADOW:
+        targets, multipliers, reentries = parameter_grid(
+            SHADOW_TARGET_PCTS, SHADOW_ATR_MULTIPLIERS, SHADOW_REENTRY_FRACTIONS
+        )
+        shadow = ShadowRunner(
+            ShadowBook(
+                targets,
+                multipliers,
+                reentries,
+                balance_base=balance_base,
+                balance_quote=balance_quote,
+                price=float(price),
+                stop_loss_pct=float(STOP_LOSS_PCT),
+                step_size=float(step_size),
+                min_notional=float(min_notional),
+                fee_pct=SHADOW_FEE_PCT,
+            ),
+            leaderboard_sec=SHADOW_LEADERBOARD_HOURS * 3600,
+            top=SHADOW_TOP,
+            log=log,
+            clock=clock,
+        )
+        if clock.background:
+            shadow.start()  # otherwise ticks are applied inline
+        log(f"Shadow mode: {len(shadow.book)} variants")
+
+    # One trade stream feeds the indicators, the price feed and the shadow variants
+    trade_handlers = [h.handle_trade_message for h in (pipeline, price_feed, shadow) if h]
+
+    def on_trade(msg):
+        for handle in trade_handlers:
+            handle(msg)
+
+    if trade_handlers and twm:
+        try:
+            twm.start_trade_socket(callback=on_trade, symbol=SYMBOL)
+            log("Trade stream started")
+        except Exception as e:
+            log(f"Trade stream unavailable: {e}. Using REST only.")
+            pipeline = None
+            trade_handlers = []
+    # Without the trade stream the shadow variants see the loop's price
+    shadow_from_loop = shadow is not None and not (trade_handlers and twm)
+    if price_feed:
+        price_feed.start()  # polls REST until the stream is healthy
+
+    # Local L2 book for executable exit prices
+    book = None
+    if USE_LOCAL_BOOK and twm:
+        book = LocalOrderBook(
+            SYMBOL,
+            fetch_snapshot=lambda: (market_data or client).get_order_book(
+                symbol=SYMBOL, limit=1000
+            ),
+            log=log,
+        )
+        try:
+            twm.start_depth_socket(callback=book.handle_depth_message, symbol=SYMBOL)
+            book.start()
+            log("Depth stream started for local order book")
+        except Exception as e:
+            log(f"Depth stream unavailable: {e}. Valuing at last price.")
+            book = None
+
+    if USE_SLICED_EXECUTION:
+        execution_engine = ExecutionEngine(
+            send_child=lambda qty: place_market_sell(client, SYMBOL, qty, step_size),
+            step_size=step_size,
+            min_notional=min_notional,
+            min_qty=symbol_info["minQty"],
+            book=book,
+            participation=SLICE_PARTICIPATION,
+            max_slippage_pct=SLICE_MAX_SLIPPAGE,
+            max_child_notional=SLICE_MAX_CHILD_NOTIONAL or None,
+            child_interval=SLICE_INTERVAL,
+            log=log,
+            clock=clock,
+        )
+        log("Sliced execution enabled for sells")
+
+    # Harvest parent order being worked in the background
+    pending_harvest = None
+    stop_exit = None  # "ATR" or "Portfolio" while a stop's sell is unfinished
+
+    poll_scheduler = None
+    if ADAPTIVE_POLLING:
+        poll_scheduler = PollScheduler(
+            min_interval=POLL_MIN_INTERVAL,
+            max_interval=POLL_MAX_INTERVAL,
+            near_atr=POLL_NEAR_ATR,
+            far_atr=POLL_FAR_ATR,
+            # account snapshot (20) plus the ticker (2) unless the price feed serves it
+            weight_per_poll=20 if price_feed else 22,
+            weight_budget=POLL_WEIGHT_BUDGET,
+            clock=clock.monotonic,
+        )
 
     log(
         f"Started: Price {price:.4f}, Balance {balance_base:.6f} {base_asset}, {balance_quote:.2f} {quote_asset}, Total Portfolio: {baseline_value:.2f} {quote_asset}"
     )
 
+    # Periodic status reports from in-memory state, off the trading thread
+    status_board = StatusBoard(clock)
+    reporter = None
+    if PERIODIC_UPDATES:
+        reporter = PeriodicReporter(
+            status_board, report_status, UPDATE_INTERVAL_HOURS * 3600, log=log
+        )
+        if clock.background:
+            reporter.start()
+        log(f"Periodic updates every {UPDATE_INTERVAL_HOURS:g} hours")
+
+    if clock.background:
+        logger.start()  # log I/O leaves the trading thread from here on
+    profiler = install_profiler(log=log)  # PROFILE=true, or SIGUSR1 to toggle
+
+    # Tunables reloaded from CONFIG_FILE on change or SIGHUP
+    config_watcher = None
+    if CONFIG_RELOAD:
+        config_watcher = ConfigWatcher(
+            CONFIG_FILE, {name: globals()[name] for name in TUNABLES}, log=log, clock=clock
+        )
+        config_watcher.install_sighup()
+        if clock.background:
+            config_watcher.start()
+        log(f"Watching {CONFIG_FILE} for config changes")
+
     try:
         while True:
-            now = time.time()
-            price = fetch_price(client, SYMBOL)
-            balance_base = fetch_balance(client, base_asset)
-            balance_quote = fetch_balance(client, quote_asset)
-            # Current value includes both BNB value and USDT balance
-            current_value = (balance_base * price) + balance_quote
-
-            # Refresh ATR every 5 minutes
-            if use_atr_stop and (now - last_atr_refresh > 60 * 5):
-                try:
-                    atr = calculate_atr(client, SYMBOL)
-                    last_atr_refresh = now
-                    log(f"ATR refreshed: {atr:.4f}")
-                except Exception as e:
-                    log(f"Failed to refresh ATR: {e}")
+            # Apply a reloaded config as one unit before this iteration reads it
+            if config_watcher:
+                if not clock.background:
+                    config_watcher.run_pending()
+                changes = config_watcher.take()
+                if changes:
+                    apply_config(changes)
+                    risk.stop_loss_pct = STOP_LOSS_PCT
+                    risk.set_baseline(baseline_value)
+
+            if price_feed:
+                price = feed_price(client, price_feed)
+                if price is None:
+                    # Stops and targets are not checked against a frozen price
+                    if not price_alerted:
+                        send_telegram("⚠️ No current price: stream and REST both failing. Trading paused.")
+                        price_alerted = True
+                    clock.sleep(CHECK_INTERVAL)
+                    continue
+                price_alerted = False
+            else:
+                price = fetch_price(client, SYMBOL)
+            balances = fetch_balances(client)
+            balance_base = balances.get(base_asset, Decimal("0"))
+            balance_quote = balances.get(quote_asset, Decimal("0"))
+            if poll_scheduler:
+                poll_scheduler.record()
+
+            # Current value includes both BNB value and USDT balance, at the
+            # same price the baseline and target are set at
+            risk.set_balance("spot", base_asset, balance_base)
+            risk.set_balance("spot", quote_asset, balance_quote)
+            risk.mark(base_asset, price)
+            current_value = risk.value
+
+            # Pick up ATR published by the background refresher
+            if atr_refresher and not clock.background:
+                atr_refresher.run_pending()
+            if atr_refresher:
+                fresh_atr, refreshed_at = atr_refresher.latest
+                if fresh_atr is not None and refreshed_at > last_atr_refresh:
+                    atr = fresh_atr
+                    last_atr_refresh = refreshed_at
+                    if not use_atr_stop:
+                        use_atr_stop = True
+                        log(f"ATR available: {atr:.4f}. ATR stop loss re-enabled.")
+                    else:
+                        log(f"ATR refreshed: {atr:.4f}")
+
+            # Streaming 5m ATR takes over from the REST top-up once warm. Only
+            # the ATR drives stops and targets; EMA and realized vol are not used
+            if pipeline:
+                indicators = pipeline.snapshot()
+                stream_atr = indicators["5m"]["atr"]
+                if USE_ATR_STOP_LOSS and stream_atr:
+                    atr = Decimal(str(stream_atr))
+                    if not use_atr_stop:
+                        use_atr_stop = True
+                        log(f"Streaming ATR available: {atr:.4f}. ATR stop loss re-enabled.")
 
             # Update trailing stop loss
             if use_atr_stop and atr:
                 new_stop = price - (ATR_MULTIPLIER * atr)
                 if stop_loss_price is None or new_stop > stop_loss_price:
                     stop_loss_price = new_stop
-                    log(f"Trailing stop updated: {stop_loss_price:.4f}")
-
-            portfolio_stop_loss_value = baseline_value * (Decimal("1") - STOP_LOSS_PCT)
+                    log(f"Trailing stop updated: {stop_loss_price:.4f}", key="trailing-stop")
+
+            if shadow:
+                shadow.set_atr(atr if use_atr_stop else None)
+                if shadow_from_loop:
+                    shadow.submit(price)
+
+            portfolio_stop_loss_value = risk.stop_value
+            status_board.publish(
+                price=price,
+                value=current_value,
+                baseline=baseline_value,
+                realized=cumulative_realized,
+                balance_base=balance_base,
+                stop_loss_price=stop_loss_price if use_atr_stop else None,
+            )
+            if reporter and not clock.background:
+                reporter.run_pending()
 
             log(
-                f"Price: {price:.4f}, Value: {current_value:.2f}, Baseline: {baseline_value:.2f}"
+                f"Price: {price:.4f}, Value: {current_value:.2f}, Baseline: {baseline_value:.2f}, "
+                f"Drawdown: {risk.drawdown * 100:.2f}% (max {risk.max_drawdown * 100:.2f}%)",
+                key="status",
             )
             if use_atr_stop and stop_loss_price:
                 log(
-                    f"ATR Stop: {stop_loss_price:.4f}, Portfolio Stop: {portfolio_stop_loss_value:.2f}"
+                    f"ATR Stop: {stop_loss_price:.4f}, Portfolio Stop: {portfolio_stop_loss_value:.2f}",
+                    key="stops",
                 )
 
             # ATR trailing stop loss (if enabled)
+            # A stop that only partly filled keeps selling whatever the price does now
             if (
-                use_atr_stop
-                and stop_loss_price
-                and price <= stop_loss_price
-                and balance_base > 0
-            ):
+                stop_exit == "ATR"
+                or (use_atr_stop and stop_loss_price and price <= stop_loss_price)
+            ) and balance_base > 0:
+                if pending_harvest is not None:
+                    # The stop sells everything; stop working the harvest first
+                    pending_harvest.cancel()
+                    pending_harvest.wait()
+                    pending_harvest = None
+                    balance_base = fetch_balance(client, base_asset)
                 sell_qty = floor_decimal(balance_base, step_size)
                 if sell_qty * price >= min_notional:
                     # Send notification BEFORE trade
@@ -353,8 +1010,8 @@ def main():
 
                     # Execute trade
                     try:
-                        order_result = place_market_sell(
-                            client, SYMBOL, sell_qty, step_size
+                        order_result = place_stop_sell(
+                            client, SYMBOL, sell_qty, step_size, price
                         )
                         # Get actual executed quantity and price from order
                         executed_qty = Decimal(
@@ -373,9 +1030,18 @@ def main():
                             actual_price = total_cost / total_qty if total_qty > 0 else price
                         else:
                             actual_price = price
-                        
+
+                        unsold = floor_decimal(sell_qty - executed_qty, step_size)
+                        if unsold * price >= min_notional:
+                            # Not out yet: no success report, and the stop is retried
+                            log(f"ATR stop loss partially filled: sold {executed_qty:.6f}, {unsold:.6f} {base_asset} left")
+                            stop_exit = "ATR"
+                            send_telegram(f"⚠️ ATR Stop Loss Partially Filled\n\nSold {executed_qty:.6f} of {sell_qty:.6f} {base_asset}; retrying the rest")
+                            clock.sleep(CHECK_INTERVAL)
+                            continue
+
                         # Wait for balance to update
-                        time.sleep(1)
+                        clock.sleep(1)
                         new_balance_base = fetch_balance(client, base_asset)
                         new_balance_quote = fetch_balance(client, quote_asset)
                         new_portfolio_value = (new_balance_base * price) + new_balance_quote
@@ -397,7 +1063,13 @@ def main():
                     break
 
             # Portfolio-wide stop loss
-            if current_value <= portfolio_stop_loss_value and balance_base > 0:
+            if (stop_exit == "Portfolio" or risk.stop_triggered) and balance_base > 0:
+                if pending_harvest is not None:
+                    # The stop sells everything; stop working the harvest first
+                    pending_harvest.cancel()
+                    pending_harvest.wait()
+                    pending_harvest = None
+                    balance_base = fetch_balance(client, base_asset)
                 sell_qty = floor_decimal(balance_base, step_size)
                 if sell_qty * price >= min_notional:
                     # Send notification BEFORE trade
@@ -407,8 +1079,8 @@ def main():
 
                     # Execute trade
                     try:
-                        order_result = place_market_sell(
-                            client, SYMBOL, sell_qty, step_size
+                        order_result = place_stop_sell(
+                            client, SYMBOL, sell_qty, step_size, price
                         )
                         # Get actual executed quantity and price from order
                         executed_qty = Decimal(
@@ -427,9 +1099,18 @@ def main():
                             actual_price = total_cost / total_qty if total_qty > 0 else price
                         else:
                             actual_price = price
-                        
+
+                        unsold = floor_decimal(sell_qty - executed_qty, step_size)
+                        if unsold * price >= min_notional:
+                            # Not out yet: no success report, and the stop is retried
+                            log(f"Portfolio stop loss partially filled: sold {executed_qty:.6f}, {unsold:.6f} {base_asset} left")
+                            stop_exit = "Portfolio"
+                            send_telegram(f"⚠️ Portfolio Stop Loss Partially Filled\n\nSold {executed_qty:.6f} of {sell_qty:.6f} {base_asset}; retrying the rest")
+                            clock.sleep(CHECK_INTERVAL)
+                            continue
+
                         # Wait for balance to update
-                        time.sleep(1)
+                        clock.sleep(1)
                         new_balance_base = fetch_balance(client, base_asset)
                         new_balance_quote = fetch_balance(client, quote_asset)
                         new_portfolio_value = (new_balance_base * price) + new_balance_quote
@@ -459,26 +1140,56 @@ def main():
                 dynamic_target = max(TARGET_PCT, atr_pct / Decimal("2"))
                 target_value = baseline_value * (Decimal("1") + dynamic_target)
 
-            if current_value >= target_value and balance_base > 0:
+            harvest_ready = False
+            if pending_harvest is not None:
+                # A sliced harvest is working; settle it once all children are done
+                harvest_ready = pending_harvest.done()
+            elif current_value >= target_value and balance_base > 0:
                 profit_value = current_value - baseline_value
                 sell_amount_base = profit_value / price
                 sell_amount_base = floor_decimal(sell_amount_base, step_size)
 
                 if sell_amount_base <= 0 or sell_amount_base * price < min_notional:
                     log("Profit sell amount below min notional, skipping")
-                    time.sleep(CHECK_INTERVAL)
+                    clock.sleep(CHECK_INTERVAL)
                     continue
 
+                # The local book says what the sell would really get; wait while
+                # its slippage would take the portfolio back under the target
+                if book and book.synced:
+                    vwap, fillable = book.vwap_sell(float(sell_amount_base))
+                    if vwap and fillable >= float(sell_amount_base):
+                        exit_value = current_value - sell_amount_base * (price - Decimal(str(vwap)))
+                        if exit_value < target_value:
+                            log(
+                                f"Harvest deferred: executable price {vwap:.4f} leaves {exit_value:.2f} below target",
+                                key="harvest-depth",
+                            )
+                            clock.sleep(CHECK_INTERVAL)
+                            continue
+
                 # Send notification BEFORE trade
                 profit_pct = (profit_value / baseline_value) * 100
                 msg_before = f"💰 Profit Target Reached\n\nAbout to harvest profit:\n• Sell {sell_amount_base:.6f} {base_asset} at ~{price:.2f} {quote_asset}\n• Profit: {profit_pct:.2f}% ({profit_value:.2f} {quote_asset})"
                 send_telegram(msg_before)
 
+                if execution_engine is not None:
+                    pending_harvest = execution_engine.submit(sell_amount_base, price)
+                    log(f"Harvest sell working in slices: {sell_amount_base:.6f} {base_asset}")
+                else:
+                    harvest_ready = True
+
+            if harvest_ready:
                 # Execute trade
                 try:
-                    order_result = place_market_sell(
-                        client, SYMBOL, sell_amount_base, step_size
-                    )
+                    if pending_harvest is not None:
+                        parent, pending_harvest = pending_harvest, None
+                        sell_amount_base = parent.total_qty
+                        order_result = parent.result()
+                    else:
+                        order_result = place_market_sell(
+                            client, SYMBOL, sell_amount_base, step_size
+                        )
                     # Get actual executed quantity and price from order
                     executed_qty = Decimal(
                         order_result.get("executedQty", str(sell_amount_base))
@@ -501,11 +1212,12 @@ def main():
                     realized_pl = proceeds - (executed_qty * entry_price)
                     cumulative_realized += realized_pl
 
-                    time.sleep(1)
+                    clock.sleep(1)
                     new_balance_base = fetch_balance(client, base_asset)
                     new_balance_quote = fetch_balance(client, quote_asset)
                     # Update baseline to new total portfolio value
                     baseline_value = (new_balance_base * price) + new_balance_quote
+                    risk.set_baseline(baseline_value)
                     entry_price = price
 
                     # Send confirmation AFTER trade
@@ -535,11 +1247,12 @@ def main():
                                         f"Re-entry: Buying {buy_quote_qty:.2f} {quote_asset} worth"
                                     )
                                     place_market_buy_quote(client, SYMBOL, buy_quote_qty)
-                                    time.sleep(1)
+                                    clock.sleep(1)
                                     new_balance_base = fetch_balance(client, base_asset)
                                     new_balance_quote = fetch_balance(client, quote_asset)
                                     # Update baseline to new total portfolio value
                                     baseline_value = (new_balance_base * price) + new_balance_quote
+                                    risk.set_baseline(baseline_value)
                                     entry_price = price
                                     if use_atr_stop and atr:
                                         stop_loss_price = entry_price - (
@@ -556,16 +1269,51 @@ def main():
                 except Exception as e:
                     log(f"Profit harvest trade failed: {e}")
                     send_telegram(f"❌ Profit Harvest Failed: {e}")
-                    time.sleep(CHECK_INTERVAL)
+                    clock.sleep(CHECK_INTERVAL)
                     continue
 
-            time.sleep(CHECK_INTERVAL)
+            if poll_scheduler:
+                triggers = [stop_loss_price if use_atr_stop else None]
+                if balance_base > 0:
+                    # Prices at which the portfolio stop and the harvest target fire
+                    triggers.append((portfolio_stop_loss_value - balance_quote) / balance_base)
+                    triggers.append((target_value - balance_quote) / balance_base)
+                delay = poll_scheduler.next_delay(price, triggers, atr if use_atr_stop else None)
+                log(f"Next check in {delay:.1f}s", DEBUG)
+                clock.sleep(delay)
+            else:
+                clock.sleep(CHECK_INTERVAL)
 
     except KeyboardInterrupt:
         log("Bot stopped by user")
     except Exception as e:
-        log(f"Error: {e}")
+        log(f"Error: {e}", ERROR)
         send_telegram(f"⚠️ Bot error: {e}")
+    finally:
+        if reporter:
+            reporter.stop()
+        if config_watcher:
+            config_watcher.stop()
+        if shadow:
+            shadow.stop()
+            shadow.log_leaderboard()
+        if hedged_reader:
+            log(f"Read endpoints: {hedged_reader.summary()}")
+            hedged_reader.close()
+        if price_feed:
+            price_feed.stop()
+        if pending_harvest is not None:
+            pending_harvest.cancel()
+        if book:
+            book.stop()
+        if twm and twm is not market_data:
+            twm.stop()
+        if market_data:
+            market_data.stop()
+        if order_gateway:
+            order_gateway.close()
+        profiler.stop()
+        logger.close()
 
 
 if __name__ == "__main__":
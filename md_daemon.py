@@ -0,0 +1,431 @@
+"""
+Shared market-data daemon for several bot processes on one host.
+
+The daemon owns the exchange connections. Bots connect over a Unix socket
+and subscribe to streams by name ("bnbusdt@trade", "bnbusdt@depth",
+"bnbusdt@kline_5m"). Each upstream stream is opened once, on the first
+subscriber, and closed when the last one leaves. Every message is fanned out
+to all subscribers of that stream. REST reads the bots would otherwise repeat
+(price ticker, depth snapshot) are served from a short TTL cache, so upstream
+connections and API weight do not grow with the number of bots.
+
+Wire format is newline-delimited JSON in both directions:
+    -> {"op": "subscribe", "streams": ["bnbusdt@trade"]}
+    -> {"op": "unsubscribe", "streams": ["bnbusdt@trade"]}
+    -> {"id": 1, "op": "price", "symbol": "BNBUSDT"}
+    -> {"id": 2, "op": "snapshot", "symbol": "BNBUSDT", "limit": 1000}
+    <- {"stream": "bnbusdt@trade", "data": {...}}
+    <- {"id": 1, "result": {...}} or {"id": 1, "error": "..."}
+
+A subscriber that cannot keep up is disconnected rather than allowed to
+stall the fan-out. MarketDataClient reconnects and resubscribes, and its
+depth consumers see an error event so local books resync.
+
+Run with: python md_daemon.py
+"""
+
+import itertools
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+MD_SOCKET_PATH = os.getenv("MD_SOCKET_PATH", "/tmp/binance-md.sock")
+MD_REST_TTL = float(os.getenv("MD_REST_TTL", "1.0"))  # seconds
+MD_SUBSCRIBER_QUEUE = int(os.getenv("MD_SUBSCRIBER_QUEUE", "10000"))
+TESTNET = os.getenv("TESTNET", "false").lower() in ("1", "true", "yes")
+
+
+def log(msg):
+    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    print(f"[{ts} UTC] [md] {msg}")
+
+
+def _stream_name(stream):
+    """Symbol streams are lowercase; all-market names ("!miniTicker@arr") are not."""
+    return stream if stream.startswith("!") else stream.lower()
+
+
+def _encode(obj):
+    return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+
+# -------------------------
+# DAEMON
+# -------------------------
+class _Subscriber:
+    """One connected bot. Writes go through a bounded queue and a writer thread."""
+
+    def __init__(self, conn, max_queue):
+        self.conn = conn
+        self.streams = set()
+        self.closed = False
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(target=self._write_loop, name="md-writer", daemon=True)
+        self._writer.start()
+
+    def push(self, line):
+        if self.closed:
+            return
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self.close()  # slow consumer; it reconnects and resyncs
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self._queue.put_nowait(None)  # never block: this runs on the fan-out thread
+        except queue.Full:
+            pass  # the writer sees closed after its current send fails
+
+    def _write_loop(self):
+        while True:
+            line = self._queue.get()
+            if line is None or self.closed:
+                break
+            try:
+                self.conn.sendall(line)
+            except OSError:
+                self.close()
+                break
+        self.conn.close()
+
+
+class MarketDataDaemon:
+    """Owns upstream streams and REST reads, fans them out to local subscribers."""
+
+    def __init__(
+        self,
+        socket_path,
+        client,
+        stream_manager,
+        rest_ttl=MD_REST_TTL,
+        max_queue=MD_SUBSCRIBER_QUEUE,
+        log=log,
+    ):
+        self.socket_path = socket_path
+        self.client = client
+        self.streams = stream_manager  # ThreadedWebsocketManager or compatible
+        self.rest_ttl = rest_ttl
+        self.max_queue = max_queue
+        self.log = log
+        self.upstream = {}  # stream -> socket name from the stream manager
+        self.subscribers = defaultdict(set)  # stream -> subscribers
+        self.last = {}  # stream -> last encoded message (not for diff streams)
+        self._lock = threading.Lock()
+        self._rest_cache = {}  # key -> (fetched_at, result)
+        self._rest_locks = defaultdict(threading.Lock)
+        self._server = None
+        self._stop_event = threading.Event()
+
+    # ----- upstream -----
+
+    def on_message(self, msg):
+        """Callback for the multiplex sockets."""
+        stream = msg.get("stream")
+        if stream is None:
+            if msg.get("e") == "error":
+                self.log(f"Upstream stream error: {msg.get('m')}")
+            return
+        line = _encode({"stream": stream, "data": msg.get("data")})
+        with self._lock:
+            if "@depth" not in stream:
+                self.last[stream] = line  # diffs are useless without the ones before
+            targets = list(self.subscribers.get(stream, ()))
+        for sub in targets:
+            sub.push(line)
+
+    def subscribe(self, sub, streams):
+        for stream in streams:
+            stream = _stream_name(stream)
+            with self._lock:
+                if stream not in self.upstream:
+                    self.upstream[stream] = self.streams.start_multiplex_socket(
+                        callback=self.on_message, streams=[stream]
+                    )
+                    self.log(f"Opened upstream {stream}")
+                self.subscribers[stream].add(sub)
+                sub.streams.add(stream)
+                cached = self.last.get(stream)
+            if cached:
+                sub.push(cached)
+
+    def unsubscribe(self, sub, streams):
+        for stream in streams:
+            stream = _stream_name(stream)
+            with self._lock:
+                sub.streams.discard(stream)
+                subs = self.subscribers.get(stream)
+                if subs is None:
+                    continue
+                subs.discard(sub)
+                if subs:
+                    continue
+                del self.subscribers[stream]
+                self.last.pop(stream, None)
+                name = self.upstream.pop(stream, None)
+            if name is not None:
+                self.streams.stop_socket(name)
+                self.log(f"Closed upstream {stream}")
+
+    # ----- shared REST reads -----
+
+    def cached(self, key, fetch):
+        """Serve a REST read from cache; concurrent misses share one request."""
+        with self._rest_locks[key]:
+            hit = self._rest_cache.get(key)
+            if hit and time.time() - hit[0] < self.rest_ttl:
+                return hit[1]
+            result = fetch()
+            self._rest_cache[key] = (time.time(), result)
+            return result
+
+    def handle_request(self, sub, req):
+        op = req.get("op")
+        if op == "subscribe":
+            self.subscribe(sub, req.get("streams", []))
+            return
+        if op == "unsubscribe":
+            self.unsubscribe(sub, req.get("streams", []))
+            return
+        reply = {"id": req.get("id")}
+        try:
+            symbol = req["symbol"].upper()
+            if op == "price":
+                reply["result"] = self.cached(
+                    ("price", symbol), lambda: self.client.get_symbol_ticker(symbol=symbol)
+                )
+            elif op == "snapshot":
+                limit = int(req.get("limit", 1000))
+                reply["result"] = self.cached(
+                    ("snapshot", symbol, limit),
+                    lambda: self.client.get_order_book(symbol=symbol, limit=limit),
+                )
+            else:
+                reply["error"] = f"unknown op {op!r}"
+        except Exception as e:
+            reply["error"] = str(e)
+        sub.push(_encode(reply))
+
+    # ----- local socket -----
+
+    def _serve_connection(self, conn):
+        sub = _Subscriber(conn, self.max_queue)
+        try:
+            with conn.makefile("r", encoding="utf-8") as reader:
+                for line in reader:
+                    if not line.strip():
+                        continue
+                    try:
+                        req = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.handle_request(sub, req)
+        except OSError:
+            pass
+        finally:
+            self.unsubscribe(sub, list(sub.streams))
+            sub.close()
+
+    def bind(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale socket from a previous run
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.socket_path)
+        self._server.listen()
+        self.log(f"Listening on {self.socket_path}")
+
+    def serve_forever(self):
+        if self._server is None:
+            self.bind()
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+            threading.Thread(
+                target=self._serve_connection, args=(conn,), name="md-conn", daemon=True
+            ).start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._server is not None:
+            self._server.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+# -------------------------
+# CONSUMER
+# -------------------------
+class MarketDataClient:
+    """
+    Bot side of the daemon. Mirrors the ThreadedWebsocketManager and Client
+    calls the bots use, so it can stand in for either.
+    """
+
+    def __init__(self, socket_path=MD_SOCKET_PATH, timeout=5.0, reconnect_delay=1.0, log=log):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self.reconnect_delay = reconnect_delay
+        self.log = log
+        self.callbacks = {}  # stream -> callback
+        self.connected = threading.Event()
+        self._sock = None
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}  # id -> [Event, reply]
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Connect (raises if the daemon is not running) and start the reader."""
+        self._connect()
+        self._thread = threading.Thread(target=self._run, name="md-client", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.socket_path)
+        self._sock = sock
+        self.connected.set()
+        if self.callbacks:
+            self._send({"op": "subscribe", "streams": list(self.callbacks)})
+
+    def _send(self, obj):
+        with self._send_lock:
+            self._sock.sendall(_encode(obj))
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                with self._sock.makefile("r", encoding="utf-8") as reader:
+                    for line in reader:
+                        self._dispatch(json.loads(line))
+            except (OSError, ValueError) as e:
+                if not self._stop_event.is_set():
+                    self.log(f"Market data daemon read failed: {e}")
+            self.connected.clear()
+            self._sock.close()
+            self._fail_pending("market data daemon disconnected")
+            if self._stop_event.is_set():
+                return
+            for callback in list(self.callbacks.values()):
+                callback({"e": "error", "m": "market data daemon disconnected"})
+            while not self._stop_event.wait(self.reconnect_delay):
+                try:
+                    self._connect()
+                    self.log("Reconnected to market data daemon")
+                    break
+                except OSError:
+                    continue
+
+    def _dispatch(self, msg):
+        if "stream" in msg:
+            callback = self.callbacks.get(msg["stream"])
+            if callback:
+                callback(msg["data"])
+            return
+        slot = self._pending.pop(msg.get("id"), None)
+        if slot:
+            slot[1] = msg
+            slot[0].set()
+
+    def _fail_pending(self, reason):
+        for slot in list(self._pending.values()):
+            slot[1] = {"error": reason}
+            slot[0].set()
+        self._pending.clear()
+
+    def request(self, op, **params):
+        if not self.connected.is_set():
+            raise ConnectionError("market data daemon not connected")
+        req_id = next(self._ids)
+        slot = [threading.Event(), None]
+        self._pending[req_id] = slot
+        try:
+            self._send({"id": req_id, "op": op, **params})
+            if not slot[0].wait(self.timeout):
+                raise TimeoutError(f"market data daemon {op} timed out")
+        finally:
+            self._pending.pop(req_id, None)
+        reply = slot[1]
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    # ----- ThreadedWebsocketManager-compatible -----
+
+    def subscribe(self, stream, callback):
+        self.callbacks[stream] = callback
+        if self.connected.is_set():
+            self._send({"op": "subscribe", "streams": [stream]})
+        return stream
+
+    def start_trade_socket(self, callback, symbol):
+        return self.subscribe(f"{symbol.lower()}@trade", callback)
+
+    def start_depth_socket(self, callback, symbol, depth=None):
+        return self.subscribe(f"{symbol.lower()}@depth", callback)
+
+    def start_kline_socket(self, callback, symbol, interval="1m"):
+        return self.subscribe(f"{symbol.lower()}@kline_{interval}", callback)
+
+    def start_miniticker_socket(self, callback, update_time=1000):
+        return self.subscribe("!miniTicker@arr", callback)
+
+    def stop_socket(self, stream):
+        self.callbacks.pop(stream, None)
+        if self.connected.is_set():
+            self._send({"op": "unsubscribe", "streams": [stream]})
+
+    # ----- Client-compatible REST reads -----
+
+    def get_symbol_ticker(self, symbol):
+        return self.request("price", symbol=symbol)
+
+    def get_order_book(self, symbol, limit=1000):
+        return self.request("snapshot", symbol=symbol, limit=limit)
+
+
+def main():
+    from binance import ThreadedWebsocketManager
+    from binance.client import Client
+
+    client = Client(testnet=TESTNET, ping=False)  # public endpoints only
+    twm = ThreadedWebsocketManager(testnet=TESTNET)
+    twm.start()
+    daemon = MarketDataDaemon(MD_SOCKET_PATH, client, twm)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        log("Market data daemon stopped")
+    finally:
+        daemon.stop()
+        twm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Local L2 order book maintained from the @depth diff stream.
+
+Follows the Binance procedure for a local book: buffer diff events, load a
+REST snapshot, drop events already covered by it, then apply events in
+sequence. A gap in update ids marks the book unsynced and schedules a new
+snapshot on a background thread, so the stream callback never blocks on
+REST.
+
+Levels are kept in sorted price lists (bisect) with a dict of quantities.
+Best price lookups are O(1). A level update costs O(log n) plus a list shift
+when a level is added or removed. Executable-price queries such as
+vwap_sell(qty) walk only the levels they consume.
+"""
+
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+
+
+class BookSide:
+    """One side of the book. Bids are stored with negated keys so the best is first."""
+
+    def __init__(self, is_bid):
+        self.sign = -1.0 if is_bid else 1.0
+        self.keys = []  # sorted; best level at index 0
+        self.qty = {}  # price -> quantity
+
+    def clear(self):
+        self.keys = []
+        self.qty = {}
+
+    def set(self, price, qty):
+        key = self.sign * price
+        if qty <= 0:
+            if price in self.qty:
+                del self.qty[price]
+                i = bisect_left(self.keys, key)
+                if i < len(self.keys) and self.keys[i] == key:
+                    del self.keys[i]
+            return
+        if price not in self.qty:
+            insort(self.keys, key)
+        self.qty[price] = qty
+
+    def best(self):
+        return self.sign * self.keys[0] if self.keys else None
+
+    def levels(self, n=None):
+        keys = self.keys if n is None else self.keys[:n]
+        return [(self.sign * k, self.qty[self.sign * k]) for k in keys]
+
+    def walk(self, qty):
+        """Fill qty against this side. Returns (vwap, filled_qty)."""
+        remaining = qty
+        cost = 0.0
+        for key in self.keys:
+            price = self.sign * key
+            take = min(remaining, self.qty[price])
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                break
+        filled = qty - max(remaining, 0.0)
+        return (cost / filled if filled > 0 else None), filled
+
+    def depth_to(self, limit_price):
+        """Total quantity at prices no worse than limit_price."""
+        total = 0.0
+        for key in self.keys:
+            if key > self.sign * limit_price:
+                break
+            total += self.qty[self.sign * key]
+        return total
+
+
+class LocalOrderBook:
+    """Diff-depth maintained order book with snapshot resync."""
+
+    def __init__(self, symbol, fetch_snapshot=None, max_buffer=1000, log=print):
+        self.symbol = symbol
+        self.fetch_snapshot = fetch_snapshot
+        self.log = log
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_update_id = None
+        self.synced = False
+        self.resyncs = 0
+        self._buffer = deque(maxlen=max_buffer)
+        self._lock = threading.Lock()
+        self._need_snapshot = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # ----- stream side -----
+
+    def handle_depth_message(self, msg):
+        """Callback for ThreadedWebsocketManager.start_depth_socket (diff stream)."""
+        if msg.get("e") == "error":
+            self._mark_unsynced(f"stream error: {msg.get('m')}")
+            return
+        if msg.get("e") != "depthUpdate":
+            return
+        with self._lock:
+            if not self.synced:
+                self._buffer.append(msg)
+                return
+            if not self._apply_locked(msg):
+                self._mark_unsynced_locked(
+                    f"gap: expected U={self.last_update_id + 1}, got U={msg['U']}"
+                )
+                self._buffer.append(msg)
+
+    def _apply_locked(self, msg):
+        """Apply one diff event. Returns False on a sequence gap."""
+        if msg["u"] <= self.last_update_id:
+            return True  # already covered
+        if msg["U"] > self.last_update_id + 1:
+            return False
+        for price, qty in msg["b"]:
+            self.bids.set(float(price), float(qty))
+        for price, qty in msg["a"]:
+            self.asks.set(float(price), float(qty))
+        self.last_update_id = msg["u"]
+        return True
+
+    def load_snapshot(self, snapshot):
+        """Load a REST depth snapshot and replay the buffered diffs on top."""
+        with self._lock:
+            self.bids.clear()
+            self.asks.clear()
+            for price, qty in snapshot["bids"]:
+                self.bids.set(float(price), float(qty))
+            for price, qty in snapshot["asks"]:
+                self.asks.set(float(price), float(qty))
+            self.last_update_id = snapshot["lastUpdateId"]
+
+            buffered = [m for m in self._buffer if m["u"] > self.last_update_id]
+            self._buffer.clear()
+            for msg in buffered:
+                if not self._apply_locked(msg):
+                    # Snapshot is older than the oldest buffered diff; try again
+                    self._buffer.extend(buffered)
+                    self.synced = False
+                    return False
+            self.synced = True
+            return True
+
+    def _mark_unsynced(self, reason):
+        with self._lock:
+            self._mark_unsynced_locked(reason)
+
+    def _mark_unsynced_locked(self, reason):
+        if self.synced:
+            self.log(f"Order book {self.symbol} out of sync ({reason}); resyncing")
+        self.synced = False
+        self._need_snapshot.set()
+
+    # ----- snapshot maintenance -----
+
+    def start(self):
+        """Start the background thread that loads snapshots when needed."""
+        self._need_snapshot.set()
+        self._thread = threading.Thread(target=self._run, name="order-book", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._need_snapshot.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._need_snapshot.wait()
+            if self._stop_event.is_set():
+                return
+            self._need_snapshot.clear()
+            try:
+                # Give the stream a moment to buffer events past the snapshot
+                self._stop_event.wait(0.5)
+                if self.load_snapshot(self.fetch_snapshot()):
+                    self.resyncs += 1
+                else:
+                    self._need_snapshot.set()
+            except Exception as e:
+                self.log(f"Order book snapshot failed: {e}")
+                self._stop_event.wait(2)
+                self._need_snapshot.set()
+
+    # ----- queries -----
+
+    def best_bid(self):
+        with self._lock:
+            return self.bids.best()
+
+    def best_ask(self):
+        with self._lock:
+            return self.asks.best()
+
+    def mid(self):
+        with self._lock:
+            bid, ask = self.bids.best(), self.asks.best()
+        return (bid + ask) / 2 if bid is not None and ask is not None else None
+
+    def vwap_sell(self, qty):
+        """Average price a market sell of qty would get, and the qty fillable."""
+        with self._lock:
+            return self.bids.walk(qty)
+
+    def vwap_buy(self, qty):
+        with self._lock:
+            return self.asks.walk(qty)
+
+    def bid_depth(self, max_slippage_pct):
+        """Quantity bid within max_slippage_pct of the best bid."""
+        with self._lock:
+            best = self.bids.best()
+            if best is None:
+                return 0.0
+            return self.bids.depth_to(best * (1 - max_slippage_pct))
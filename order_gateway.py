@@ -0,0 +1,179 @@
+"""
+Low-latency order gateway over the Binance WebSocket API.
+
+Keeps one persistent WebSocket API connection open for order.place and
+order.cancel, so an order costs a single frame instead of a new HTTPS
+request. Requests are signed with an HMAC object keyed once at startup
+(each request signs a copy of it), and responses are matched to requests
+by id. HMAC API keys cannot use session.logon, so every request carries
+its own signature.
+
+If the connection is down the caller falls back to REST. When the
+connection drops after a request was sent, GatewayDisconnected.sent is set:
+the exchange may already have accepted that order.
+"""
+
+import hashlib
+import hmac
+import itertools
+import json
+import threading
+import time
+from urllib.parse import urlencode
+
+from binance.exceptions import BinanceOrderException
+from websockets.sync.client import connect as ws_connect
+
+WS_API_URL = "wss://ws-api.binance.com:443/ws-api/v3"
+WS_API_TESTNET_URL = "wss://ws-api.testnet.binance.vision/ws-api/v3"
+
+
+class GatewayDisconnected(Exception):
+    """The WebSocket session is down. sent=True means the outcome is unknown."""
+
+    def __init__(self, message, sent=False):
+        super().__init__(message)
+        self.sent = sent
+
+
+class OrderGateway:
+    """Persistent, signed WebSocket API session for placing and cancelling orders."""
+
+    def __init__(
+        self,
+        api_key,
+        api_secret,
+        url=WS_API_URL,
+        timeout=5.0,
+        timestamp_ms=None,
+        recv_window=5000,
+        reconnect_delay=1.0,
+        log=print,
+        connect=ws_connect,
+    ):
+        self.api_key = api_key
+        self.url = url
+        self.timeout = timeout
+        self.timestamp_ms = timestamp_ms or (lambda: int(time.time() * 1000))
+        self.recv_window = recv_window
+        self.reconnect_delay = reconnect_delay
+        self.log = log
+        self._connect = connect
+        # Keyed once; copy() per request skips re-deriving the HMAC pads
+        self._mac = hmac.new(api_secret.encode(), digestmod=hashlib.sha256)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._ws = None
+        self._connected = threading.Event()
+        self._closing = False
+        self._thread = None
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def start(self, wait=True):
+        """Start the connection thread. Optionally wait for the first connect."""
+        self._thread = threading.Thread(target=self._run, name="order-gateway", daemon=True)
+        self._thread.start()
+        if wait:
+            self._connected.wait(self.timeout)
+        return self.connected
+
+    def close(self):
+        self._closing = True
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+
+    def sign(self, params):
+        """HMAC-SHA256 signature of the alphabetically sorted params."""
+        mac = self._mac.copy()
+        mac.update(urlencode(sorted(params.items())).encode())
+        return mac.hexdigest()
+
+    def request(self, method, params, signed=True, timeout=None):
+        """Send a request and block until its response arrives. Returns result."""
+        ws = self._ws
+        if ws is None or not self.connected:
+            raise GatewayDisconnected("order gateway not connected")
+
+        params = dict(params)
+        if signed:
+            params["apiKey"] = self.api_key
+            params["recvWindow"] = self.recv_window
+            params["timestamp"] = self.timestamp_ms()
+            params["signature"] = self.sign(params)
+
+        req_id = str(next(self._ids))
+        slot = {"event": threading.Event(), "response": None}
+        with self._lock:
+            self._pending[req_id] = slot
+        try:
+            try:
+                with self._send_lock:
+                    ws.send(json.dumps({"id": req_id, "method": method, "params": params}))
+            except Exception as e:
+                raise GatewayDisconnected(f"send failed: {e}")
+
+            if not slot["event"].wait(timeout or self.timeout):
+                raise GatewayDisconnected(f"{method} timed out", sent=True)
+        finally:
+            with self._lock:
+                self._pending.pop(req_id, None)
+
+        response = slot["response"]
+        if response is None:
+            raise GatewayDisconnected(f"connection lost during {method}", sent=True)
+        if response.get("status") != 200:
+            error = response.get("error", {})
+            raise BinanceOrderException(error.get("code"), error.get("msg"))
+        return response.get("result")
+
+    def place_order(self, **params):
+        params.setdefault("newOrderRespType", "FULL")
+        return self.request("order.place", params)
+
+    def cancel_order(self, **params):
+        return self.request("order.cancel", params)
+
+    def _run(self):
+        while not self._closing:
+            try:
+                self._ws = self._connect(self.url)
+                self._connected.set()
+                self.log("Order gateway connected")
+                for message in self._ws:
+                    self._dispatch(message)
+            except Exception as e:
+                if not self._closing:
+                    self.log(f"Order gateway connection error: {e}")
+            finally:
+                self._connected.clear()
+                self._ws = None
+                self._fail_pending()
+            if not self._closing:
+                time.sleep(self.reconnect_delay)
+
+    def _dispatch(self, message):
+        try:
+            response = json.loads(message)
+        except ValueError:
+            return
+        with self._lock:
+            slot = self._pending.get(str(response.get("id")))
+        if slot is not None:
+            slot["response"] = response
+            slot["event"].set()
+
+    def _fail_pending(self):
+        # Wake every waiter; a None response means the connection dropped
+        with self._lock:
+            slots = list(self._pending.values())
+        for slot in slots:
+            slot["event"].set()
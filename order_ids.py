@@ -0,0 +1,121 @@
+"""
+Idempotent order placement with deterministic client order ids.
+
+Each logical order gets a newClientOrderId derived from the bot instance
+and an intent sequence number. Every retry of that order reuses the same id.
+When a submission fails ambiguously (a timeout, a dropped connection, a 5xx,
+or -1007 "send status unknown"), the order is looked up by
+origClientOrderId before anything is resent:
+- If the exchange has it, its state is returned and nothing is resent.
+- If it reports "order does not exist" (-2013), resubmitting under the same
+  id is safe.
+
+Definite rejections (insufficient balance, filter failures) are raised
+straight away. This is what lets order placement run with short timeouts and
+fast retries without risking a double sell.
+"""
+
+import hashlib
+import itertools
+from decimal import Decimal
+
+import requests
+
+from clock import SYSTEM_CLOCK
+
+# Binance: newClientOrderId must match ^[\.A-Z\:/a-z0-9_-]{1,36}$
+MAX_CLIENT_ORDER_ID_LEN = 36
+
+# "Send status unknown; execution status unknown" / disconnected / unexpected response
+AMBIGUOUS_CODES = {-1000, -1001, -1006, -1007}
+ORDER_DOES_NOT_EXIST = -2013
+
+
+def client_order_id(prefix, symbol, side, intent):
+    """Deterministic id for one logical order."""
+    digest = hashlib.sha256(f"{symbol}|{side}|{intent}".encode()).hexdigest()
+    return f"{prefix}-{digest}"[:MAX_CLIENT_ORDER_ID_LEN]
+
+
+class OrderIdAllocator:
+    """Hands out one deterministic client order id per logical order."""
+
+    def __init__(self, prefix, session=None, clock=SYSTEM_CLOCK):
+        self.prefix = prefix
+        self.session = session if session is not None else int(clock.time() * 1000)
+        self._seq = itertools.count(1)
+
+    def next_id(self, symbol, side):
+        return client_order_id(self.prefix, symbol, side, f"{self.session}:{next(self._seq)}")
+
+
+def is_ambiguous(error):
+    """True if the order may or may not have reached the matching engine."""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if getattr(error, "sent", False):  # GatewayDisconnected after the frame went out
+        return True
+    if getattr(error, "code", None) in AMBIGUOUS_CODES:
+        return True
+    return (getattr(error, "status_code", 0) or 0) >= 500
+
+
+def as_order_result(order):
+    """Shape a get_order response like a FULL placement response."""
+    executed = Decimal(order.get("executedQty", "0"))
+    quote = Decimal(order.get("cummulativeQuoteQty", "0"))
+    result = dict(order)
+    if executed > 0 and not order.get("fills"):
+        result["fills"] = [{"price": str(quote / executed), "qty": str(executed)}]
+    return result
+
+
+def submit_idempotent(
+    submit,
+    lookup,
+    cid,
+    max_attempts=5,
+    backoff_sec=0.2,
+    recv_window_sec=5.0,
+    log=print,
+    clock=SYSTEM_CLOCK,
+):
+    """
+    Place an order under a fixed client order id, resolving ambiguous failures
+    by lookup(cid) before resubmitting. submit(cid) places the order;
+    lookup(cid) returns the order or raises code -2013 if it does not exist.
+
+    A request the exchange has not seen yet is rejected once its timestamp is
+    older than recvWindow, so "does not exist" is only trusted after that.
+    """
+    last_err = None
+    for attempt in range(1, max_attempts + 1):
+        sent_at = clock.time()
+        try:
+            return submit(cid)
+        except Exception as e:
+            if not is_ambiguous(e):
+                raise  # the exchange answered: a definite rejection
+            last_err = e
+        missing = False
+        for _ in range(max_attempts):
+            try:
+                order = lookup(cid)
+                log(f"Order {cid} found after '{last_err}'; not resubmitting")
+                return as_order_result(order)
+            except Exception as e:
+                if getattr(e, "code", None) != ORDER_DOES_NOT_EXIST:
+                    last_err = e
+                    clock.sleep(backoff_sec)
+                    continue
+                wait_sec = sent_at + recv_window_sec - clock.time()
+                if wait_sec <= 0:
+                    missing = True
+                    break
+                clock.sleep(wait_sec)  # the original may still land; look once more after
+        if not missing:
+            break  # could not learn the order's fate; do not risk a duplicate
+        if attempt < max_attempts:
+            log(f"Order {cid} not on the exchange after '{last_err}'; resubmitting")
+            clock.sleep(backoff_sec * attempt)
+    raise last_err
@@ -0,0 +1,85 @@
+"""
+Adaptive poll cadence for the REST trading loop.
+
+The next poll is scheduled from how far the price is from the nearest
+trigger (ATR stop, portfolio stop, harvest target) measured in ATR units.
+The bot polls at min_interval when within near_atr of a trigger and at
+max_interval when beyond far_atr. In between, the interval is interpolated
+geometrically, so it shortens quickly as the price closes in. Without an ATR,
+distance is measured in units of fallback_pct of the price.
+
+Every poll's request weight is recorded in a rolling one-minute window. The
+delay never lets the loop exceed weight_budget per minute, however close the
+price is to a trigger.
+"""
+
+import time
+from collections import deque
+from decimal import Decimal
+
+
+class PollScheduler:
+    """Picks the delay before the next poll."""
+
+    def __init__(
+        self,
+        min_interval=1.0,
+        max_interval=30.0,
+        near_atr=0.5,
+        far_atr=5.0,
+        fallback_pct=Decimal("0.005"),
+        weight_per_poll=22,
+        weight_budget=600,
+        clock=time.monotonic,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.near_atr = near_atr
+        self.far_atr = far_atr
+        self.fallback_pct = fallback_pct
+        self.weight_per_poll = weight_per_poll
+        self.weight_budget = weight_budget
+        self.clock = clock
+        self._spent = deque()  # (time, weight) within the last minute
+
+    def distance(self, price, triggers, atr=None):
+        """Distance from price to the nearest trigger, in ATR (or fallback) units."""
+        levels = [t for t in triggers if t is not None and t > 0]
+        if not levels or price <= 0:
+            return None
+        unit = atr if atr else price * self.fallback_pct
+        return float(min(abs(price - t) for t in levels) / unit)
+
+    def interval_for(self, distance):
+        if distance is None or distance >= self.far_atr:
+            return self.max_interval
+        if distance <= self.near_atr:
+            return self.min_interval
+        frac = (distance - self.near_atr) / (self.far_atr - self.near_atr)
+        return self.min_interval * (self.max_interval / self.min_interval) ** frac
+
+    def record(self, weight=None):
+        """Account for one poll's request weight."""
+        self._spent.append((self.clock(), self.weight_per_poll if weight is None else weight))
+
+    def budget_delay(self):
+        """Smallest delay that keeps the next poll within the weight budget."""
+        now = self.clock()
+        while self._spent and self._spent[0][0] <= now - 60:
+            self._spent.popleft()
+        delay = 60.0 * self.weight_per_poll / self.weight_budget
+        used = sum(w for _, w in self._spent)
+        if used + self.weight_per_poll > self.weight_budget and self._spent:
+            # Wait until enough of the window has expired
+            excess = used + self.weight_per_poll - self.weight_budget
+            for ts, weight in self._spent:
+                excess -= weight
+                if excess <= 0:
+                    delay = max(delay, ts + 60 - now)
+                    break
+        return delay
+
+    def next_delay(self, price, triggers, atr=None):
+        """Seconds to wait before the next poll."""
+        interval = self.interval_for(self.distance(price, triggers, atr))
+        return max(interval, self.budget_delay())
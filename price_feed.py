@@ -0,0 +1,161 @@
+"""
+Failover price feed: trade stream primary, REST polling fallback.
+
+The stream is considered stale when no message has arrived for stale_after
+seconds. A monitor thread checks this every check_interval, so the switch to
+REST happens within stale_after + check_interval. While stale, the feed polls
+fetch_price at an adaptive interval. It starts at poll_min, backs off towards
+poll_max while the price is unchanged, and resets on any change. Once the
+stream delivers recover_count messages again, polling stops.
+
+Every price carries an ordering key. For stream trades the key is (trade
+time, trade id). For a REST price it is (server time when the request was
+sent, 0), which is conservative because the response can only be at least
+that fresh. A price is published only if its key is newer than the last one
+published. This keeps stale or duplicated prices from reaching the strategy
+across a switch in either direction.
+
+latest() also returns when the price was published, so the consumer can
+refuse a price that stopped moving because both sources are failing.
+"""
+
+import threading
+import time
+from decimal import Decimal
+
+STREAM = "stream"
+REST = "rest"
+
+
+class PriceFeed:
+    """Latest price from the trade stream, or from REST while the stream is stale."""
+
+    def __init__(
+        self,
+        fetch_price,
+        now_ms=None,
+        stale_after=5.0,
+        check_interval=0.5,
+        poll_min=1.0,
+        poll_max=5.0,
+        recover_count=3,
+        log=print,
+        monotonic=time.monotonic,
+    ):
+        self.fetch_price = fetch_price
+        self.now_ms = now_ms or (lambda: int(time.time() * 1000))
+        self.stale_after = stale_after
+        self.check_interval = check_interval
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.recover_count = recover_count
+        self.log = log
+        self.monotonic = monotonic
+
+        self.mode = REST  # until the stream proves itself
+        self.price = None
+        self.source = None
+        self.published_at = None  # monotonic time of the last publish
+        self.seq = 0  # bumped on every published price
+        self.switches = 0
+        self._key = (0, 0)
+        self._last_stream_at = None  # local monotonic receipt time
+        self._stream_streak = 0
+        self._poll_delay = poll_min
+        self._next_poll = 0.0
+        self._cond = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # ----- inputs -----
+
+    def seed(self, price):
+        """Start from a price fetched elsewhere (e.g. the bootstrap)."""
+        self._publish(Decimal(price), (self.now_ms(), 0), REST)
+
+    def handle_trade_message(self, msg):
+        """Callback for the @trade stream."""
+        if msg.get("e") != "trade":
+            return
+        published = self._publish(Decimal(msg["p"]), (msg["T"], msg["t"]), STREAM)
+        with self._cond:
+            self._last_stream_at = self.monotonic()
+            if published:
+                self._stream_streak += 1  # a stream replaying old trades is not healthy yet
+            if self.mode == REST and self._stream_streak >= self.recover_count:
+                self._switch(STREAM, "stream healthy")
+
+    def _publish(self, price, key, source):
+        with self._cond:
+            if key <= self._key:
+                return False  # duplicate or older than what the strategy has seen
+            self._key = key
+            self.price = price
+            self.source = source
+            self.published_at = self.monotonic()
+            self.seq += 1
+            self._cond.notify_all()
+            return True
+
+    def _switch(self, mode, reason):
+        self.mode = mode
+        self.switches += 1
+        self._poll_delay = self.poll_min
+        self._next_poll = 0.0
+        self.log(f"Price feed -> {mode} ({reason})")
+
+    # ----- consumer side -----
+
+    def latest(self):
+        """(price, source, seq, published_at) of the newest published price."""
+        with self._cond:
+            return self.price, self.source, self.seq, self.published_at
+
+    def wait_for_update(self, after_seq, timeout):
+        """Block until a price newer than after_seq is published or timeout."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after_seq, timeout)
+            return self.price, self.source, self.seq, self.published_at
+
+    # ----- monitor -----
+
+    def check(self):
+        """One monitor step: detect staleness and poll REST when due."""
+        now = self.monotonic()
+        with self._cond:
+            stale = self._last_stream_at is None or now - self._last_stream_at > self.stale_after
+            if stale:
+                self._stream_streak = 0
+                if self.mode == STREAM:
+                    self._switch(REST, f"no stream data for {self.stale_after:.1f}s")
+            if self.mode != REST or now < self._next_poll:
+                return
+        self._poll(now)
+
+    def _poll(self, now):
+        sent_key = (self.now_ms(), 0)
+        try:
+            price = Decimal(self.fetch_price())
+        except Exception as e:
+            self.log(f"Price feed REST poll failed: {e}")
+            self._next_poll = now + self.poll_max
+            return
+        changed = price != self.price
+        self._publish(price, sent_key, REST)
+        if changed:
+            self._poll_delay = self.poll_min
+        else:
+            self._poll_delay = min(self.poll_max, self._poll_delay * 1.5)
+        self._next_poll = now + self._poll_delay
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="price-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.check()
+            self._stop_event.wait(self.check_interval)
@@ -0,0 +1,206 @@
+"""
+Opt-in sampling profiler for the running bot.
+
+A sampler thread reads the main thread's stack (or every thread's stack with
+PROFILE_ALL_THREADS) every PROFILE_INTERVAL seconds via
+sys._current_frames(). It counts identical stacks. The profiled code is not
+instrumented; the only cost is the sampler thread waking up. Counts are
+written to PROFILE_PATH in the folded format that flamegraph.pl, inferno
+and speedscope read ("outer;inner;leaf count" per line). The file is
+rewritten every PROFILE_DUMP_SEC and when profiling stops.
+
+Control without changing the entry point:
+- PROFILE=true starts sampling when the bot starts
+- SIGUSR1 toggles sampling on and off (docker kill -s USR1 bnb-bot)
+- SIGUSR2 writes the current counts to disk now
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE = os.getenv("PROFILE", "false").lower() in ("1", "true", "yes")
+PROFILE_SIGNALS = os.getenv("PROFILE_SIGNALS", "true").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.01"))  # seconds between samples
+PROFILE_DUMP_SEC = float(os.getenv("PROFILE_DUMP_SEC", "300"))
+PROFILE_PATH = os.getenv("PROFILE_PATH", "profile.folded")
+PROFILE_ALL_THREADS = os.getenv("PROFILE_ALL_THREADS", "false").lower() in ("1", "true", "yes")
+
+
+class SamplingProfiler:
+    """Samples stacks from a background thread and aggregates them as folded stacks."""
+
+    def __init__(
+        self,
+        path=PROFILE_PATH,
+        interval=PROFILE_INTERVAL,
+        dump_interval=PROFILE_DUMP_SEC,
+        all_threads=PROFILE_ALL_THREADS,
+        thread_id=None,
+        log=print,
+    ):
+        self.path = path
+        self.interval = interval
+        self.dump_interval = dump_interval
+        self.all_threads = all_threads
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.log = log
+        self.stacks = Counter()
+        self.samples = 0
+        self.sampling_sec = 0.0  # time spent taking samples
+        self._labels = {}  # code object -> frame label
+        self._lock = threading.Lock()
+        self._toggle_requested = threading.Event()
+        self._dump_requested = threading.Event()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._control = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    # ----- sampling -----
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _fold(self, frame):
+        parts = []
+        while frame is not None:
+            parts.append(self._label(frame.f_code))
+            frame = frame.f_back
+        parts.reverse()
+        return ";".join(parts)
+
+    def sample(self):
+        """Take one sample of the target thread(s)."""
+        started = time.perf_counter()
+        frames = sys._current_frames()
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()} if self.all_threads else None
+        with self._lock:
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                if self.all_threads:
+                    stack = f"{names.get(ident, ident)};{self._fold(frame)}"
+                elif ident == self.thread_id:
+                    stack = self._fold(frame)
+                else:
+                    continue
+                self.stacks[stack] += 1
+            self.samples += 1
+        self.sampling_sec += time.perf_counter() - started
+
+    def _run(self):
+        next_dump = time.monotonic() + self.dump_interval
+        while not self._stop_event.wait(self.interval):
+            self.sample()
+            if time.monotonic() >= next_dump:
+                next_dump = time.monotonic() + self.dump_interval
+                self.dump()
+
+    # ----- output -----
+
+    def folded(self):
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def dump(self):
+        """Write the folded stacks atomically; a reader never sees a partial file."""
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                f.write(self.folded())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            self.log(f"Profiler dump failed: {e}")
+            return
+        overhead = self.sampling_sec / self.samples * 1000 if self.samples else 0.0
+        self.log(
+            f"Profile written to {self.path}: {self.samples} samples, "
+            f"{len(self.stacks)} stacks, {overhead:.3f} ms per sample"
+        )
+
+    # ----- control -----
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+        self.log(f"Sampling profiler started ({self.interval * 1000:g} ms interval)")
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stop_event.set()
+        thread.join(timeout=1.0)
+        self.dump()
+        self.log("Sampling profiler stopped")
+
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+
+    # ----- requests from signal handlers -----
+    # A handler runs on the main thread between bytecodes, possibly while the
+    # bot holds a lock (the log buffer's, this one). It only sets events; the
+    # control thread does the joining, writing and logging.
+
+    def request_toggle(self):
+        self._toggle_requested.set()
+        self._wake.set()
+
+    def request_dump(self):
+        self._dump_requested.set()
+        self._wake.set()
+
+    def start_control(self):
+        """Start the thread that carries out toggle and dump requests."""
+        if self._control is None:
+            self._control = threading.Thread(
+                target=self._control_loop, name="profiler-control", daemon=True
+            )
+            self._control.start()
+
+    def _control_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._toggle_requested.is_set():
+                self._toggle_requested.clear()
+                self.toggle()
+            if self._dump_requested.is_set():
+                self._dump_requested.clear()
+                self.dump()
+
+
+def install(log=print):
+    """Profiler configured from the environment, with the signal handlers.
+
+    Call from the main thread: signal handlers can only be set there, and
+    the main thread is the one sampled.
+    """
+    profiler = SamplingProfiler(log=log)
+    on_main_thread = threading.current_thread() is threading.main_thread()
+    if PROFILE_SIGNALS and on_main_thread and hasattr(signal, "SIGUSR1"):
+        profiler.start_control()
+        signal.signal(signal.SIGUSR1, lambda signum, frame: profiler.request_toggle())
+        signal.signal(signal.SIGUSR2, lambda signum, frame: profiler.request_dump())
+    if PROFILE:
+        profiler.start()
+    return profiler
@@ -0,0 +1,130 @@
+"""
+Incremental portfolio risk across symbols and accounts.
+
+RiskEngine keeps the total portfolio value, peak equity and drawdown up to
+date with O(1) work per price or balance change. It keeps each asset's
+quantity summed over all accounts. A price change adds
+qty * (new - old) to the total, and a balance change adds
+(new - old) * price. Nothing is re-summed per tick. Values are Decimal, so
+the running total stays exact; reconcile() re-sums from scratch for
+periodic checks.
+
+The global stop fires once when the value falls to
+baseline * (1 - STOP_LOSS_PCT), the same rule as the single-pair portfolio
+stop. set_baseline() moves the baseline (after a harvest) and re-arms it.
+"""
+
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+
+def _d(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class RiskEngine:
+    """Running portfolio value, peak equity, drawdown and the global stop."""
+
+    def __init__(self, stop_loss_pct, quote_asset="USDT", on_stop=None, log=print):
+        self.stop_loss_pct = _d(stop_loss_pct)
+        self.quote_asset = quote_asset
+        self.on_stop = on_stop
+        self.log = log
+        self.balances = {}  # (account, asset) -> qty
+        self.asset_qty = defaultdict(Decimal)  # asset -> qty summed over accounts
+        self.prices = {quote_asset: Decimal("1")}
+        self.value = Decimal("0")
+        self.peak = Decimal("0")
+        self.max_drawdown = Decimal("0")
+        self.baseline = None
+        self.stop_value = None
+        self.stopped = False
+        self._lock = threading.Lock()
+
+    # ----- O(1) updates -----
+
+    def set_balance(self, account, asset, qty):
+        """Record an account's new balance of an asset."""
+        qty = _d(qty)
+        with self._lock:
+            delta = qty - self.balances.get((account, asset), Decimal("0"))
+            if not delta:
+                return
+            self.balances[(account, asset)] = qty
+            self.asset_qty[asset] += delta
+            price = self.prices.get(asset)
+            if price is not None:
+                self._move(delta * price)
+
+    def mark(self, asset, price):
+        """Record a new price (in the quote asset) for an asset."""
+        price = _d(price)
+        with self._lock:
+            old = self.prices.get(asset)
+            self.prices[asset] = price
+            if old is None:
+                self._move(self.asset_qty.get(asset, Decimal("0")) * price)
+            elif price != old:
+                self._move(self.asset_qty.get(asset, Decimal("0")) * (price - old))
+
+    def _move(self, delta):
+        self.value += delta
+        if self.value > self.peak:
+            self.peak = self.value
+        elif self.peak > 0:
+            drawdown = (self.peak - self.value) / self.peak
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = drawdown
+        if self.stop_value is not None and not self.stopped and self.value <= self.stop_value:
+            self.stopped = True
+            if self.on_stop:
+                self.on_stop(self.value, self.baseline)
+
+    # ----- baseline and stop -----
+
+    def set_baseline(self, value=None):
+        """Move the stop reference (default: current value) and re-arm the stop."""
+        with self._lock:
+            self.baseline = self.value if value is None else _d(value)
+            self.stop_value = self.baseline * (1 - self.stop_loss_pct)
+            self.stopped = self.value <= self.stop_value
+
+    @property
+    def stop_triggered(self):
+        return self.stop_value is not None and self.value <= self.stop_value
+
+    @property
+    def drawdown(self):
+        """Current drawdown from peak equity, as a fraction."""
+        if self.peak <= 0:
+            return Decimal("0")
+        return (self.peak - self.value) / self.peak
+
+    # ----- checks -----
+
+    def reconcile(self):
+        """Re-sum every position and correct the running value. Returns the drift."""
+        with self._lock:
+            total = sum(
+                (qty * self.prices[asset] for asset, qty in self.asset_qty.items()
+                 if asset in self.prices),
+                Decimal("0"),
+            )
+            drift = total - self.value
+            if drift:
+                self.log(f"Risk value drift {drift}; corrected to {total}")
+                self.value = total
+            return drift
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "value": self.value,
+                "peak": self.peak,
+                "drawdown": self.drawdown,
+                "max_drawdown": self.max_drawdown,
+                "baseline": self.baseline,
+                "stop_value": self.stop_value,
+                "stopped": self.stopped,
+            }
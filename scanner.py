@@ -0,0 +1,285 @@
+"""
+All-market scanner on the !miniTicker@arr stream.
+
+The harvester trades one SYMBOL. The scanner watches every pair quoted in
+SCAN_QUOTE_ASSET and reports, in real time, where the harvester's triggers
+would fire:
+- harvest: price reached the reference price plus the (ATR-widened) target
+- stop: price fell through the ATR trailing stop
+- mover: the price moved SCAN_MOVE_ATR ATRs or more within the current bar
+
+State is a struct of arrays indexed by symbol id (one NumPy array per field).
+Each stream update writes the changed symbols into those arrays and then
+evaluates every condition for every symbol in one vectorized pass. ATR is
+Wilder's ATR over SCAN_BAR_SEC bars built from the ticker closes. Bars roll
+on the exchange event time, so replayed messages give the same results.
+
+Triggers are edge-triggered: a harvest resets the reference and the stop,
+and a stop re-arms from the current price, as the bot would after trading.
+
+Run with: python scanner.py
+"""
+
+import os
+import time
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+SCAN_QUOTE_ASSET = os.getenv("SCAN_QUOTE_ASSET", "USDT")
+SCAN_TARGET_PCT = float(os.getenv("SCAN_TARGET_PCT", os.getenv("TARGET_PCT", "0.005")))
+SCAN_ATR_MULTIPLIER = float(os.getenv("SCAN_ATR_MULTIPLIER", os.getenv("ATR_MULTIPLIER", "1.5")))
+SCAN_ATR_PERIOD = int(os.getenv("SCAN_ATR_PERIOD", os.getenv("ATR_PERIOD", "14")))
+SCAN_BAR_SEC = int(os.getenv("SCAN_BAR_SEC", "300"))  # 5m bars, like the bot's ATR
+SCAN_MOVE_ATR = float(os.getenv("SCAN_MOVE_ATR", "2.0"))
+SCAN_MIN_QUOTE_VOLUME = float(os.getenv("SCAN_MIN_QUOTE_VOLUME", "1000000"))  # 24h, quote units
+SCAN_REPORT_SEC = float(os.getenv("SCAN_REPORT_SEC", "60"))
+USE_MD_DAEMON = os.getenv("USE_MD_DAEMON", "false").lower() in ("1", "true", "yes")
+MD_SOCKET_PATH = os.getenv("MD_SOCKET_PATH", "/tmp/binance-md.sock")
+TESTNET = os.getenv("TESTNET", "false").lower() in ("1", "true", "yes")
+
+HARVEST = "harvest"
+STOP = "stop"
+MOVER = "mover"
+
+
+def log(msg):
+    ts = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    print(f"[{ts} UTC] [scan] {msg}")
+
+
+class MarketScanner:
+    """Per-symbol state in parallel arrays; one vectorized pass per update."""
+
+    FIELDS = (
+        "last", "open_24h", "quote_volume", "ref", "stop",
+        "bar_open", "bar_high", "bar_low", "prev_close", "atr",
+    )
+
+    def __init__(
+        self,
+        quote_asset=SCAN_QUOTE_ASSET,
+        target_pct=SCAN_TARGET_PCT,
+        atr_multiplier=SCAN_ATR_MULTIPLIER,
+        atr_period=SCAN_ATR_PERIOD,
+        bar_sec=SCAN_BAR_SEC,
+        move_atr=SCAN_MOVE_ATR,
+        min_quote_volume=SCAN_MIN_QUOTE_VOLUME,
+        on_signal=None,
+        capacity=512,
+        log=log,
+    ):
+        self.quote_asset = quote_asset
+        self.target_pct = target_pct
+        self.atr_multiplier = atr_multiplier
+        self.atr_period = atr_period
+        self.bar_ms = bar_sec * 1000
+        self.move_atr = move_atr
+        self.min_quote_volume = min_quote_volume
+        self.on_signal = on_signal
+        self.log = log
+
+        self.ids = {}  # symbol -> id, or -1 for pairs in other quote assets
+        self.symbols = []
+        self.n = 0
+        for name in self.FIELDS:
+            setattr(self, name, np.full(capacity, np.nan))
+        self.tr_count = np.zeros(capacity, dtype=np.int64)
+        self.moving = np.zeros(capacity, dtype=bool)
+        self.bar_index = None
+
+        self.updates = 0
+        self.busy_sec = 0.0
+        self.signal_counts = {HARVEST: 0, STOP: 0, MOVER: 0}
+
+    # ----- symbol registry -----
+
+    def _grow(self):
+        size = len(self.last) * 2
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.full(size, np.nan)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self.tr_count = np.concatenate([self.tr_count, np.zeros_like(self.tr_count)])
+        self.moving = np.concatenate([self.moving, np.zeros_like(self.moving)])
+
+    def _symbol_id(self, symbol):
+        sid = self.ids.get(symbol)
+        if sid is None:
+            if not symbol.endswith(self.quote_asset):
+                sid = -1
+            else:
+                if self.n == len(self.last):
+                    self._grow()
+                sid = self.n
+                self.n += 1
+                self.symbols.append(symbol)
+            self.ids[symbol] = sid
+        return sid
+
+    # ----- bars and ATR -----
+
+    def _roll_bars(self, bar_index):
+        """Close the current bar for every symbol and fold its true range into the ATR."""
+        n = self.n
+        seen = ~np.isnan(self.bar_high[:n])
+        high, low, prev = self.bar_high[:n], self.bar_low[:n], self.prev_close[:n]
+        tr = high - low
+        has_prev = seen & ~np.isnan(prev)
+        tr = np.where(
+            has_prev,
+            np.maximum(tr, np.maximum(np.abs(high - prev), np.abs(low - prev))),
+            tr,
+        )
+        # Simple mean for the first period bars, Wilder smoothing after
+        count = self.tr_count[:n]
+        count += seen
+        atr = np.where(np.isnan(self.atr[:n]), 0.0, self.atr[:n])
+        weight = np.minimum(np.maximum(count, 1), self.atr_period)
+        self.atr[:n] = np.where(seen, atr + (tr - atr) / weight, self.atr[:n])
+
+        last = self.last[:n]
+        self.prev_close[:n] = np.where(seen, last, prev)
+        self.bar_open[:n] = last
+        self.bar_high[:n] = last
+        self.bar_low[:n] = last
+        self.moving[:n] = False
+        self.bar_index = bar_index
+
+    # ----- stream input -----
+
+    def handle_message(self, msg):
+        """Callback for !miniTicker@arr; returns the signals this update raised."""
+        if isinstance(msg, dict):
+            if msg.get("e") == "error":
+                self.log(f"Mini-ticker stream error: {msg.get('m')}")
+                return []
+            msg = msg.get("data", [msg])
+        if not msg:
+            return []
+        started = time.perf_counter()
+
+        ids = np.fromiter((self._symbol_id(t["s"]) for t in msg), dtype=np.int64, count=len(msg))
+        keep = ids >= 0
+        ids = ids[keep]
+        rows = [t for t, k in zip(msg, keep) if k]
+        if not rows:
+            return []
+        close = np.array([t["c"] for t in rows], dtype=np.float64)
+        event_ms = max(t["E"] for t in rows)
+
+        bar_index = event_ms // self.bar_ms
+        if self.bar_index is None:
+            self.bar_index = bar_index
+        elif bar_index > self.bar_index:
+            self._roll_bars(bar_index)
+
+        self.last[ids] = close
+        self.open_24h[ids] = np.array([t["o"] for t in rows], dtype=np.float64)
+        self.quote_volume[ids] = np.array([t["q"] for t in rows], dtype=np.float64)
+        new = np.isnan(self.ref[ids])
+        for name in ("ref", "bar_open", "bar_high", "bar_low"):
+            getattr(self, name)[ids[new]] = close[new]
+        self.bar_high[ids] = np.fmax(self.bar_high[ids], close)
+        self.bar_low[ids] = np.fmin(self.bar_low[ids], close)
+
+        signals = self.evaluate()
+        self.updates += 1
+        self.busy_sec += time.perf_counter() - started
+        return signals
+
+    # ----- vectorized trigger checks -----
+
+    def evaluate(self):
+        """Check harvest, stop and mover conditions for every symbol at once."""
+        n = self.n
+        last, ref, atr = self.last[:n], self.ref[:n], self.atr[:n]
+        liquid = self.quote_volume[:n] >= self.min_quote_volume
+        has_atr = self.tr_count[:n] > 0
+
+        trail = last - self.atr_multiplier * atr
+        self.stop[:n] = np.where(has_atr, np.fmax(self.stop[:n], trail), self.stop[:n])
+
+        target = np.where(
+            has_atr,
+            np.maximum(self.target_pct, self.atr_multiplier * atr / last / 2),
+            self.target_pct,
+        )
+        harvest = liquid & (last >= ref * (1 + target))
+        stop = liquid & ~harvest & (last <= self.stop[:n])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            move = np.abs(last - self.bar_open[:n]) / atr
+        moving = liquid & has_atr & (move >= self.move_atr)
+        mover = moving & ~self.moving[:n]
+        self.moving[:n] = moving
+
+        # Re-arm as the bot would after trading
+        self.ref[:n] = np.where(harvest | stop, last, ref)
+        self.stop[:n] = np.where(harvest, trail, np.where(stop, np.nan, self.stop[:n]))
+
+        signals = []
+        for kind, mask in ((HARVEST, harvest), (STOP, stop), (MOVER, mover)):
+            for sid in np.flatnonzero(mask):
+                signals.append((kind, self.symbols[sid], float(last[sid])))
+            self.signal_counts[kind] += int(mask.sum())
+        if self.on_signal:
+            for signal in signals:
+                self.on_signal(*signal)
+        return signals
+
+    # ----- reporting -----
+
+    def top_movers(self, count=10):
+        """(symbol, move in ATRs within the bar, 24h change %) for the biggest movers."""
+        n = self.n
+        liquid = (self.quote_volume[:n] >= self.min_quote_volume) & (self.tr_count[:n] > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            move = np.where(liquid, (self.last[:n] - self.bar_open[:n]) / self.atr[:n], 0.0)
+            change = (self.last[:n] / self.open_24h[:n] - 1) * 100
+        move = np.nan_to_num(move)
+        order = np.argsort(-np.abs(move))[:count]
+        return [(self.symbols[i], float(move[i]), float(change[i])) for i in order if liquid[i]]
+
+    def summary(self, elapsed_sec):
+        per_update_ms = self.busy_sec / self.updates * 1000 if self.updates else 0.0
+        load = self.busy_sec / elapsed_sec * 100 if elapsed_sec > 0 else 0.0
+        counts = ", ".join(f"{k} {v}" for k, v in self.signal_counts.items())
+        return (
+            f"{self.n} symbols, {self.updates} updates, {per_update_ms:.2f} ms/update, "
+            f"{load:.1f}% of a core; signals: {counts}"
+        )
+
+
+def main():
+    scanner = MarketScanner(on_signal=lambda kind, symbol, price: log(f"{kind.upper()}: {symbol} @ {price:g}"))
+    if USE_MD_DAEMON:
+        from md_daemon import MarketDataClient
+
+        streams = MarketDataClient(MD_SOCKET_PATH, log=log)
+        streams.start()
+    else:
+        from binance import ThreadedWebsocketManager
+
+        streams = ThreadedWebsocketManager(testnet=TESTNET)
+        streams.start()
+    streams.start_miniticker_socket(callback=scanner.handle_message)
+    log(f"Scanning {SCAN_QUOTE_ASSET} pairs on !miniTicker@arr")
+
+    started = time.monotonic()
+    try:
+        while True:
+            time.sleep(SCAN_REPORT_SEC)
+            log(scanner.summary(time.monotonic() - started))
+            for symbol, move, change in scanner.top_movers(5):
+                log(f"  {symbol}: {move:+.2f} ATR this bar, {change:+.2f}% 24h")
+    except KeyboardInterrupt:
+        log("Scanner stopped")
+    finally:
+        streams.stop()
+
+
+if __name__ == "__main__":
+    main()
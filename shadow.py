@@ -0,0 +1,244 @@
+"""
+Shadow strategies: paper variants of the harvester evaluated on live ticks.
+
+ShadowBook holds one row per parameter set (TARGET_PCT, ATR_MULTIPLIER,
+REENTRY_FRACTION) in NumPy arrays and mirrors the live rules for every
+variant in one vectorized pass per tick:
+- ATR trailing stop and portfolio stop sell everything and stop the variant
+- the harvest sells the profit above baseline once value reaches the
+  (ATR-widened) target, then resets baseline, entry and stop
+- with a re-entry fraction, that share of the harvest proceeds is bought
+  back once the price is 2% below the harvest price
+
+ShadowRunner feeds the book from a worker thread through a bounded queue.
+The live loop only does a non-blocking put; when the queue is full, the tick
+is dropped rather than delaying the loop. A leaderboard is logged
+periodically.
+"""
+
+import itertools
+import queue
+import threading
+
+import numpy as np
+
+from clock import SYSTEM_CLOCK
+
+
+def parameter_grid(target_pcts, atr_multipliers, reentry_fractions):
+    """Cartesian product as three parallel float arrays."""
+    rows = list(itertools.product(target_pcts, atr_multipliers, reentry_fractions))
+    grid = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    return grid[:, 0], grid[:, 1], grid[:, 2]
+
+
+class ShadowBook:
+    """Vectorized paper state for N variants of the live strategy."""
+
+    def __init__(
+        self,
+        target_pct,
+        atr_multiplier,
+        reentry_fraction,
+        balance_base,
+        balance_quote,
+        price,
+        stop_loss_pct=0.10,
+        step_size=0.0,
+        min_notional=0.0,
+        fee_pct=0.001,
+        reentry_drop=0.02,
+    ):
+        self.target_pct = np.asarray(target_pct, dtype=np.float64)
+        self.atr_multiplier = np.asarray(atr_multiplier, dtype=np.float64)
+        self.reentry_fraction = np.asarray(reentry_fraction, dtype=np.float64)
+        n = len(self.target_pct)
+        self.stop_loss_pct = stop_loss_pct
+        self.step_size = step_size
+        self.min_notional = min_notional
+        self.fee_pct = fee_pct
+        self.reentry_drop = reentry_drop
+
+        self.base = np.full(n, float(balance_base))
+        self.quote = np.full(n, float(balance_quote))
+        self.initial_value = float(balance_base) * price + float(balance_quote)
+        self.baseline = np.full(n, self.initial_value)
+        self.entry = np.full(n, float(price))
+        self.stop = np.full(n, np.nan)
+        self.realized = np.zeros(n)
+        self.reentry_budget = np.zeros(n)
+        self.harvests = np.zeros(n, dtype=np.int64)
+        self.reentries = np.zeros(n, dtype=np.int64)
+        self.stopped = np.zeros(n, dtype=bool)
+        self.last_price = float(price)
+        self.ticks = 0
+
+    def __len__(self):
+        return len(self.target_pct)
+
+    def _floor_step(self, qty):
+        if self.step_size <= 0:
+            return qty
+        return np.floor(qty / self.step_size + 1e-9) * self.step_size
+
+    def update(self, price, atr=None):
+        """Apply one tick to every variant."""
+        self.ticks += 1
+        self.last_price = price
+        alive = ~self.stopped
+        has_atr = atr is not None and atr > 0
+        keep = 1.0 - self.fee_pct
+
+        if has_atr:
+            trail = price - self.atr_multiplier * atr
+            self.stop = np.where(alive & ~(trail <= self.stop), trail, self.stop)
+
+        value = self.base * price + self.quote
+        holding = alive & (self.base > 0)
+
+        # Stops: sell everything and retire the variant
+        stop_hit = holding & (price <= self.stop)
+        stop_hit |= holding & (value <= self.baseline * (1 - self.stop_loss_pct))
+        if stop_hit.any():
+            proceeds = self.base[stop_hit] * price * keep
+            self.realized[stop_hit] += proceeds - self.base[stop_hit] * self.entry[stop_hit]
+            self.quote[stop_hit] += proceeds
+            self.base[stop_hit] = 0.0
+            self.reentry_budget[stop_hit] = 0.0
+            self.stopped |= stop_hit
+            holding &= ~stop_hit
+            alive &= ~stop_hit  # a variant stopped on this tick does not re-enter on it
+
+        # Harvest profit above baseline
+        target = self.target_pct
+        if has_atr:
+            target = np.maximum(target, self.atr_multiplier * atr / price / 2)
+        harvest = holding & (value >= self.baseline * (1 + target))
+        if harvest.any():
+            sell = self._floor_step((value - self.baseline) / price)
+            sell = np.minimum(sell, self.base)
+            harvest &= (sell > 0) & (sell * price >= self.min_notional)
+            proceeds = np.where(harvest, sell * price * keep, 0.0)
+            self.realized += np.where(harvest, proceeds - sell * self.entry, 0.0)
+            self.base -= np.where(harvest, sell, 0.0)
+            self.quote += proceeds
+            self.reentry_budget = np.where(
+                harvest, proceeds * self.reentry_fraction, self.reentry_budget
+            )
+            self.harvests += harvest
+            self._reset_after_trade(harvest, price, atr if has_atr else None)
+
+        # Re-entry: buy back part of the proceeds after a pullback
+        reenter = alive & ~harvest & (self.reentry_budget > 0)
+        reenter &= price <= self.entry * (1 - self.reentry_drop)
+        reenter &= self.reentry_budget >= self.min_notional
+        if reenter.any():
+            spend = np.minimum(self.reentry_budget, self.quote)
+            bought = self._floor_step(spend * keep / price)
+            self.base += np.where(reenter, bought, 0.0)
+            self.quote -= np.where(reenter, bought * price / keep, 0.0)
+            self.reentry_budget = np.where(reenter, 0.0, self.reentry_budget)
+            self.reentries += reenter
+            self._reset_after_trade(reenter, price, atr if has_atr else None)
+
+    def _reset_after_trade(self, mask, price, atr):
+        self.baseline = np.where(mask, self.base * price + self.quote, self.baseline)
+        self.entry = np.where(mask, price, self.entry)
+        if atr is not None:
+            self.stop = np.where(mask, price - self.atr_multiplier * atr, self.stop)
+
+    def equity(self):
+        return self.base * self.last_price + self.quote
+
+    def leaderboard(self, top=10):
+        """Rows for the best variants by equity, best first."""
+        equity = self.equity()
+        order = np.argsort(-equity)[:top]
+        pnl_pct = (equity / self.initial_value - 1) * 100 if self.initial_value > 0 else equity * 0
+        return [
+            {
+                "target_pct": float(self.target_pct[i]),
+                "atr_multiplier": float(self.atr_multiplier[i]),
+                "reentry_fraction": float(self.reentry_fraction[i]),
+                "equity": float(equity[i]),
+                "pnl_pct": float(pnl_pct[i]),
+                "harvests": int(self.harvests[i]),
+                "reentries": int(self.reentries[i]),
+                "stopped": bool(self.stopped[i]),
+            }
+            for i in order
+        ]
+
+
+class ShadowRunner:
+    """Feeds a ShadowBook from a worker thread; the live loop never waits on it."""
+
+    def __init__(
+        self, book, leaderboard_sec=3600, top=10, max_queue=10_000, log=print, clock=SYSTEM_CLOCK
+    ):
+        self.book = book
+        self.leaderboard_sec = leaderboard_sec
+        self.top = top
+        self.log = log
+        self.clock = clock
+        self.atr = None
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._next_board = clock.time() + leaderboard_sec
+        self._thread = None
+
+    def set_atr(self, atr):
+        self.atr = float(atr) if atr else None
+
+    def submit(self, price):
+        """Queue one tick. Processed inline when the worker is not running."""
+        if self._thread is None:
+            self._process(float(price))
+            return
+        try:
+            self._queue.put_nowait(float(price))
+        except queue.Full:
+            self.dropped += 1
+
+    def handle_trade_message(self, msg):
+        """Callback for the @trade stream: every trade is a shadow tick."""
+        if msg.get("e") == "trade":
+            self.submit(msg["p"])
+
+    def _process(self, price):
+        self.book.update(price, self.atr)
+        if self.clock.time() >= self._next_board:
+            self._next_board = self.clock.time() + self.leaderboard_sec
+            self.log_leaderboard()
+
+    def log_leaderboard(self):
+        book = self.book
+        lines = [
+            f"Shadow leaderboard ({len(book)} variants, {book.ticks} ticks, {self.dropped} dropped):"
+        ]
+        for rank, row in enumerate(book.leaderboard(self.top), 1):
+            lines.append(
+                f"  {rank:>2}. target {row['target_pct'] * 100:.2f}% atr x{row['atr_multiplier']:.2f} "
+                f"reentry {row['reentry_fraction']:.2f}: {row['pnl_pct']:+.2f}% "
+                f"({row['harvests']} harvests{', stopped' if row['stopped'] else ''})"
+            )
+        self.log("\n".join(lines))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="shadow", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        while True:
+            price = self._queue.get()
+            if price is None:
+                return
+            try:
+                self._process(price)
+            except Exception as e:
+                self.log(f"Shadow update failed: {e}")
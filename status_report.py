@@ -0,0 +1,122 @@
+"""
+Periodic status reports built from the bot's in-memory state.
+
+The trading loop publishes its state to a StatusBoard once per iteration.
+That is a dict swap and never blocks. A PeriodicReporter thread wakes every
+interval, takes the latest snapshot, renders it and sends it (Telegram).
+Reports never issue exchange requests and never delay a loop iteration.
+"""
+
+import threading
+from decimal import Decimal
+
+from clock import SYSTEM_CLOCK
+
+
+def _d(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def render_status_report(
+    current_price,
+    current_value,
+    baseline_value,
+    cumulative_profit,
+    balance_base,
+    uptime_hours,
+    target_pct,
+    stop_loss_pct,
+    interval_hours,
+    dry_run=True,
+    testnet=False,
+    base_asset="BNB",
+    quote_symbol="$",
+    stop_loss_price=None,
+):
+    """Telegram status message (see README_PERIODIC_UPDATES.md)."""
+    price = _d(current_price)
+    value = _d(current_value)
+    baseline = _d(baseline_value)
+    pnl = value - baseline
+    pnl_pct = (pnl / baseline * 100) if baseline > 0 else Decimal("0")
+    target_value = baseline * (1 + _d(target_pct))
+    stop_value = baseline * (1 - _d(stop_loss_pct))
+
+    lines = [
+        "📈 BNB Bot Status Update",
+        "",
+        f"🕐 Uptime: {float(uptime_hours):.1f} hours",
+        f"💰 Current Price: {quote_symbol}{price:.2f}",
+        f"💎 {base_asset} Balance: {_d(balance_base):.6f} {base_asset}",
+        f"💵 Portfolio Value: {quote_symbol}{value:.2f}",
+        f"📊 Baseline Value: {quote_symbol}{baseline:.2f}",
+        f"📈 P&L: {pnl_pct:+.2f}% ({quote_symbol}{pnl:.2f})",
+        f"🎯 Total Profit: {quote_symbol}{_d(cumulative_profit):.2f}",
+        "",
+        f"🎯 Target: +{_d(target_pct) * 100:.1f}% ({quote_symbol}{target_value:.2f})",
+        f"🛑 Stop Loss: -{_d(stop_loss_pct) * 100:.0f}% ({quote_symbol}{stop_value:.2f})",
+    ]
+    if stop_loss_price is not None:
+        lines.append(f"🛑 ATR Stop Price: {quote_symbol}{_d(stop_loss_price):.2f}")
+    lines += [
+        "",
+        f"🤖 Bot Status: {'DRY RUN' if dry_run else 'LIVE'}",
+        f"🌐 Network: {'TESTNET' if testnet else 'MAINNET'}",
+        "",
+        f"Next update in {interval_hours:g} hours",
+    ]
+    return "\n".join(lines)
+
+
+class StatusBoard:
+    """Latest bot state, replaced wholesale so readers never see a partial update."""
+
+    def __init__(self, clock=SYSTEM_CLOCK):
+        self.clock = clock
+        self.started_at = clock.time()
+        self._state = None
+
+    def publish(self, **state):
+        self._state = state
+
+    def snapshot(self):
+        return self._state
+
+    def uptime_hours(self):
+        return (self.clock.time() - self.started_at) / 3600
+
+
+class PeriodicReporter(threading.Thread):
+    """Calls report(state, uptime_hours) every interval_sec from its own thread."""
+
+    def __init__(self, board, report, interval_sec, log=print):
+        super().__init__(name="periodic-report", daemon=True)
+        self.board = board
+        self.report = report
+        self.interval_sec = interval_sec
+        self.log = log
+        self._next_run = board.clock.time() + interval_sec
+        self._stop_event = threading.Event()
+
+    def report_now(self):
+        state = self.board.snapshot()
+        if state is None:
+            return
+        try:
+            self.report(state, self.board.uptime_hours())
+        except Exception as e:
+            self.log(f"Periodic update failed: {e}")
+
+    def run_pending(self):
+        """Report inline if due (used instead of the thread under a simulated clock)."""
+        now = self.board.clock.time()
+        if now >= self._next_run:
+            self._next_run = now + self.interval_sec
+            self.report_now()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval_sec):
+            self.report_now()
+
+    def stop(self):
+        self._stop_event.set()
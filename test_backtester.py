@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the app2 backtesting engines (no network access needed).
+Validates:
+- simulate_grid gives the same results as simulate for every parameter pair
+- Walk-forward windows roll without overlapping out-of-sample ranges
+- Candle store appends only new candles and round-trips through np.memmap
+- The vectorized Monte Carlo engine reproduces simulate on the original path
+  and rejects block lengths outside 1..len(returns)
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app2"))
+
+from backtester_harvester import simulate, simulate_grid  # noqa: E402
+from candle_store import append_candles, klines_to_array, open_candles  # noqa: E402
+from monte_carlo import log_returns, simulate_paths, summarize  # noqa: E402
+from walkforward import make_windows  # noqa: E402
+
+
+def random_walk(n, seed=7, vol=0.003):
+    rng = random.Random(seed)
+    price = 300.0
+    closes = []
+    for _ in range(n):
+        price *= 1 + rng.gauss(0, vol)
+        closes.append(price)
+    return closes
+
+
+def test_grid_matches_scalar_simulation():
+    closes = random_walk(3000)
+    timestamps = [i * 60_000 for i in range(len(closes))]
+    pairs = [(t, s) for t in (0.002, 0.005, 0.01) for s in (0.01, 0.05, 0.1)]
+
+    grid = simulate_grid(closes, [p[0] for p in pairs], [p[1] for p in pairs],
+                         initial_qty=2.0, min_notional=1.0)
+
+    for k, (target_pct, stop_loss_pct) in enumerate(pairs):
+        res = simulate(closes, timestamps, initial_qty=2.0, target_pct=target_pct,
+                       stop_loss_pct=stop_loss_pct, min_notional=1.0)
+        assert abs(grid["final_qty"][k] - res["final_qty"]) < 1e-9
+        assert abs(grid["realized"][k] - res["realized"]) < 1e-6
+        assert abs(grid["pnl"][k] - res["pnl"]) < 1e-6
+        assert bool(grid["stopped"][k]) == res["stopped"]
+
+
+def test_walk_forward_windows():
+    windows = make_windows(100, in_sample=40, out_sample=20)
+    assert windows == [(0, 40, 60), (20, 60, 80), (40, 80, 100)]
+    assert make_windows(50, in_sample=40, out_sample=20) == []
+
+
+def test_candle_store_round_trip():
+    closes = random_walk(500)
+    klines = [[i * 60_000, c, c * 1.001, c * 0.999, c, 1.0] for i, c in enumerate(closes)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "candles.bin")
+        assert append_candles(path, klines_to_array(klines[:300])) == 300
+        # Overlapping batch: only the 200 new candles are written
+        assert append_candles(path, klines_to_array(klines[250:])) == 200
+
+        candles = open_candles(path)
+        assert len(candles) == 500
+        assert candles["ts"][-1] == 499 * 60_000
+
+        from_map = simulate(candles["close"], candles["ts"], target_pct=0.003)
+        from_list = simulate(closes, [k[0] for k in klines], target_pct=0.003)
+        assert from_map["trades"] == from_list["trades"]
+        del candles
+
+
+def test_monte_carlo_replays_history_with_one_block():
+    closes = random_walk(2000, seed=3)
+    timestamps = list(range(len(closes)))
+    returns = log_returns(closes)
+
+    # One block as long as the history can only start at 0: the original path
+    paths = simulate_paths(returns, 4, len(returns), closes[0], block=len(returns),
+                           seed=0, target_pct=0.004, stop_loss_pct=0.03, chunk=4096)
+    res = simulate(closes, timestamps, target_pct=0.004, stop_loss_pct=0.03)
+
+    for k in range(4):
+        assert abs(paths["pnl"][k] - res["pnl"]) < 1e-6
+        assert bool(paths["stopped"][k]) == res["stopped"]
+        assert paths["harvests"][k] == sum(t[0] == "HARVEST" for t in res["trades"])
+
+    summary = summarize(paths)
+    assert summary["paths"] == 4
+    assert summary["stop_out_rate"] in (0.0, 1.0)
+
+    for block in (0, len(returns) + 1):
+        with pytest.raises(ValueError, match="block length"):
+            simulate_paths(returns, 4, 10, closes[0], block=block)
+
+
+if __name__ == "__main__":
+    test_grid_matches_scalar_simulation()
+    test_walk_forward_windows()
+    test_candle_store_round_trip()
+    test_monte_carlo_replays_history_with_one_block()
+    print("✅ Backtester tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent startup bootstrap in main_improved.py.
+Validates:
+- Independent startup requests run concurrently (total ~ one slow call)
+- Per-step timings are reported
+- A failing step is reported without blocking the others
+- Retries never sleep past the shared deadline
+"""
+
+import os
+import time
+
+os.environ.setdefault("DRY_RUN", "true")
+os.environ.setdefault("TESTNET", "true")
+os.environ.setdefault("SYMBOL", "BNBUSDT")
+
+import main_improved  # noqa: E402
+
+DELAY = 0.2
+
+
+class SlowClient:
+    def __init__(self, fail_ticker=False):
+        self.fail_ticker = fail_ticker
+
+    def get_server_time(self):
+        time.sleep(DELAY / 2)
+        server_time = int(time.time() * 1000) + 1500
+        time.sleep(DELAY / 2)
+        return {"serverTime": server_time}
+
+    def get_exchange_info(self):
+        time.sleep(DELAY)
+        return {
+            "symbols": [
+                {
+                    "symbol": "BNBUSDT",
+                    "baseAsset": "BNB",
+                    "quoteAsset": "USDT",
+                    "filters": [{"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"}],
+                }
+            ]
+        }
+
+    def get_symbol_ticker(self, symbol):
+        time.sleep(DELAY)
+        if self.fail_ticker:
+            raise ConnectionError("ticker down")
+        return {"symbol": symbol, "price": "600.5"}
+
+    def get_asset_balance(self, asset=None):
+        time.sleep(DELAY)
+        return [
+            {"asset": "BNB", "free": "1.5", "locked": "0"},
+            {"asset": "USDT", "free": "100", "locked": "0"},
+        ]
+
+
+def test_bootstrap_runs_steps_concurrently():
+    started = time.time()
+    results, errors, timings = main_improved.run_bootstrap(SlowClient(), "BNBUSDT", 5)
+    elapsed = time.time() - started
+
+    assert not errors
+    assert elapsed < DELAY * 2, f"bootstrap took {elapsed:.2f}s"
+    assert set(timings) == {"time_offset", "symbol_info", "price", "balances"}
+    assert abs(results["time_offset"] - 1500) < 50
+    assert results["symbol_info"]["baseAsset"] == "BNB"
+    assert str(results["price"]) == "600.5"
+    assert str(results["balances"]["BNB"]) == "1.5"
+
+
+def test_failing_step_respects_deadline():
+    started = time.time()
+    results, errors, _ = main_improved.run_bootstrap(
+        SlowClient(fail_ticker=True), "BNBUSDT", 1.0
+    )
+    elapsed = time.time() - started
+
+    # First retry would sleep 1s past the deadline, so the step gives up
+    assert "price" in errors and "price" not in results
+    assert "balances" in results
+    assert elapsed < 1.0
+
+
+if __name__ == "__main__":
+    test_bootstrap_runs_steps_concurrently()
+    test_failing_step_respects_deadline()
+    print("✅ Bootstrap tests passed")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the bot logging layer.
+Validates:
+- Lines below the configured level are discarded
+- Keyed lines are emitted once per interval with a suppressed count
+- The background writer keeps calls non-blocking and drops when full
+"""
+
+import io
+import threading
+
+from bot_logging import DEBUG, ERROR, INFO, BotLogger
+from clock import SimulatedClock
+
+
+def test_levels_and_timestamp():
+    out = io.StringIO()
+    logger = BotLogger(level="INFO", stream=out, clock=SimulatedClock(start=0))
+    logger.log("hidden", DEBUG)
+    logger.log("shown")
+    logger.error("broken")
+    assert out.getvalue() == (
+        "[1970-01-01T00:00:00+00:00] shown\n[1970-01-01T00:00:00+00:00] broken\n"
+    )
+
+
+def test_rate_limit_per_key():
+    out = io.StringIO()
+    sim = SimulatedClock(start=0)
+    logger = BotLogger(level=INFO, rate_limit_sec=60, stream=out, clock=sim)
+    for i in range(10):
+        logger.log(f"Trailing stop updated: {i}", key="trailing-stop")
+        logger.log(f"Price {i}", key="status")
+        sim.advance(10)
+    lines = out.getvalue().splitlines()
+    assert [line.split("] ", 1)[1] for line in lines] == [
+        "Trailing stop updated: 0",
+        "Price 0",
+        "Trailing stop updated: 6 (+5 similar suppressed)",
+        "Price 6 (+5 similar suppressed)",
+    ]
+
+
+class BlockingStream(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait(2.0)
+        return super().write(text)
+
+
+def test_writer_thread_bounds_buffer():
+    out = BlockingStream()
+    logger = BotLogger(level=INFO, max_buffer=5, stream=out)
+    logger.start()
+    for i in range(50):
+        logger.log(f"line {i}", ERROR)  # returns at once although writes are stuck
+    assert logger.dropped >= 40
+    out.release.set()
+    logger.close()
+    text = out.getvalue()
+    assert "line 0" in text
+    assert "lines dropped" in text
+
+
+if __name__ == "__main__":
+    test_levels_and_timestamp()
+    test_rate_limit_per_key()
+    test_writer_thread_bounds_buffer()
+    print("✅ Logging tests passed")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the local kline cache used for ATR warmup.
+Validates:
+- Merge by open time (partial candle replaced, no duplicates)
+- Save/load round trip
+- Incremental top-up only requests missing candles
+- ATR from cache matches the REST-based calculation
+"""
+
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+from candle_cache import AtrRefresher, KlineCache, compute_atr
+
+FIVE_MIN = 300_000
+
+
+def make_kline(open_time, high, low, close):
+    return [open_time, str(close), str(high), str(low), str(close), "1.0"]
+
+
+class MockClient:
+    def __init__(self, klines):
+        self.klines = klines
+        self.calls = []
+
+    def get_klines(self, symbol, interval, limit, startTime=None):
+        self.calls.append({"startTime": startTime, "limit": limit})
+        rows = [k for k in self.klines if startTime is None or k[0] >= startTime]
+        return rows[-limit:] if startTime is None else rows[:limit]
+
+
+def recent_klines(count):
+    start = (int(time.time() * 1000) // FIVE_MIN - count) * FIVE_MIN
+    return [
+        make_kline(start + i * FIVE_MIN, 101 + i, 99 + i, 100 + i)
+        for i in range(count)
+    ]
+
+
+def test_merge_replaces_partial_candle():
+    cache = KlineCache("BNBUSDT", "5m", path=os.devnull)
+    cache.merge([make_kline(0, 2, 1, 1.5), make_kline(FIVE_MIN, 2, 1, 1.6)])
+    cache.merge([make_kline(FIVE_MIN, 3, 1, 2.5), make_kline(2 * FIVE_MIN, 3, 2, 2.8)])
+
+    assert [k[0] for k in cache.klines] == [0, FIVE_MIN, 2 * FIVE_MIN]
+    assert cache.klines[1][4] == "2.5"
+
+
+def test_save_load_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "klines.json")
+        cache = KlineCache("BNBUSDT", "5m", path=path)
+        cache.merge(recent_klines(20))
+        cache.save()
+
+        loaded = KlineCache("BNBUSDT", "5m", path=path)
+        assert loaded.load() == 20
+        assert loaded.klines == cache.klines
+
+
+def test_top_up_requests_only_missing_klines():
+    history = recent_klines(30)
+    client = MockClient(history)
+    cache = KlineCache("BNBUSDT", "5m", path=os.devnull)
+    cache.merge(history[:25])
+
+    cache.top_up(client)
+
+    assert client.calls[0]["startTime"] == history[24][0]
+    assert len(cache.klines) == 30
+
+
+def test_cached_atr_matches_compute_atr():
+    history = recent_klines(20)
+    cache = KlineCache("BNBUSDT", "5m", path=os.devnull)
+    cache.merge(history)
+
+    assert cache.atr(14) == compute_atr(history[-15:], 14)
+    assert cache.atr(14) == Decimal("2")
+    assert KlineCache("BNBUSDT", "5m", path=os.devnull).atr(14) is None
+
+
+def test_refresher_publishes_atr():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = KlineCache("BNBUSDT", "5m", path=os.path.join(tmp, "k.json"))
+        refresher = AtrRefresher(MockClient(recent_klines(20)), cache, 14)
+
+        assert refresher.latest[0] is None
+        refresher.refresh()
+        atr, updated_at = refresher.latest
+        assert atr == Decimal("2")
+        assert updated_at > 0
+
+
+if __name__ == "__main__":
+    test_merge_replaces_partial_candle()
+    test_save_load_round_trip()
+    test_top_up_requests_only_missing_klines()
+    test_cached_atr_matches_compute_atr()
+    test_refresher_publishes_atr()
+    print("✅ Candle cache tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for continuous clock-drift tracking.
+Validates:
+- The lowest-RTT sample wins, biased back by half its RTT
+- Small corrections are slewed, large ones stepped
+- The applied offset is what python-binance signs with (timestamp_offset)
+- with_retries resyncs and retries immediately on a -1021 rejection
+"""
+
+import os
+import time
+
+os.environ.setdefault("DRY_RUN", "true")
+os.environ.setdefault("TESTNET", "true")
+
+import main_improved  # noqa: E402
+from clock_sync import ClockDriftTracker  # noqa: E402
+
+
+class FakeClient:
+    def __init__(self, skew_ms):
+        self.skew_ms = skew_ms
+        self.timestamp_offset = 0
+
+    def get_server_time(self):
+        return {"serverTime": int(time.time() * 1000 + self.skew_ms)}
+
+
+def test_min_rtt_sample_wins():
+    tracker = ClockDriftTracker(FakeClient(0))
+    tracker.add_sample(500, 200)
+    tracker.add_sample(320, 20)
+    tracker.add_sample(100, 400)
+    assert tracker.estimate() == 310
+
+
+def test_slew_and_step():
+    client = FakeClient(0)
+    tracker = ClockDriftTracker(client, max_slew_ms=50, step_threshold_ms=1000)
+    tracker.add_sample(1000, 0)
+    assert tracker.apply() == 1000  # first sample is applied directly
+
+    tracker.samples.clear()
+    tracker.add_sample(1200, 0)
+    assert tracker.apply() == 1050  # slewed by at most 50 ms
+    assert tracker.apply() == 1100
+    assert client.timestamp_offset == 1100
+
+    tracker.samples.clear()
+    tracker.add_sample(5000, 0)
+    assert tracker.apply() == 5000  # beyond the step threshold
+
+
+def test_sample_measures_skew():
+    client = FakeClient(2500)
+    tracker = ClockDriftTracker(client)
+    tracker.sample()
+    offset = tracker.apply()
+    assert 2400 <= offset <= 2501
+
+
+def test_with_retries_resyncs_on_timestamp_error():
+    client = FakeClient(3000)
+    tracker = ClockDriftTracker(client, log=lambda msg: None)
+
+    class TimestampError(Exception):
+        code = -1021
+
+    calls = []
+
+    def signed_call():
+        calls.append(client.timestamp_offset)
+        if client.timestamp_offset < 2000:
+            raise TimestampError("Timestamp for this request is outside of the recvWindow")
+        return "ok"
+
+    prev = main_improved.clock_tracker
+    main_improved.clock_tracker = tracker
+    try:
+        started = time.time()
+        assert main_improved.with_retries(signed_call, backoff_sec=5) == "ok"
+        assert time.time() - started < 1, "should not back off after a resync"
+    finally:
+        main_improved.clock_tracker = prev
+    assert len(calls) == 2
+
+
+if __name__ == "__main__":
+    test_min_rtt_sample_wins()
+    test_slew_and_step()
+    test_sample_measures_skew()
+    test_with_retries_resyncs_on_timestamp_error()
+    print("✅ Clock sync tests passed")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the sliced execution engine.
+Validates:
+- Child size follows book depth x participation and the notional cap
+- Remainders below minNotional are folded into the last child
+- Fills from all children are aggregated into one result
+- A failing child leaves a partial result; cancel stops new children
+- A per-parent child interval overrides the engine's spacing (stops use 0)
+"""
+
+import threading
+from decimal import Decimal
+
+from clock import SimulatedClock
+from execution import ExecutionEngine
+
+
+class FakeBook:
+    synced = True
+
+    def __init__(self, depth, bid=100.0):
+        self.depth = depth
+        self.bid = bid
+
+    def bid_depth(self, max_slippage_pct):
+        return self.depth
+
+    def best_bid(self):
+        return self.bid
+
+
+class FakeExchange:
+    def __init__(self, fail_on=None, gate=None):
+        self.sent = []
+        self.fail_on = fail_on
+        self.gate = gate
+
+    def send(self, qty):
+        if self.gate:
+            self.gate.wait()
+        self.sent.append(qty)
+        if self.fail_on == len(self.sent):
+            raise RuntimeError("rejected")
+        return {
+            "executedQty": str(qty),
+            "fills": [{"price": "100", "qty": str(qty)}],
+        }
+
+
+def engine(exchange, **kwargs):
+    params = dict(
+        send_child=exchange.send,
+        step_size=Decimal("0.01"),
+        min_notional=Decimal("5"),
+        child_interval=0,
+        log=lambda msg: None,
+    )
+    params.update(kwargs)
+    return ExecutionEngine(**params)
+
+
+def test_child_size_from_book_depth():
+    eng = engine(FakeExchange(), book=FakeBook(depth=4.0), participation=Decimal("0.25"))
+    assert eng.child_qty(Decimal("10"), Decimal("100")) == Decimal("1.00")
+
+    eng = engine(FakeExchange(), max_child_notional=Decimal("250"))
+    assert eng.child_qty(Decimal("10"), Decimal("100")) == Decimal("2.50")
+
+
+def test_remainder_folded_into_last_child():
+    eng = engine(FakeExchange(), max_child_notional=Decimal("100"))
+    # 1.00 left after this child would be fine, 0.04 (4 USDT) would not
+    assert eng.child_qty(Decimal("2.00"), Decimal("100")) == Decimal("1.00")
+    assert eng.child_qty(Decimal("1.04"), Decimal("100")) == Decimal("1.04")
+
+
+def test_parent_aggregates_fills():
+    exchange = FakeExchange()
+    eng = engine(exchange, book=FakeBook(depth=4.0), participation=Decimal("0.25"))
+    result = eng.submit(Decimal("3.02"), Decimal("100")).result(timeout=5)
+    assert exchange.sent == [Decimal("1.00"), Decimal("1.00"), Decimal("1.02")]
+    assert result["status"] == "FILLED"
+    assert Decimal(result["executedQty"]) == Decimal("3.02")
+    assert result["children"] == 3
+    assert sum(Decimal(f["qty"]) for f in result["fills"]) == Decimal("3.02")
+
+
+def test_partial_failure_and_cancel():
+    exchange = FakeExchange(fail_on=2)
+    eng = engine(exchange, max_child_notional=Decimal("100"))
+    result = eng.submit(Decimal("3"), Decimal("100")).result(timeout=5)
+    assert result["status"] == "PARTIALLY_FILLED"
+    assert Decimal(result["executedQty"]) == Decimal("1")
+    assert result["error"] == "rejected"
+
+    gate = threading.Event()
+    exchange = FakeExchange(gate=gate)
+    eng = engine(exchange, max_child_notional=Decimal("100"))
+    parent = eng.submit(Decimal("3"), Decimal("100"))
+    parent.cancel()
+    gate.set()
+    assert parent.wait(timeout=5)
+    assert len(exchange.sent) <= 1
+
+
+def test_child_interval_per_parent():
+    sim = SimulatedClock()
+    eng = engine(FakeExchange(), max_child_notional=Decimal("100"), child_interval=1.0, clock=sim)
+    eng.submit(Decimal("3"), Decimal("100")).result(timeout=5)
+    assert sim.slept == 2.0  # between three children
+    eng.submit(Decimal("3"), Decimal("100"), child_interval=0).result(timeout=5)
+    assert sim.slept == 2.0
+
+
+if __name__ == "__main__":
+    test_child_size_from_book_depth()
+    test_remainder_folded_into_last_child()
+    test_parent_aggregates_fills()
+    test_partial_failure_and_cancel()
+    test_child_interval_per_parent()
+    print("✅ Execution engine tests passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for hedged reads across REST endpoints.
+Validates:
+- A slow primary is hedged and the backup's answer wins
+- The ranking learns which endpoint is fastest
+- A failing primary falls over to the backup immediately
+- The synced timestamp offset is copied to every endpoint client
+"""
+
+import time
+
+from hedged_reads import HedgedReader
+
+
+class FakeEndpoint:
+    def __init__(self, name, delay, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+        self.timestamp_offset = 0
+
+    def get_symbol_ticker(self, symbol):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError(f"{self.name} down")
+        return {"symbol": symbol, "price": "600.00", "via": self.name}
+
+
+class BaseClient:
+    timestamp_offset = 1234
+
+
+def reader(*endpoints, **kwargs):
+    params = dict(default_hedge_sec=0.05, min_samples=3, log=lambda msg: None)
+    params.update(kwargs)
+    return HedgedReader(BaseClient(), {e.name: e for e in endpoints}, **params)
+
+
+def test_slow_primary_is_hedged():
+    slow, fast = FakeEndpoint("api", 0.5), FakeEndpoint("api1", 0.01)
+    r = reader(slow, fast)
+    started = time.monotonic()
+    result = r.call("get_symbol_ticker", symbol="BNBUSDT")
+    assert result["via"] == "api1"
+    assert time.monotonic() - started < 0.3
+    assert r.hedges == 1 and r.hedge_wins == 1
+    assert fast.timestamp_offset == 1234
+
+
+def test_ranking_learns_fastest():
+    slow, fast = FakeEndpoint("api", 0.08), FakeEndpoint("api1", 0.005)
+    r = reader(slow, fast, default_hedge_sec=1.0)
+    for _ in range(8):
+        r.call("get_symbol_ticker", symbol="BNBUSDT")
+    time.sleep(0.1)  # let any in-flight request finish and be recorded
+    assert r.ranking()[0] == "api1"
+    assert r.call("get_symbol_ticker", symbol="BNBUSDT")["via"] == "api1"
+
+
+def test_failed_primary_falls_over():
+    down, up = FakeEndpoint("api", 0.0, fail=True), FakeEndpoint("api1", 0.01)
+    r = reader(down, up, default_hedge_sec=5.0)
+    started = time.monotonic()
+    assert r.call("get_symbol_ticker", symbol="BNBUSDT")["via"] == "api1"
+    assert time.monotonic() - started < 1.0
+    assert r.stats["api"].errors == 1
+
+
+if __name__ == "__main__":
+    test_slow_primary_is_hedged()
+    test_ranking_learns_fastest()
+    test_failed_primary_falls_over()
+    print("✅ Hedged read tests passed")
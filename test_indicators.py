@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming multi-timeframe indicator pipeline.
+Validates:
+- Candle aggregation from trades (OHLCV, bar close on boundary)
+- ATR seed + Wilder smoothing, EMA and realized volatility
+- One trade stream drives 1m, 5m and 1h timeframes
+- A bar the stream joined mid-way is not fed to the indicators
+"""
+
+import math
+
+from indicators import CandleAggregator, IndicatorPipeline, StreamingIndicators
+
+
+def assert_almost(a, b, eps=1e-9):
+    assert abs(a - b) <= eps, f"Expected {b}, got {a}"
+
+
+def test_aggregator_builds_ohlcv():
+    agg = CandleAggregator(60_000)
+    assert agg.add_trade(100.0, 1.0, 0) is None
+    assert agg.add_trade(103.0, 0.5, 10_000) is None
+    assert agg.add_trade(99.0, 0.5, 59_999) is None
+
+    bar = agg.add_trade(101.0, 1.0, 60_000)
+    assert bar == {
+        "open_time": 0,
+        "open": 100.0,
+        "high": 103.0,
+        "low": 99.0,
+        "close": 99.0,
+        "volume": 2.0,
+    }
+    # Late trade for the closed bar is ignored
+    assert agg.add_trade(200.0, 1.0, 30_000) is None
+    assert agg.current["high"] == 101.0
+
+
+def test_atr_seed_and_wilder_smoothing():
+    ind = StreamingIndicators(atr_period=3, ema_period=3, vol_window=10)
+    for _ in range(3):
+        ind.update(high=102.0, low=98.0, close=100.0)
+    assert_almost(ind.atr, 4.0)
+
+    ind.update(high=110.0, low=100.0, close=105.0)  # TR = 10
+    assert_almost(ind.atr, 4.0 + (10.0 - 4.0) / 3)
+    assert_almost(ind.ema, 100.0 + 0.5 * (105.0 - 100.0))
+
+
+def test_realized_vol_matches_sample_std():
+    ind = StreamingIndicators(vol_window=3)
+    closes = [100.0, 101.0, 99.0, 102.0, 103.0]
+    for c in closes:
+        ind.update(c, c, c)
+
+    rets = [math.log(closes[i] / closes[i - 1]) for i in range(2, 5)]
+    mean = sum(rets) / 3
+    expected = math.sqrt(sum((r - mean) ** 2 for r in rets) / 2)
+    assert_almost(ind.realized_vol, expected)
+
+
+def test_pipeline_closes_all_timeframes_from_one_stream():
+    pipeline = IndicatorPipeline(atr_period=2)
+    ts = 0
+    # Two hours of trades, one per 30 seconds
+    while ts <= 2 * 3_600_000:
+        pipeline.handle_trade_message(
+            {"e": "trade", "p": str(100 + (ts // 60_000) % 3), "q": "1", "T": ts}
+        )
+        ts += 30_000
+
+    snap = pipeline.snapshot()
+    assert snap["1m"]["bars"] == 120
+    assert snap["5m"]["bars"] == 24
+    assert snap["1h"]["bars"] == 2
+    assert snap["1m"]["atr"] is not None
+    assert snap["1h"]["atr"] is not None
+
+
+def test_seed_from_klines():
+    pipeline = IndicatorPipeline(atr_period=2)
+    klines = [[i * 300_000, "100", "101", "99", "100", "1"] for i in range(3)]
+    pipeline.seed("5m", klines)
+    assert_almost(pipeline.snapshot()["5m"]["atr"], 2.0)
+
+
+def test_partial_first_bar_is_dropped():
+    pipeline = IndicatorPipeline(atr_period=2, timeframes={"5m": 300_000})
+    klines = [[i * 300_000, "100", "101", "99", "100", "1"] for i in range(3)]
+    pipeline.seed("5m", klines)
+    # The stream joins the 4th bar half-way through and sees only a quiet tail
+    for ts in (1_050_000, 1_100_000, 1_150_000):
+        pipeline.on_trade(100.0, 1.0, ts)
+    pipeline.on_trade(100.0, 1.0, 1_200_000)
+    assert pipeline.snapshot()["5m"]["bars"] == 3
+    assert_almost(pipeline.snapshot()["5m"]["atr"], 2.0)
+    pipeline.on_trade(104.0, 1.0, 1_500_000)  # closes the first full streamed bar
+    assert pipeline.snapshot()["5m"]["bars"] == 4
+
+
+if __name__ == "__main__":
+    test_aggregator_builds_ohlcv()
+    test_atr_seed_and_wilder_smoothing()
+    test_realized_vol_matches_sample_std()
+    test_pipeline_closes_all_timeframes_from_one_stream()
+    test_seed_from_klines()
+    test_partial_first_bar_is_dropped()
+    print("✅ Indicator pipeline tests passed")
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Tests for the data.binance.vision bulk ingest (no network access needed).
+Validates:
+- Kline and aggTrades archives are parsed in worker processes into the store
+- Microsecond timestamps and header rows are normalized
+- Overlapping archives and re-runs write nothing twice; older months are prepended
+- Rows that would interleave with the store are refused until a rebuild
+- Candle time gaps (including monthly candles), aggTrade id gaps and checksum
+  mismatches are reported
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import zipfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app2"))
+
+from candle_store import open_candles, open_trades  # noqa: E402
+from ingest import ingest  # noqa: E402
+
+MINUTE = 60_000
+T0 = 1_672_531_200_000  # 2023-01-01
+
+
+def write_archive(directory, name, rows, header=None, checksum=None):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, name)
+    lines = ([header] if header else []) + [",".join(str(v) for v in r) for r in rows]
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr(name.replace(".zip", ".csv"), "\n".join(lines) + "\n")
+    if checksum is not None:
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest() if checksum == "ok" else "0" * 64
+        with open(path + ".CHECKSUM", "w") as f:
+            f.write(f"{digest}  {name}\n")
+    return path
+
+
+def kline_rows(start_ms, count, micros=False):
+    rows = []
+    for i in range(count):
+        ts = start_ms + i * MINUTE
+        price = 300 + i * 0.01
+        rows.append([ts * 1000 if micros else ts, price, price + 1, price - 1, price + 0.5, 10,
+                     ts + MINUTE - 1, 0, 5, 0, 0, 0])
+    return rows
+
+
+def trade_rows(first_id, count, start_ms):
+    return [[first_id + i, 300 + i * 0.01, 0.5, first_id + i, first_id + i, start_ms + i * 100,
+             "True" if i % 2 else "False", "True"] for i in range(count)]
+
+
+def test_klines_ingest_dedupes_and_finds_gaps():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "spot", "monthly", "klines", "BNBUSDT", "1m")
+        write_archive(src, "BNBUSDT-1m-2023-01.zip", kline_rows(T0, 100), checksum="ok")
+        # Header row, microseconds, overlaps the first file and leaves a 5-minute gap
+        write_archive(src, "BNBUSDT-1m-2023-02.zip", kline_rows(T0 + 90 * MINUTE, 10) +
+                      kline_rows(T0 + 105 * MINUTE, 50, micros=True),
+                      header="open_time,open,high,low,close,volume,close_time,q,n,tb,tq,ignore")
+        write_archive(src, "ETHUSDT-1m-2023-01.zip", kline_rows(T0, 10))  # other symbol
+        store = os.path.join(tmp, "store")
+
+        summary = ingest(tmp, "BNBUSDT", "1m", store_dir=store, workers=2, log=lambda m: None)
+        assert summary["archives"] == 2 and summary["verified"] == 1
+        assert summary["written"] == 150 and summary["duplicates"] == 10
+        assert [(b, a) for _, b, a in summary["gaps"]] == [
+            (T0 + 99 * MINUTE, T0 + 105 * MINUTE)
+        ]
+        candles = open_candles(summary["path"])
+        assert candles["ts"][-1] == T0 + 154 * MINUTE  # stored in ms
+        del candles
+
+        again = ingest(tmp, "BNBUSDT", "1m", store_dir=store, workers=1, log=lambda m: None)
+        assert again["written"] == 0 and again["stored"] == 150
+
+
+def test_trades_ingest_and_backfill():
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "aggTrades")
+        store = os.path.join(tmp, "store")
+        write_archive(src, "BNBUSDT-aggTrades-2023-02.zip", trade_rows(1000, 50, T0 + 10**8))
+        first = ingest(tmp, "BNBUSDT", trades=True, store_dir=store, workers=1, log=lambda m: None)
+        assert first["written"] == 50
+
+        # An older month arrives later and an id range is missing from it
+        write_archive(src, "BNBUSDT-aggTrades-2023-01.zip",
+                      trade_rows(900, 60, T0) + trade_rows(970, 30, T0 + 10**6))
+        second = ingest(tmp, "BNBUSDT", trades=True, store_dir=store, workers=2, log=lambda m: None)
+        assert second["written"] == 90 and second["duplicates"] == 50
+        trades = open_trades(second["path"])
+        assert len(trades) == 140
+        assert (trades["id"][1:] > trades["id"][:-1]).all()
+        assert trades["buyer_maker"][1] and not trades["buyer_maker"][0]
+        assert [(b, a) for _, b, a in second["gaps"]] == [(959, 970)]
+        del trades
+
+
+def test_interleaved_rows_need_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = os.path.join(tmp, "store")
+        write_archive(tmp, "BNBUSDT-aggTrades-2023-01.zip", trade_rows(900, 60, T0))
+        write_archive(tmp, "BNBUSDT-aggTrades-2023-03.zip", trade_rows(1100, 50, T0 + 10**8))
+        ingest(tmp, "BNBUSDT", trades=True, store_dir=store, workers=1, log=lambda m: None)
+
+        write_archive(tmp, "BNBUSDT-aggTrades-2023-02.zip", trade_rows(1000, 50, T0 + 10**7))
+        with pytest.raises(ValueError, match="--rebuild"):
+            ingest(tmp, "BNBUSDT", trades=True, store_dir=store, workers=1, log=lambda m: None)
+
+        rebuilt = ingest(tmp, "BNBUSDT", trades=True, store_dir=store, workers=1, rebuild=True,
+                         log=lambda m: None)
+        assert rebuilt["written"] == rebuilt["stored"] == 160
+        trades = open_trades(rebuilt["path"])
+        assert (trades["id"][1:] > trades["id"][:-1]).all()
+        del trades
+
+
+def test_monthly_klines():
+    day = 24 * 60 * MINUTE
+    rows = [r for start in (T0, T0 + 31 * day, T0 + 59 * day) for r in kline_rows(start, 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        write_archive(tmp, "BNBUSDT-1M-2023-01.zip", rows)
+        summary = ingest(tmp, "BNBUSDT", "1M", store_dir=tmp, workers=1, log=lambda m: None)
+        assert summary["written"] == 3 and summary["gaps"] == []
+
+
+def test_checksum_mismatch_fails():
+    with tempfile.TemporaryDirectory() as tmp:
+        write_archive(tmp, "BNBUSDT-1m-2023-01.zip", kline_rows(T0, 10), checksum="bad")
+        with pytest.raises(ValueError, match="checksum mismatch"):
+            ingest(tmp, "BNBUSDT", "1m", store_dir=tmp, workers=1, log=lambda m: None)
+
+
+if __name__ == "__main__":
+    test_klines_ingest_dedupes_and_finds_gaps()
+    test_trades_ingest_and_backfill()
+    test_interleaved_rows_need_rebuild()
+    test_monthly_klines()
+    test_checksum_mismatch_fails()
+    print("✅ Ingest tests passed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for config hot-reload.
+Validates:
+- Tunables are parsed and validated as one set; any bad value rejects the file
+- A changed file is picked up by mtime and SIGHUP forces a re-read
+- Changes are handed over once, together, and restart-only keys are ignored
+"""
+
+import os
+import tempfile
+from decimal import Decimal
+
+import pytest
+
+from clock import SimulatedClock
+from live_config import ConfigError, ConfigWatcher, parse_tunables
+
+CURRENT = {"TARGET_PCT": Decimal("0.005"), "CHECK_INTERVAL": 5, "REENTRY_STRATEGY": "none"}
+
+
+def write(path, text, bump=0):
+    with open(path, "w") as f:
+        f.write(text)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+
+def test_parse_and_validate():
+    parsed = parse_tunables({"TARGET_PCT": "0.01", "CHECK_INTERVAL": "3", "SYMBOL": "ETHUSDT"})
+    assert parsed == {"TARGET_PCT": Decimal("0.01"), "CHECK_INTERVAL": 3}
+    with pytest.raises(ConfigError) as err:
+        parse_tunables({"TARGET_PCT": "1.5", "CHECK_INTERVAL": "fast", "REENTRY_STRATEGY": "x"})
+    message = str(err.value)
+    assert "TARGET_PCT" in message and "CHECK_INTERVAL" in message and "REENTRY_STRATEGY" in message
+
+
+def test_reload_on_mtime_change():
+    logs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, ".env")
+        write(path, "TARGET_PCT=0.005\nCHECK_INTERVAL=5\nSYMBOL=BNBUSDT\n")
+        watcher = ConfigWatcher(path, CURRENT, log=logs.append)
+        assert watcher.check() is None  # unchanged
+
+        write(path, "TARGET_PCT=0.008\nCHECK_INTERVAL=2\nSYMBOL=ETHUSDT\n", bump=10**9)
+        watcher.check()
+        assert watcher.take() == {"TARGET_PCT": Decimal("0.008"), "CHECK_INTERVAL": 2}
+        assert watcher.take() is None  # handed over once
+        assert any("SYMBOL" in line and "restart" in line for line in logs)
+
+        write(path, "TARGET_PCT=0.008\nCHECK_INTERVAL=0\n", bump=2 * 10**9)
+        watcher.check()
+        assert watcher.take() is None  # invalid file changes nothing
+        assert any("rejected" in line for line in logs)
+
+
+def test_sighup_forces_reread():
+    sim = SimulatedClock(start=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, ".env")
+        write(path, "TARGET_PCT=0.005\n")
+        watcher = ConfigWatcher(path, CURRENT, interval=60, log=lambda msg: None, clock=sim)
+        with open(path, "w") as f:  # same mtime granularity: only the signal notices
+            f.write("TARGET_PCT=0.007\n")
+        os.utime(path, ns=(watcher._mtime, watcher._mtime))
+        watcher.run_pending()
+        assert watcher.take() is None
+        watcher.request_reload()
+        watcher.run_pending()
+        assert watcher.take() == {"TARGET_PCT": Decimal("0.007")}
+
+
+if __name__ == "__main__":
+    test_parse_and_validate()
+    test_reload_on_mtime_change()
+    test_sighup_forces_reread()
+    print("✅ Config reload tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared market-data daemon.
+Validates:
+- Two bots on one stream share a single upstream socket
+- Stream messages fan out to every subscriber
+- Price reads from several bots cost one REST request
+- The upstream closes when the last subscriber leaves
+- A client that never reads is dropped without blocking the fan-out
+"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from md_daemon import MarketDataClient, MarketDataDaemon, _Subscriber
+
+
+class FakeStreamManager:
+    def __init__(self):
+        self.open = {}
+        self.opened = 0
+
+    def start_multiplex_socket(self, callback, streams):
+        self.opened += 1
+        name = f"sock-{self.opened}"
+        self.open[name] = streams
+        return name
+
+    def stop_socket(self, name):
+        del self.open[name]
+
+
+class FakeClient:
+    def __init__(self):
+        self.ticker_calls = 0
+
+    def get_symbol_ticker(self, symbol):
+        self.ticker_calls += 1
+        return {"symbol": symbol, "price": "612.50"}
+
+    def get_order_book(self, symbol, limit=1000):
+        return {"lastUpdateId": 1, "bids": [], "asks": []}
+
+
+def wait_until(cond, timeout=2.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def start_daemon(tmp):
+    manager, client = FakeStreamManager(), FakeClient()
+    daemon = MarketDataDaemon(
+        os.path.join(tmp, "md.sock"), client, manager, rest_ttl=60, log=lambda msg: None
+    )
+    daemon.bind()
+    threading.Thread(target=daemon.serve_forever, daemon=True).start()
+    return daemon, manager, client
+
+
+def test_fan_out_and_shared_upstream():
+    with tempfile.TemporaryDirectory() as tmp:
+        daemon, manager, client = start_daemon(tmp)
+        try:
+            received = {1: [], 2: []}
+            bots = []
+            for n in (1, 2):
+                bot = MarketDataClient(daemon.socket_path, log=lambda msg: None)
+                bot.start()
+                bot.start_trade_socket(received[n].append, "BNBUSDT")
+                bots.append(bot)
+            assert wait_until(lambda: len(daemon.subscribers["bnbusdt@trade"]) == 2)
+            assert manager.opened == 1
+
+            daemon.on_message({"stream": "bnbusdt@trade", "data": {"e": "trade", "p": "612.5"}})
+            assert wait_until(lambda: received[1] and received[2])
+            assert received[1][0]["p"] == "612.5"
+
+            for bot in bots:
+                assert bot.get_symbol_ticker(symbol="BNBUSDT")["price"] == "612.50"
+            assert client.ticker_calls == 1
+
+            for bot in bots:
+                bot.stop_socket("bnbusdt@trade")
+            assert wait_until(lambda: not manager.open)
+            for bot in bots:
+                bot.stop()
+        finally:
+            daemon.stop()
+
+
+def test_slow_subscriber_never_blocks_fan_out():
+    conn, peer = socket.socketpair()  # peer never reads
+    try:
+        # Fill the socket buffer so the writer's first send blocks for good
+        conn.setblocking(False)
+        try:
+            while True:
+                conn.send(b"x" * 65536)
+        except BlockingIOError:
+            pass
+        conn.setblocking(True)
+        sub = _Subscriber(conn, max_queue=2)
+        line = b"x" * 1024 + b"\n"
+        sub.push(line)
+        assert wait_until(lambda: sub._queue.empty())  # the writer is stuck sending it
+        fan_out = threading.Thread(target=lambda: [sub.push(line) for _ in range(200)], daemon=True)
+        fan_out.start()
+        fan_out.join(timeout=2.0)
+        assert not fan_out.is_alive(), "push blocked on a full subscriber queue"
+        assert sub.closed
+        sub._writer.join(timeout=2.0)
+        assert not sub._writer.is_alive()
+    finally:
+        peer.close()
+
+
+if __name__ == "__main__":
+    test_fan_out_and_shared_upstream()
+    test_slow_subscriber_never_blocks_fan_out()
+    print("✅ Market data daemon tests passed")
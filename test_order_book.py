@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the local L2 order book.
+Validates:
+- Snapshot + buffered diff replay (stale events dropped)
+- Level updates and removals keep both sides sorted
+- Sequence gaps mark the book unsynced and re-buffer
+- VWAP-to-sell and depth queries
+"""
+
+from order_book import LocalOrderBook
+
+
+def diff(U, u, bids=(), asks=()):
+    return {"e": "depthUpdate", "U": U, "u": u, "b": list(bids), "a": list(asks)}
+
+
+SNAPSHOT = {
+    "lastUpdateId": 100,
+    "bids": [["100.0", "1.0"], ["99.5", "2.0"], ["99.0", "5.0"]],
+    "asks": [["100.5", "1.5"], ["101.0", "3.0"]],
+}
+
+
+def synced_book():
+    book = LocalOrderBook("BNBUSDT", log=lambda msg: None)
+    book.handle_depth_message(diff(90, 95, bids=[["98.0", "9"]]))  # stale
+    book.handle_depth_message(diff(96, 102, bids=[["100.0", "1.5"]]))
+    book.handle_depth_message(diff(103, 104, asks=[["100.5", "0"]]))
+    assert not book.synced
+    assert book.load_snapshot(SNAPSHOT)
+    return book
+
+
+def test_snapshot_and_buffered_replay():
+    book = synced_book()
+    assert book.synced
+    assert book.last_update_id == 104
+    assert book.best_bid() == 100.0
+    assert book.best_ask() == 101.0  # 100.5 removed by the replayed diff
+    assert book.bids.qty[100.0] == 1.5
+    assert 98.0 not in book.bids.qty  # stale event was dropped
+
+
+def test_level_updates_keep_order():
+    book = synced_book()
+    book.handle_depth_message(
+        diff(105, 105, bids=[["99.75", "1"], ["99.5", "0"]], asks=[["100.25", "2"]])
+    )
+    assert [p for p, _ in book.bids.levels()] == [100.0, 99.75, 99.0]
+    assert [p for p, _ in book.asks.levels()] == [100.25, 101.0]
+    assert book.mid() == (100.0 + 100.25) / 2
+
+
+def test_gap_marks_unsynced():
+    book = synced_book()
+    book.handle_depth_message(diff(110, 111, bids=[["50", "1"]]))
+    assert not book.synced
+    assert 50.0 not in book.bids.qty
+
+
+def test_vwap_sell_and_depth():
+    book = synced_book()
+    vwap, filled = book.vwap_sell(2.5)
+    assert filled == 2.5
+    assert abs(vwap - (1.5 * 100.0 + 1.0 * 99.5) / 2.5) < 1e-12
+
+    vwap, filled = book.vwap_sell(100)
+    assert filled == 1.5 + 2.0 + 5.0
+
+    assert book.bid_depth(0.006) == 1.5 + 2.0  # down to 99.4
+    vwap, filled = book.vwap_buy(1.0)
+    assert vwap == 101.0 and filled == 1.0
+
+
+if __name__ == "__main__":
+    test_snapshot_and_buffered_replay()
+    test_level_updates_keep_order()
+    test_gap_marks_unsynced()
+    test_vwap_sell_and_depth()
+    print("✅ Order book tests passed")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the WebSocket API order gateway using an in-memory socket.
+Validates:
+- Signature matches a freshly keyed HMAC over the sorted params
+- Responses are correlated to requests by id (even out of order)
+- Error responses raise BinanceOrderException
+- A dropped connection after send raises GatewayDisconnected(sent=True)
+"""
+
+import hashlib
+import hmac
+import json
+import queue
+import threading
+from urllib.parse import urlencode
+
+from binance.exceptions import BinanceOrderException
+
+from order_gateway import GatewayDisconnected, OrderGateway
+
+
+class FakeSocket:
+    """Answers each request via a handler; iteration yields queued frames."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.sent = []
+        self.inbox = queue.Queue()
+
+    def send(self, frame):
+        req = json.loads(frame)
+        self.sent.append(req)
+        for response in self.handler(req, self):
+            self.inbox.put(json.dumps(response))
+
+    def close(self):
+        self.inbox.put(None)
+
+    def __iter__(self):
+        while True:
+            frame = self.inbox.get()
+            if frame is None:
+                return
+            yield frame
+
+
+def start_gateway(handler):
+    sock = FakeSocket(handler)
+    gw = OrderGateway("key", "secret", timeout=1.0, connect=lambda url: sock,
+                      timestamp_ms=lambda: 1700000000000, reconnect_delay=60)
+    assert gw.start()
+    return gw, sock
+
+
+def test_signature_and_fill_result():
+    def handler(req, sock):
+        yield {"id": req["id"], "status": 200,
+               "result": {"executedQty": req["params"]["quantity"], "fills": []}}
+
+    gw, sock = start_gateway(handler)
+    result = gw.place_order(symbol="BNBUSDT", side="SELL", type="MARKET", quantity="0.5")
+    assert result["executedQty"] == "0.5"
+
+    params = dict(sock.sent[0]["params"])
+    signature = params.pop("signature")
+    expected = hmac.new(b"secret", urlencode(sorted(params.items())).encode(),
+                        hashlib.sha256).hexdigest()
+    assert signature == expected
+    assert params["apiKey"] == "key"
+    assert sock.sent[0]["method"] == "order.place"
+    gw.close()
+
+
+def test_out_of_order_responses_are_correlated():
+    held = []
+
+    def handler(req, sock):
+        held.append(req)
+        if len(held) == 2:
+            # Answer the second request first
+            for r in reversed(held):
+                yield {"id": r["id"], "status": 200, "result": {"qty": r["params"]["quantity"]}}
+
+    gw, _ = start_gateway(handler)
+    results = {}
+
+    def place(qty):
+        results[qty] = gw.place_order(symbol="BNBUSDT", side="SELL", type="MARKET", quantity=qty)
+
+    t = threading.Thread(target=place, args=("1",))
+    t.start()
+    while not held:
+        pass
+    place("2")
+    t.join()
+    assert results == {"1": {"qty": "1"}, "2": {"qty": "2"}}
+    gw.close()
+
+
+def test_error_response_raises_order_exception():
+    def handler(req, sock):
+        yield {"id": req["id"], "status": 400,
+               "error": {"code": -2010, "msg": "Account has insufficient balance"}}
+
+    gw, _ = start_gateway(handler)
+    try:
+        gw.place_order(symbol="BNBUSDT", side="SELL", type="MARKET", quantity="9")
+        assert False, "Expected BinanceOrderException"
+    except BinanceOrderException as e:
+        assert e.code == -2010
+    gw.close()
+
+
+def test_disconnect_after_send_is_ambiguous():
+    def handler(req, sock):
+        sock.close()
+        return []
+
+    gw, _ = start_gateway(handler)
+    try:
+        gw.place_order(symbol="BNBUSDT", side="SELL", type="MARKET", quantity="1")
+        assert False, "Expected GatewayDisconnected"
+    except GatewayDisconnected as e:
+        assert e.sent
+    gw.close()
+
+
+if __name__ == "__main__":
+    test_signature_and_fill_result()
+    test_out_of_order_responses_are_correlated()
+    test_error_response_raises_order_exception()
+    test_disconnect_after_send_is_ambiguous()
+    print("✅ Order gateway tests passed")
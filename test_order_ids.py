@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for idempotent order placement.
+Validates:
+- Client order ids are deterministic per intent and within Binance's limits
+- A timeout after the exchange accepted the order is resolved by lookup, not a resend
+- An order that never arrived is resubmitted under the same id
+- Definite rejections are raised without retrying
+- A missing order is trusted only after the recvWindow the client really sends
+- main.py, the deployed entry point, places orders the same way
+"""
+
+import os
+import re
+from decimal import Decimal
+
+import requests
+
+os.environ.setdefault("DRY_RUN", "true")
+os.environ.setdefault("TESTNET", "true")
+
+import main  # noqa: E402
+import main_improved  # noqa: E402
+from clock import SimulatedClock  # noqa: E402
+from order_ids import OrderIdAllocator, client_order_id, submit_idempotent  # noqa: E402
+
+
+class ApiError(Exception):
+    def __init__(self, code, status_code=400):
+        super().__init__(f"code {code}")
+        self.code = code
+        self.status_code = status_code
+
+
+class FakeExchange:
+    """Accepts orders but can lose the response (timeout) for the first n sends."""
+
+    def __init__(self, drop_responses=0, lose_requests=0):
+        self.orders = {}
+        self.sends = []
+        self.drop_responses = drop_responses
+        self.lose_requests = lose_requests
+        self.timestamp_offset = 0
+
+    def order_market_sell(self, newClientOrderId, symbol, quantity, **kwargs):
+        self.sends.append(newClientOrderId)
+        if self.lose_requests:
+            self.lose_requests -= 1
+            raise requests.exceptions.ConnectTimeout("connect timed out")
+        order = {
+            "clientOrderId": newClientOrderId,
+            "status": "FILLED",
+            "executedQty": quantity,
+            "cummulativeQuoteQty": str(Decimal(quantity) * 600),
+        }
+        self.orders[newClientOrderId] = order
+        if self.drop_responses:
+            self.drop_responses -= 1
+            raise requests.exceptions.ReadTimeout("read timed out")
+        return dict(order, fills=[{"price": "600", "qty": quantity}])
+
+    def get_order(self, symbol, origClientOrderId, **kwargs):
+        if origClientOrderId not in self.orders:
+            raise ApiError(-2013)
+        return self.orders[origClientOrderId]
+
+
+def test_ids_deterministic():
+    a = client_order_id("hv", "BNBUSDT", "SELL", "1:7")
+    assert a == client_order_id("hv", "BNBUSDT", "SELL", "1:7")
+    assert a != client_order_id("hv", "BNBUSDT", "SELL", "1:8")
+    assert re.fullmatch(r"[.A-Z:/a-z0-9_-]{1,36}", a)
+    ids = OrderIdAllocator("hv", session=1)
+    assert ids.next_id("BNBUSDT", "SELL") == client_order_id("hv", "BNBUSDT", "SELL", "1:1")
+
+
+def test_timeout_after_accept_is_not_resent():
+    exchange = FakeExchange(drop_responses=1)
+    prev = main_improved.ORDER_RECV_WINDOW
+    main_improved.ORDER_RECV_WINDOW = 0
+    try:
+        result = main_improved.send_market_order(
+            exchange, exchange.order_market_sell, "SELL", symbol="BNBUSDT", quantity="1.5"
+        )
+    finally:
+        main_improved.ORDER_RECV_WINDOW = prev
+    assert len(exchange.sends) == 1
+    assert len(exchange.orders) == 1
+    assert result["executedQty"] == "1.5"
+    assert result["fills"][0]["price"] == "600"
+
+
+def test_lost_request_is_resubmitted_with_same_id():
+    exchange = FakeExchange(lose_requests=1)
+    result = submit_idempotent(
+        lambda cid: exchange.order_market_sell(cid, "BNBUSDT", "2"),
+        lambda cid: exchange.get_order("BNBUSDT", cid),
+        "hv-abc",
+        backoff_sec=0,
+        recv_window_sec=0.05,
+        log=lambda msg: None,
+    )
+    assert exchange.sends == ["hv-abc", "hv-abc"]
+    assert result["status"] == "FILLED"
+
+
+def test_definite_rejection_raises():
+    calls = []
+
+    def submit(cid):
+        calls.append(cid)
+        raise ApiError(-2010)  # insufficient balance
+
+    try:
+        submit_idempotent(submit, lambda cid: None, "hv-x", backoff_sec=0, log=lambda msg: None)
+        assert False, "expected rejection"
+    except ApiError as e:
+        assert e.code == -2010
+    assert calls == ["hv-x"]
+
+
+def test_lookup_waits_for_the_recv_window_sent():
+    # python-binance sends REQUEST_RECVWINDOW regardless of the per-call recvWindow
+    exchange = FakeExchange(lose_requests=1)
+    exchange.REQUEST_RECVWINDOW = 10000
+    saved = main_improved.clock, main_improved.ORDER_RECV_WINDOW, main_improved.ORDER_RETRY_BACKOFF
+    main_improved.clock = SimulatedClock()
+    main_improved.ORDER_RECV_WINDOW = 5000
+    main_improved.ORDER_RETRY_BACKOFF = 0
+    try:
+        result = main_improved.send_market_order(
+            exchange, exchange.order_market_sell, "SELL", symbol="BNBUSDT", quantity="1"
+        )
+        assert main_improved.clock.slept == 10.0
+    finally:
+        main_improved.clock, main_improved.ORDER_RECV_WINDOW, main_improved.ORDER_RETRY_BACKOFF = saved
+    assert len(exchange.sends) == 2
+    assert result["status"] == "FILLED"
+
+
+def test_main_sell_timeout_after_accept_is_not_resent():
+    exchange = FakeExchange(drop_responses=1)
+    saved = main.DRY_RUN, main.ORDER_RECV_WINDOW
+    main.DRY_RUN, main.ORDER_RECV_WINDOW = False, 0
+    try:
+        result = main.place_market_sell(exchange, "BNBUSDT", Decimal("1.5"), Decimal("0.001"))
+    finally:
+        main.DRY_RUN, main.ORDER_RECV_WINDOW = saved
+    assert len(exchange.sends) == 1
+    assert len(exchange.orders) == 1
+    assert result["executedQty"] == "1.500"
+
+
+if __name__ == "__main__":
+    test_ids_deterministic()
+    test_timeout_after_accept_is_not_resent()
+    test_lost_request_is_resubmitted_with_same_id()
+    test_definite_rejection_raises()
+    test_lookup_waits_for_the_recv_window_sent()
+    test_main_sell_timeout_after_accept_is_not_resent()
+    print("✅ Order id tests passed")
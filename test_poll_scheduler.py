@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the adaptive poll scheduler.
+Validates:
+- Polls slowly far from triggers and quickly near them (ATR units)
+- Interval shrinks monotonically as the price approaches a trigger
+- Falls back to a percentage of price without ATR
+- The rolling weight budget caps the poll rate
+"""
+
+from decimal import Decimal
+
+from poll_scheduler import PollScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def scheduler(**kwargs):
+    params = dict(min_interval=1.0, max_interval=30.0, near_atr=0.5, far_atr=5.0,
+                  weight_per_poll=1, weight_budget=10_000)
+    params.update(kwargs)
+    return PollScheduler(**params)
+
+
+def test_far_and_near():
+    sched = scheduler()
+    atr = Decimal("2")
+    # 9% below the price at 600 is 27 ATR away
+    assert sched.next_delay(Decimal("600"), [Decimal("546")], atr) == 30.0
+    assert sched.next_delay(Decimal("600"), [Decimal("599.5")], atr) == 1.0
+    assert sched.next_delay(Decimal("600"), [None], atr) == 30.0
+
+
+def test_interval_shrinks_towards_trigger():
+    sched = scheduler()
+    atr = Decimal("2")
+    stop = Decimal("590")
+    delays = [sched.next_delay(stop + Decimal(d), [stop, Decimal("700")], atr) for d in (9, 6, 3, 1.5)]
+    assert delays == sorted(delays, reverse=True)
+    assert 1.0 < delays[-1] < delays[0] < 30.0
+
+
+def test_fallback_without_atr():
+    sched = scheduler(fallback_pct=Decimal("0.005"))
+    # 0.1% away is 0.2 units of 0.5% -> near
+    assert sched.next_delay(Decimal("600"), [Decimal("599.4")]) == 1.0
+
+
+def test_weight_budget():
+    clock = FakeClock()
+    sched = scheduler(weight_per_poll=20, weight_budget=100, clock=clock)
+    assert sched.budget_delay() == 12.0  # 100 weight/min at 20 per poll
+    for _ in range(5):
+        sched.record()
+        clock.now += 1
+    # The window is full: wait until the first poll leaves it
+    assert sched.next_delay(Decimal("600"), [Decimal("599.9")], Decimal("2")) == 55.0
+    clock.now += 60
+    assert sched.budget_delay() == 12.0
+
+
+if __name__ == "__main__":
+    test_far_and_near()
+    test_interval_shrinks_towards_trigger()
+    test_fallback_without_atr()
+    test_weight_budget()
+    print("✅ Poll scheduler tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the failover price feed.
+Validates:
+- A stale stream switches the feed to REST polling within the bound
+- The stream takes over again once it is healthy
+- Duplicate and out-of-order prices never reach the strategy
+- REST polling backs off while the price is unchanged
+- When stream and REST both fail, the price ages and the bot refuses it
+"""
+
+import os
+import time
+from decimal import Decimal
+
+os.environ.setdefault("DRY_RUN", "true")
+os.environ.setdefault("TESTNET", "true")
+
+import main_improved  # noqa: E402
+from clock import SimulatedClock  # noqa: E402
+from price_feed import REST, STREAM, PriceFeed  # noqa: E402
+
+
+def trade(price, ts_ms, trade_id):
+    return {"e": "trade", "p": str(price), "T": ts_ms, "t": trade_id}
+
+
+class Clock:
+    def __init__(self, ms):
+        self.ms = ms
+
+    def __call__(self):
+        return self.ms
+
+
+def make_feed(rest_prices, clock, **kwargs):
+    prices = iter(rest_prices)
+    params = dict(stale_after=0.05, poll_min=0, poll_max=0, recover_count=2, log=lambda msg: None)
+    params.update(kwargs)
+    return PriceFeed(lambda: next(prices), now_ms=clock, **params)
+
+
+def test_switch_to_rest_and_back():
+    clock = Clock(1_000)
+    feed = make_feed(["101", "102"], clock)
+    feed.handle_trade_message(trade(100, 1_000, 1))
+    feed.handle_trade_message(trade(100.5, 1_001, 2))
+    assert feed.mode == STREAM
+
+    time.sleep(0.06)
+    clock.ms = 2_000
+    feed.check()
+    assert feed.mode == REST
+    assert feed.latest()[:2] == (Decimal("101"), REST)
+
+    # A late trade from before the REST read is dropped
+    feed.handle_trade_message(trade(99, 1_500, 3))
+    assert feed.latest()[0] == Decimal("101")
+
+    feed.handle_trade_message(trade(103, 2_100, 4))
+    assert feed.mode == REST  # one message is not enough to trust the stream
+    feed.handle_trade_message(trade(103.5, 2_101, 5))
+    assert feed.mode == STREAM
+    assert feed.latest()[:2] == (Decimal("103.5"), STREAM)
+    assert feed.switches == 3  # rest -> stream -> rest -> stream
+
+
+def test_duplicates_and_ordering():
+    feed = make_feed([], Clock(0))
+    feed.handle_trade_message(trade(100, 1_000, 10))
+    seq = feed.latest()[2]
+    feed.handle_trade_message(trade(100, 1_000, 10))  # replayed
+    feed.handle_trade_message(trade(98, 999, 9))  # out of order
+    assert feed.latest()[2] == seq
+    feed.handle_trade_message(trade(101, 1_000, 11))  # same ms, newer trade
+    assert feed.latest()[:3] == (Decimal("101"), STREAM, seq + 1)
+
+
+def test_rest_backoff_when_unchanged():
+    clock = Clock(0)
+    feed = make_feed(["100"] * 5, clock, poll_min=1.0, poll_max=4.0)
+    start = time.monotonic()
+    for step in range(3):
+        clock.ms += 1
+        feed._poll(start)
+    assert feed._poll_delay == 2.25  # 1.0 -> 1.5 -> 2.25 on unchanged prices
+    assert feed.wait_for_update(feed.seq, timeout=0.01)[:3] == (Decimal("100"), REST, 3)
+
+
+class DownClient:
+    def get_symbol_ticker(self, symbol):
+        raise ConnectionError("REST down")
+
+
+def test_both_sources_down_is_never_traded_on():
+    sim = SimulatedClock(start=1_000.0)
+
+    def fail():
+        raise ConnectionError("REST down")
+
+    feed = PriceFeed(fail, now_ms=lambda: int(sim.time() * 1000), stale_after=5, poll_min=1,
+                     poll_max=5, log=lambda msg: None, monotonic=sim.monotonic)
+    feed.seed("600")
+    saved = main_improved.clock
+    main_improved.clock = sim
+    try:
+        assert main_improved.feed_price(DownClient(), feed) == Decimal("600")
+        for _ in range(5):  # no stream messages and every REST poll fails
+            sim.advance(3)
+            feed.check()
+        price, _, _, published_at = feed.latest()
+        assert price == Decimal("600")
+        assert sim.monotonic() - published_at > main_improved.FEED_MAX_AGE
+        assert main_improved.feed_price(DownClient(), feed) is None
+    finally:
+        main_improved.clock = saved
+
+
+if __name__ == "__main__":
+    test_switch_to_rest_and_back()
+    test_duplicates_and_ordering()
+    test_rest_backoff_when_unchanged()
+    test_both_sources_down_is_never_traded_on()
+    print("✅ Price feed tests passed")
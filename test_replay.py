@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Replays of main_improved.main() on a simulated clock.
+Validates:
+- A full day of trading runs in seconds against a mocked client
+- Harvests fire on a steady uptrend and the ATR stop trails without firing
+- A crash triggers the ATR stop, sells everything and ends the run
+- A stop sell that only partly fills sells the rest before reporting success,
+  even when the price bounces back above the stop in between
+"""
+
+import os
+import tempfile
+import time
+from decimal import Decimal
+
+os.environ.setdefault("DRY_RUN", "true")
+os.environ.setdefault("TESTNET", "true")
+
+import candle_cache  # noqa: E402
+import main_improved  # noqa: E402
+from clock import SimulatedClock  # noqa: E402
+
+T0 = 1_700_000_000.0  # virtual start (seconds)
+DAY = 86_400
+
+
+class ReplayClient:
+    """Exchange mock whose prices follow price_at(seconds since T0)."""
+
+    def __init__(self, clock, price_at, bnb="1.0", usdt="0", end_after=DAY):
+        self.clock = clock
+        self.price_at = price_at
+        self.end_at = T0 + end_after
+        self.balances = {"BNB": Decimal(bnb), "USDT": Decimal(usdt)}
+        self.orders = []
+        self.timestamp_offset = 0
+        self.partial_sells = 0  # sells from partial_from on that fill only half
+        self.partial_from = T0
+        self.reject_sells = 0  # sells after a partial fill that are rejected
+        self.rejected = 0
+
+    def price(self):
+        return Decimal(str(round(self.price_at(self.clock.time() - T0), 2)))
+
+    def get_server_time(self):
+        return {"serverTime": int(self.clock.time() * 1000)}
+
+    def get_exchange_info(self):
+        return {
+            "symbols": [
+                {
+                    "symbol": "BNBUSDT",
+                    "baseAsset": "BNB",
+                    "quoteAsset": "USDT",
+                    "filters": [
+                        {"filterType": "LOT_SIZE", "stepSize": "0.001", "minQty": "0.001"},
+                        {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+                        {"filterType": "NOTIONAL", "minNotional": "1"},
+                    ],
+                }
+            ]
+        }
+
+    def get_symbol_ticker(self, symbol):
+        if self.clock.time() >= self.end_at:
+            raise KeyboardInterrupt  # end of the replay
+        return {"symbol": symbol, "price": str(self.price())}
+
+    def get_asset_balance(self, asset=None):
+        rows = [{"asset": a, "free": str(v), "locked": "0"} for a, v in self.balances.items()]
+        if asset is None:
+            return rows
+        return next(r for r in rows if r["asset"] == asset)
+
+    def get_klines(self, symbol, interval, limit=500, startTime=None):
+        step = 300_000
+        now_ms = int(self.clock.time() * 1000)
+        last_open = now_ms // step * step - step  # last closed candle
+        first = last_open - (limit - 1) * step
+        if startTime is not None:
+            first = max(first, startTime // step * step)
+        klines = []
+        for open_ms in range(first, last_open + 1, step):
+            t_open = open_ms / 1000 - T0
+            prices = [self.price_at(t_open + s) for s in range(0, 301, 60)]
+            klines.append([open_ms, prices[0], max(prices), min(prices), prices[-1], 1.0,
+                           open_ms + step - 1])
+        return klines
+
+    def _fill(self, cid, side, qty, price):
+        order = {
+            "clientOrderId": cid,
+            "side": side,
+            "status": "FILLED",
+            "executedQty": str(qty),
+            "cummulativeQuoteQty": str(qty * price),
+            "fills": [{"price": str(price), "qty": str(qty)}],
+            "time": self.clock.time(),
+        }
+        self.orders.append(order)
+        return order
+
+    def order_market_sell(self, newClientOrderId, symbol, quantity, **kwargs):
+        qty, price = Decimal(quantity), self.price()
+        if self.partial_sells and self.clock.time() >= self.partial_from:
+            self.partial_sells -= 1
+            qty = (qty / 2).quantize(Decimal("0.001"))
+        elif self.reject_sells and self.clock.time() >= self.partial_from:
+            self.reject_sells -= 1
+            self.rejected += 1
+            raise RuntimeError("sell rejected")
+        self.balances["BNB"] -= qty
+        self.balances["USDT"] += qty * price
+        return self._fill(newClientOrderId, "SELL", qty, price)
+
+    def order_market_buy(self, newClientOrderId, symbol, quoteOrderQty, **kwargs):
+        price = self.price()
+        qty = (Decimal(quoteOrderQty) / price).quantize(Decimal("0.001"))
+        self.balances["BNB"] += qty
+        self.balances["USDT"] -= qty * price
+        return self._fill(newClientOrderId, "BUY", qty, price)
+
+
+def replay(price_at, partial_sells=0, partial_from=0, reject_sells=0, setup=None, **client_kwargs):
+    """Run main_improved.main() on a simulated clock. Returns (client, clock)."""
+    sim = SimulatedClock(start=T0)
+    client = ReplayClient(sim, price_at, **client_kwargs)
+    client.partial_sells = partial_sells
+    client.partial_from = T0 + partial_from
+    client.reject_sells = reject_sells
+    if setup:
+        setup(client)
+    saved = {
+        name: getattr(main_improved, name)
+        for name in ("clock", "DRY_RUN", "BINANCE_API_KEY", "BINANCE_API_SECRET",
+                     "TELEGRAM_BOT_TOKEN", "USE_ATR_STOP_LOSS", "clock_tracker")
+    }
+    saved_cache_dir = candle_cache.CANDLE_CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        main_improved.clock = sim
+        main_improved.DRY_RUN = False
+        main_improved.BINANCE_API_KEY = main_improved.BINANCE_API_SECRET = "replay"
+        main_improved.TELEGRAM_BOT_TOKEN = ""
+        main_improved.USE_ATR_STOP_LOSS = True
+        candle_cache.CANDLE_CACHE_DIR = tmp
+        try:
+            main_improved.main(client=client)
+        finally:
+            for name, value in saved.items():
+                setattr(main_improved, name, value)
+            candle_cache.CANDLE_CACHE_DIR = saved_cache_dir
+    return client, sim
+
+
+def test_replay_day_of_uptrend():
+    started = time.monotonic()
+    client, sim = replay(lambda t: 600 * (1 + 0.05 * t / DAY))
+    assert time.monotonic() - started < 30
+    assert sim.time() >= T0 + DAY  # ran the whole day
+
+    sells = [o for o in client.orders if o["side"] == "SELL"]
+    assert 5 <= len(sells) <= 15  # one harvest per ~0.5% move
+    assert client.balances["BNB"] > Decimal("0.9")  # only profit was sold
+    assert client.balances["USDT"] > 0
+
+
+def test_replay_crash_hits_atr_stop():
+    def price_at(t):
+        base = 600 * (1 + 0.002 * t / 3600)
+        return base if t < 12 * 3600 else base * 0.97
+
+    client, sim = replay(price_at)
+    assert client.balances["BNB"] == 0
+    assert client.orders[-1]["side"] == "SELL"
+    assert T0 + 12 * 3600 <= sim.time() < T0 + 12 * 3600 + 60
+
+
+def test_replay_partial_stop_fill_sells_the_rest():
+    def price_at(t):
+        base = 600 * (1 + 0.002 * t / 3600)
+        return base if t < 12 * 3600 else base * 0.97
+
+    client, sim = replay(price_at, partial_sells=1, partial_from=12 * 3600)
+    assert client.balances["BNB"] == 0
+    stop_sells = [o for o in client.orders if o["time"] >= T0 + 12 * 3600]
+    assert len(stop_sells) == 2
+    assert Decimal(stop_sells[0]["executedQty"]) == Decimal(stop_sells[1]["executedQty"])
+    assert sim.time() < T0 + 12 * 3600 + 60
+
+
+def test_replay_unfinished_stop_completes_after_bounce():
+    clients = []
+
+    def price_at(t):
+        base = 600 * (1 + 0.002 * t / 3600)
+        crashed = t >= 12 * 3600 and not (clients and clients[0].rejected)
+        return base * 0.97 if crashed else base  # back above the stop once the remainder failed
+
+    client, sim = replay(price_at, partial_sells=1, partial_from=12 * 3600, reject_sells=1,
+                         setup=clients.append)
+    assert client.rejected == 1
+    assert client.balances["BNB"] == 0
+    stop_sells = [o for o in client.orders if o["time"] >= T0 + 12 * 3600]
+    assert len(stop_sells) == 2
+    assert Decimal(stop_sells[1]["fills"][0]["price"]) > Decimal(stop_sells[0]["fills"][0]["price"])
+
+
+if __name__ == "__main__":
+    test_replay_day_of_uptrend()
+    test_replay_crash_hits_atr_stop()
+    test_replay_partial_stop_fill_sells_the_rest()
+    test_replay_unfinished_stop_completes_after_bounce()
+    print("✅ Replay tests passed")
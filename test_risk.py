@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental portfolio risk engine.
+Validates:
+- Price and balance updates across accounts keep the exact total value
+- Peak equity, drawdown and max drawdown follow the value
+- The global stop fires once at baseline * (1 - STOP_LOSS_PCT) and re-arms
+- reconcile() agrees with the running total after many updates
+"""
+
+import random
+from decimal import Decimal
+
+from risk import RiskEngine
+
+
+def make_engine(**kwargs):
+    return RiskEngine(Decimal("0.10"), log=lambda msg: None, **kwargs)
+
+
+def test_value_across_accounts():
+    risk = make_engine()
+    risk.set_balance("spot", "BNB", "1.5")
+    risk.set_balance("sub1", "BNB", "0.5")
+    risk.set_balance("spot", "USDT", "100")
+    assert risk.value == Decimal("100")  # BNB not priced yet
+    risk.mark("BNB", "600")
+    assert risk.value == Decimal("1300")
+    risk.mark("ETH", "3000")
+    risk.set_balance("sub1", "ETH", "0.1")
+    assert risk.value == Decimal("1600")
+    risk.set_balance("spot", "BNB", "1")
+    assert risk.value == Decimal("1300")
+
+
+def test_peak_and_drawdown():
+    risk = make_engine()
+    risk.set_balance("spot", "BNB", "1")
+    risk.mark("BNB", "100")
+    risk.mark("BNB", "120")
+    risk.mark("BNB", "90")
+    assert risk.peak == Decimal("120")
+    assert risk.drawdown == Decimal("0.25")
+    risk.mark("BNB", "110")
+    assert risk.max_drawdown == Decimal("0.25")
+    assert risk.drawdown < Decimal("0.25")
+
+
+def test_global_stop_fires_once_and_rearms():
+    fired = []
+    risk = make_engine(on_stop=lambda value, baseline: fired.append(value))
+    risk.set_balance("spot", "BNB", "1")
+    risk.set_balance("spot", "USDT", "100")
+    risk.mark("BNB", "900")
+    risk.set_baseline()  # 1000 -> stop at 900
+    risk.mark("BNB", "801")
+    assert not risk.stop_triggered and not fired
+    risk.mark("BNB", "800")
+    risk.mark("BNB", "790")
+    assert risk.stop_triggered and fired == [Decimal("900")]
+    risk.set_baseline(Decimal("890"))  # after a sale: stop at 801
+    assert not risk.stopped
+    risk.mark("BNB", "700")
+    assert len(fired) == 2
+
+
+def test_reconcile_matches_running_total():
+    rng = random.Random(7)
+    risk = make_engine()
+    assets = ["BNB", "ETH", "SOL", "USDT"]
+    for _ in range(2000):
+        asset = rng.choice(assets)
+        if rng.random() < 0.7 and asset != "USDT":
+            risk.mark(asset, Decimal(rng.randint(1, 100000)) / 100)
+        else:
+            account = rng.choice(["spot", "sub1", "sub2"])
+            risk.set_balance(account, asset, Decimal(rng.randint(0, 10**6)) / 10**4)
+    assert risk.reconcile() == 0
+
+
+if __name__ == "__main__":
+    test_value_across_accounts()
+    test_peak_and_drawdown()
+    test_global_stop_fires_once_and_rearms()
+    test_reconcile_matches_running_total()
+    print("✅ Risk engine tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for the all-market mini-ticker scanner.
+Validates:
+- Only pairs in the quote asset are tracked, each under a stable id
+- ATR is built from bars that roll on the event time
+- Harvest, stop and mover signals fire once per trigger
+- One update over 500 symbols stays well inside the 1 s stream cadence
+"""
+
+import time
+
+import numpy as np
+
+from scanner import HARVEST, MOVER, STOP, MarketScanner
+
+BAR_MS = 300_000
+
+
+def ticker(symbol, close, event_ms, open_=None, quote_volume=5e6):
+    return {
+        "e": "24hrMiniTicker", "E": event_ms, "s": symbol, "c": str(close),
+        "o": str(open_ if open_ is not None else close), "h": "0", "l": "0",
+        "v": "0", "q": str(quote_volume),
+    }
+
+
+def make_scanner(**kwargs):
+    params = dict(target_pct=0.005, atr_multiplier=1.5, atr_period=3, bar_sec=300,
+                  move_atr=2.0, min_quote_volume=1e6, log=lambda msg: None)
+    params.update(kwargs)
+    return MarketScanner(**params)
+
+
+def warm_up(scanner, symbol, closes, bar_ranges):
+    """One bar per close, each moving +-range around it, so ATR == range."""
+    for i, (close, rng) in enumerate(zip(closes, bar_ranges)):
+        start = i * BAR_MS
+        scanner.handle_message([ticker(symbol, close + rng / 2, start)])
+        scanner.handle_message([ticker(symbol, close - rng / 2, start + 1000)])
+        scanner.handle_message([ticker(symbol, close, start + 2000)])
+
+
+def test_registry_filters_quote_asset():
+    scanner = make_scanner()
+    scanner.handle_message([ticker("BNBUSDT", 600, 0), ticker("ETHBTC", 0.05, 0),
+                            ticker("SOLUSDT", 150, 0)])
+    assert scanner.symbols == ["BNBUSDT", "SOLUSDT"]
+    assert scanner.ids["ETHBTC"] == -1
+    scanner.handle_message([ticker("SOLUSDT", 151, 1000)])
+    assert scanner.ids["SOLUSDT"] == 1 and scanner.last[1] == 151
+
+
+def test_atr_from_bars():
+    scanner = make_scanner()
+    warm_up(scanner, "BNBUSDT", [100, 100, 100, 100], [2, 2, 2, 2])
+    assert scanner.tr_count[0] == 3  # the fourth bar is still open
+    assert np.isclose(scanner.atr[0], 2.0)
+
+
+def test_harvest_and_stop_fire_once():
+    signals = []
+    scanner = make_scanner(on_signal=lambda *s: signals.append(s))
+    warm_up(scanner, "BNBUSDT", [100, 100, 100, 100], [0.4, 0.4, 0.4, 0.4])
+    t = 4 * BAR_MS
+    # ref 100.2 (first tick); target max(0.5%, 1.5*0.4/2/100) = 0.5%
+    scanner.handle_message([ticker("BNBUSDT", 100.8, t)])
+    scanner.handle_message([ticker("BNBUSDT", 100.8, t + 1000)])
+    assert [s[0] for s in signals] == [HARVEST]
+    # stop trails at 100.8 - 1.5*0.4 = 100.2
+    scanner.handle_message([ticker("BNBUSDT", 100.1, t + 2000)])
+    scanner.handle_message([ticker("BNBUSDT", 100.0, t + 3000)])
+    assert [s[0] for s in signals] == [HARVEST, STOP]
+
+
+def test_mover_and_liquidity_filter():
+    scanner = make_scanner()
+    for symbol, volume in (("AUSDT", 5e6), ("BUSDT", 1e3)):
+        for i in range(4):
+            scanner.handle_message([ticker(symbol, 10.1, i * BAR_MS, quote_volume=volume),
+                                    ticker(symbol, 9.9, i * BAR_MS + 1, quote_volume=volume)])
+    t = 4 * BAR_MS
+    moves = scanner.handle_message([ticker("AUSDT", 9.9 - 0.5, t), ticker("BUSDT", 9.4, t, quote_volume=1e3)])
+    assert (MOVER, "AUSDT", 9.4) in moves
+    assert not any(s[1] == "BUSDT" for s in moves)  # below min quote volume
+    assert scanner.top_movers(1)[0][0] == "AUSDT"
+
+
+def test_500_symbol_update_cost():
+    scanner = make_scanner()
+    symbols = [f"S{i:03d}USDT" for i in range(500)]
+    rng = np.random.default_rng(1)
+    prices = rng.uniform(1, 100, len(symbols))
+    started = time.perf_counter()
+    updates = 300
+    for u in range(updates):
+        prices *= 1 + rng.normal(0, 0.001, len(prices))
+        scanner.handle_message([ticker(s, p, u * 1000) for s, p in zip(symbols, prices)])
+    assert scanner.n == 500
+    per_update = scanner.busy_sec / updates
+    assert per_update < 0.1  # the stream delivers one array per second
+    assert time.perf_counter() - started < 30
+
+
+if __name__ == "__main__":
+    test_registry_filters_quote_asset()
+    test_atr_from_bars()
+    test_harvest_and_stop_fire_once()
+    test_mover_and_liquidity_filter()
+    test_500_symbol_update_cost()
+    print("✅ Scanner tests passed")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for shadow strategy evaluation.
+Validates:
+- Every variant in the grid is updated from one tick in a single pass
+- Harvests follow each variant's target and the ATR stop retires variants
+- Re-entry buys back its fraction of the proceeds after a pullback
+- A variant stopped out never re-enters, even on the stop's own tick
+- The worker drops ticks instead of blocking when its queue is full
+"""
+
+import threading
+
+import numpy as np
+
+from clock import SimulatedClock
+from shadow import ShadowBook, ShadowRunner, parameter_grid
+
+
+def make_book(targets=(0.005, 0.01), multipliers=(1.5,), reentries=(0.0,)):
+    t, m, r = parameter_grid(targets, multipliers, reentries)
+    return ShadowBook(t, m, r, balance_base=1.0, balance_quote=0.0, price=100.0,
+                      step_size=0.001, min_notional=0.01, fee_pct=0.0)
+
+
+def test_grid_is_cartesian():
+    t, m, r = parameter_grid([0.1, 0.2], [1, 2, 3], [0, 0.5])
+    assert len(t) == len(m) == len(r) == 12
+    assert set(zip(t, m, r)) == {(a, b, c) for a in (0.1, 0.2) for b in (1, 2, 3) for c in (0, 0.5)}
+
+
+def test_harvest_per_variant_target():
+    book = make_book()
+    book.update(100.6)  # +0.6%: only the 0.5% variant harvests
+    assert list(book.harvests) == [1, 0]
+    assert np.isclose(book.base[0], 0.995)  # 0.00596 floored to the step
+    assert np.isclose(book.quote[0], 0.005 * 100.6)
+    assert book.base[1] == 1.0
+    book.update(101.7)  # +1.7% from start: the 1% variant harvests too
+    assert list(book.harvests) == [2, 1]
+
+
+def test_atr_stop_retires_variant():
+    t, m, r = parameter_grid([0.05], [1.0, 3.0], [0.0])
+    book = ShadowBook(t, m, r, 1.0, 0.0, 100.0, fee_pct=0.0)
+    book.update(100.0, atr=1.0)  # stops at 99 and 97
+    book.update(98.5, atr=1.0)
+    assert list(book.stopped) == [True, False]
+    assert book.base[0] == 0 and np.isclose(book.quote[0], 98.5)
+    book.update(120.0, atr=1.0)  # stopped variants no longer trade
+    assert book.base[0] == 0 and book.harvests[0] == 0
+
+
+def test_reentry_after_pullback():
+    book = make_book(targets=(0.005,), reentries=(0.0, 0.5))
+    book.update(101.0)
+    assert list(book.harvests) == [1, 1]
+    book.update(98.0)  # more than 2% below the harvest price
+    assert list(book.reentries) == [0, 1]
+    assert book.base[1] > book.base[0]
+    rows = book.leaderboard(top=2)
+    assert rows[0]["equity"] >= rows[1]["equity"]
+
+
+def test_stopped_variant_does_not_reenter():
+    book = make_book(targets=(0.005,), reentries=(0.5,))
+    book.update(101.0)
+    assert book.reentry_budget[0] > 0
+    book.update(80.0)  # through the portfolio stop and the re-entry drop at once
+    assert book.stopped[0]
+    assert book.base[0] == 0 and book.reentries[0] == 0
+    book.update(70.0)
+    assert book.base[0] == 0 and book.reentries[0] == 0
+
+
+def test_runner_never_blocks_the_loop():
+    book = make_book()
+    gate = threading.Event()
+    original = book.update
+
+    def slow_update(price, atr=None):
+        gate.wait(1.0)
+        original(price, atr)
+
+    book.update = slow_update
+    runner = ShadowRunner(book, max_queue=2, log=lambda msg: None)
+    runner.start()
+    try:
+        for _ in range(10):
+            runner.submit(100.0)  # returns at once even though the worker is stuck
+        assert runner.dropped >= 7
+    finally:
+        gate.set()
+        runner.stop()
+
+
+def test_leaderboard_logged_on_schedule():
+    sim = SimulatedClock(start=0)
+    lines = []
+    runner = ShadowRunner(make_book(), leaderboard_sec=60, log=lines.append, clock=sim)
+    runner.handle_trade_message({"e": "trade", "p": "100.6"})
+    assert not lines
+    sim.advance(60)
+    runner.handle_trade_message({"e": "trade", "p": "100.7"})
+    assert len(lines) == 1 and "2 variants, 2 ticks" in lines[0]
+
+
+if __name__ == "__main__":
+    test_grid_is_cartesian()
+    test_harvest_per_variant_target()
+    test_atr_stop_retires_variant()
+    test_reentry_after_pullback()
+    test_stopped_variant_does_not_reenter()
+    test_runner_never_blocks_the_loop()
+    test_leaderboard_logged_on_schedule()
+    print("✅ Shadow tests passed")
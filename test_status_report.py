@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for the periodic status reporter.
+Validates:
+- The report renders price, P&L, target and stop from the given state
+- The reporter sends the latest published snapshot from its own thread
+- Nothing is sent before the loop has published any state
+"""
+
+import threading
+from decimal import Decimal
+
+from status_report import PeriodicReporter, StatusBoard, render_status_report
+
+
+def test_render_report():
+    text = render_status_report(
+        1113.50, 1113.50, 1000.00, 50.00, 1.0, 12.5,
+        target_pct=Decimal("0.005"), stop_loss_pct=Decimal("0.10"), interval_hours=12,
+    )
+    assert "💰 Current Price: $1113.50" in text
+    assert "📈 P&L: +11.35% ($113.50)" in text
+    assert "🎯 Target: +0.5% ($1005.00)" in text
+    assert "🛑 Stop Loss: -10% ($900.00)" in text
+    assert "Next update in 12 hours" in text
+
+
+def test_reporter_uses_latest_snapshot():
+    board = StatusBoard()
+    sent = []
+    done = threading.Event()
+
+    def report(state, uptime_hours):
+        sent.append((state, threading.current_thread().name))
+        done.set()
+
+    reporter = PeriodicReporter(board, report, interval_sec=0.02, log=lambda msg: None)
+    reporter.start()
+    try:
+        assert not done.wait(0.1)  # nothing published yet
+        board.publish(price=Decimal("600"))
+        board.publish(price=Decimal("601"))
+        assert done.wait(1.0)
+    finally:
+        reporter.stop()
+    state, thread_name = sent[0]
+    assert state["price"] == Decimal("601")
+    assert thread_name == "periodic-report"
+
+
+if __name__ == "__main__":
+    test_render_report()
+    test_reporter_uses_latest_snapshot()
+    print("✅ Status report tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the tick-level (aggTrades) backtest.
+Validates:
+- The chunked, vectorized engine matches a per-trade reference loop exactly,
+  including bars and stop state that span chunk boundaries
+- A stop touched inside a 1m bar fires at the crossing trade's price
+- ATR is the streaming 5m ATR of closed bars, as the live pipeline computes it
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app2"))
+
+from candle_store import TRADE_DTYPE  # noqa: E402
+from indicators import StreamingIndicators  # noqa: E402
+from tick_backtest import BarAtr, simulate_ticks  # noqa: E402
+
+PARAMS = dict(target_pct=0.004, stop_loss_pct=0.05, atr_multiplier=3.0, atr_period=14,
+              min_notional=1.0, slippage_pct=0.0002, fee_pct=0.001)
+
+
+def make_trades(n, seed=5, vol=0.0004, drift=0.0):
+    rng = random.Random(seed)
+    trades = np.empty(n, dtype=TRADE_DTYPE)
+    price, ts = 300.0, 1_700_000_000_000
+    for i in range(n):
+        price *= 1 + rng.gauss(drift, vol)
+        ts += rng.randint(0, 4000)
+        trades[i] = (ts, i, price, 0.1, bool(i % 2))
+    return trades
+
+
+def reference(trades, initial_qty=1.0, target_pct=0.004, stop_loss_pct=0.05, atr_multiplier=3.0,
+              atr_period=14, min_notional=1.0, slippage_pct=0.0002, fee_pct=0.001):
+    """Per-trade loop with the live bot's rules."""
+    keep = (1 - slippage_pct) * (1 - fee_pct)
+    ind = StreamingIndicators(atr_period=atr_period)
+    bar = None
+    qty, cash = initial_qty, 0.0
+    entry = float(trades["price"][0])
+    baseline = qty * entry
+    stop, realized, events = None, 0.0, []
+    for ts, price in zip(trades["ts"].tolist(), trades["price"].tolist()):
+        bar_id = ts // 300_000
+        if bar is not None and bar[0] != bar_id:
+            ind.update(bar[1], bar[2], bar[3])
+            bar = None
+        bar = [bar_id, price, price, price] if bar is None else [
+            bar_id, max(bar[1], price), min(bar[2], price), price]
+        atr = ind.atr
+        if atr is not None:
+            trail = price - atr_multiplier * atr
+            stop = trail if stop is None or trail > stop else stop
+        value = qty * price + cash
+        target = target_pct if atr is None else max(target_pct, atr_multiplier * atr / price / 2)
+        atr_hit = stop is not None and price <= stop
+        if atr_hit or value <= baseline * (1 - stop_loss_pct):
+            proceeds = qty * price * keep
+            cash += proceeds
+            realized += cash - baseline
+            events.append(("ATR_STOP" if atr_hit else "STOP", ts, price, qty, proceeds, realized))
+            return events
+        if value >= baseline * (1 + target) and value - baseline >= min_notional:
+            sell = (value - baseline) / price
+            proceeds = sell * price * keep
+            realized += proceeds - sell * entry
+            cash += proceeds
+            qty -= sell
+            events.append(("HARVEST", ts, price, sell, proceeds, realized))
+            baseline = qty * price + cash
+            entry = price
+            stop = price - atr_multiplier * atr if atr is not None else None
+    return events
+
+
+def assert_same(events, expected):
+    assert len(events) == len(expected)
+    for a, b in zip(events, expected):
+        assert a[0] == b[0] and a[1] == b[1]
+        assert np.allclose(a[2:], b[2:], rtol=1e-9, atol=1e-9)
+
+
+def test_matches_reference_across_chunks():
+    trades = make_trades(40_000, drift=0.00002)
+    expected = reference(trades, **PARAMS)
+    assert sum(e[0] == "HARVEST" for e in expected) >= 5
+    for chunk, scan in ((1_000_000, 16_384), (7_777, 1_000), (513, 64)):
+        result = simulate_ticks(trades, chunk=chunk, scan=scan, **PARAMS)
+        assert_same(result["trades"], expected)
+
+
+def test_stop_reference_and_intrabar_fill():
+    trades = make_trades(30_000, seed=11, drift=-0.00003)
+    expected = reference(trades, **PARAMS)
+    result = simulate_ticks(trades, chunk=4_096, scan=512, **PARAMS)
+    assert_same(result["trades"], expected)
+    assert result["stopped"] and result["final_qty"] == 0
+    kind, ts, price = result["trades"][-1][:3]
+    crossing = int(np.flatnonzero(trades["ts"] == ts)[0])
+    assert trades["price"][crossing] == price  # filled at the tick, not a 1m close
+
+
+def test_bar_atr_matches_streaming_indicators():
+    trades = make_trades(5_000, seed=2)
+    bar_atr = BarAtr(period=14)
+    per_trade = np.concatenate([
+        bar_atr.per_trade(trades["ts"][i:i + 700], trades["price"][i:i + 700])
+        for i in range(0, len(trades), 700)
+    ])
+    ind = StreamingIndicators(atr_period=14)
+    ids = trades["ts"] // 300_000
+    for b in np.unique(ids)[:-1]:
+        p = trades["price"][ids == b]
+        ind.update(p.max(), p.min(), p[-1])
+    assert np.isclose(per_trade[-1], ind.atr)
+
+
+if __name__ == "__main__":
+    test_matches_reference_across_chunks()
+    test_stop_reference_and_intrabar_fill()
+    test_bar_atr_matches_streaming_indicators()
+    print("✅ Tick backtest tests passed")